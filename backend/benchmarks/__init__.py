@@ -0,0 +1,13 @@
+"""Benchmarks for the data and engine hot paths on synthetic candles.
+
+Run from ``backend/``::
+
+    python -m benchmarks --days 90 --symbols 2 --output results.json
+    python -m benchmarks --baseline baseline.json -k backtest
+
+A deterministic dataset (``benchmarks/synthetic.py``) is written to a
+temporary ``DATA_DIR``, then every scenario (``benchmarks/scenarios.py``)
+is timed over ``--repeat`` runs and profiled once with ``tracemalloc``.
+Results go to a JSON file; with ``--baseline`` each scenario is compared
+against an earlier results file and regressions fail the run.
+"""
@@ -0,0 +1,30 @@
+import argparse
+import os
+import sys
+import tempfile
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Time the data and engine hot paths")
+    parser.add_argument("--days", type=float, default=30, help="days of 1m candles per symbol (default %(default)s)")
+    parser.add_argument("--symbols", type=int, default=1, help="number of synthetic symbols (default %(default)s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per scenario (default %(default)s)")
+    parser.add_argument("-k", dest="only", action="append", default=[], help="only scenarios containing this text")
+    parser.add_argument("--timeframes", nargs="*", help="timeframes to cover (default: all)")
+    parser.add_argument("--data-dir", help="reuse or keep the dataset here instead of a temporary directory")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="slowdown ratio counted as a regression")
+    args = parser.parse_args(argv)
+
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix="benchmarks-")
+    # config reads DATA_DIR once, on first import; nothing has imported it yet
+    os.environ["DATA_DIR"] = data_dir
+    from benchmarks.run import run
+
+    return run(args, data_dir, cleanup=args.data_dir is None)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
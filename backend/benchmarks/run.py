@@ -0,0 +1,112 @@
+"""Time and memory-profile the scenarios, write results, compare to a baseline."""
+import gc
+import json
+import os
+import platform
+import shutil
+import statistics
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.scenarios import build_scenarios
+from benchmarks.synthetic import symbol_names, write_dataset
+
+# Differences below this are timer noise, whatever the ratio
+NOISE_FLOOR_SEC = 0.002
+
+
+def run(args, data_dir: str, cleanup: bool) -> int:
+    """Run the benchmarks for parsed CLI ``args``; returns the exit status."""
+    symbols = symbol_names(args.symbols)
+    try:
+        if not all(os.path.exists(os.path.join(data_dir, f"{s}.csv")) for s in symbols):
+            started = time.perf_counter()
+            rows = write_dataset(data_dir, symbols, args.days, seed=args.seed)
+            print(f"Generated {sum(rows.values())} candles in {time.perf_counter() - started:.1f}s under {data_dir}")
+        scenarios = [
+            s for s in build_scenarios(symbols, args.timeframes)
+            if not args.only or any(text in s.name for text in args.only)
+        ]
+        results = {}
+        for scenario in scenarios:
+            results[scenario.name] = measure(scenario, args.repeat)
+            r = results[scenario.name]
+            print(f"{scenario.name:<40} {r['seconds_min'] * 1e3:10.2f} ms  (median {r['seconds_median'] * 1e3:.2f})"
+                  f"  peak {r['peak_mb']:.1f} MB")
+    finally:
+        if cleanup:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "days": args.days,
+            "symbols": args.symbols,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.platform(),
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=1)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        dataset = ("days", "symbols", "seed")
+        if any(baseline["meta"].get(k) != report["meta"][k] for k in dataset):
+            print("Warning: the baseline was run on a different dataset (days/symbols/seed)")
+        regressions = compare(results, baseline["results"], args.tolerance)
+        return 1 if regressions else 0
+    return 0
+
+
+def measure(scenario, repeat: int) -> dict:
+    """Best and median wall time over ``repeat`` runs, then tracemalloc's peak in one more."""
+    times = []
+    for _ in range(max(1, repeat)):
+        scenario.setup()
+        gc.collect()
+        started = time.perf_counter()
+        scenario.run()
+        times.append(time.perf_counter() - started)
+
+    scenario.setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        scenario.run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "seconds_min": min(times),
+        "seconds_median": statistics.median(times),
+        "peak_mb": round(peak / 1024 ** 2, 2),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Print each shared scenario's time ratio to the baseline; returns the regressed names."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        new, old = result["seconds_min"], base["seconds_min"]
+        ratio = new / old if old > 0 else float("inf")
+        slower = ratio > tolerance and new - old > NOISE_FLOOR_SEC
+        if slower:
+            regressions.append(name)
+        flag = "REGRESSION" if slower else ""
+        print(f"{name:<40} {old * 1e3:10.2f} → {new * 1e3:10.2f} ms  x{ratio:5.2f}  {flag}")
+    print(f"{len(regressions)} regression(s) beyond x{tolerance}")
+    return regressions
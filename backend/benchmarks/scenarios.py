@@ -0,0 +1,159 @@
+"""Benchmark scenarios over the data and engine hot paths.
+
+Each scenario has an untimed ``setup`` (e.g. clearing the OHLCV cache so
+a load really is cold) and the timed ``run``. Imported only once
+``DATA_DIR`` points at the synthetic dataset.
+"""
+import asyncio
+from typing import Callable, NamedTuple
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+from config import TIMEFRAME_MAP
+from models.schemas import BacktestBatchRequest, BacktestRequest, ManualTradeRequest
+from routes.data import get_ohlcv
+from services import columnar_store, data_service
+from services.backtest_engine import run_backtest
+from services.batch_backtest import run_backtest_batch
+from services.rollups import build_rollups, ordered_timeframes, rollup
+from services.strategies import STRATEGIES
+from services.trade_service import simulate_manual_trade, simulate_manual_trades
+
+PAGE_LIMIT = 1000
+PAGES = 20
+MANUAL_BATCH = 1000
+
+
+class Scenario(NamedTuple):
+    name: str
+    run: Callable[[], object]
+    setup: Callable[[], None] = lambda: None
+
+
+def build_scenarios(symbols: list[str], timeframes: list[str] | None = None) -> list[Scenario]:
+    """Every scenario: loads over all ``symbols``, the rest on the first one."""
+    timeframes = timeframes or list(TIMEFRAME_MAP)
+    symbol = symbols[0]
+    scenarios = [
+        Scenario("load.csv", lambda: [data_service.load_ohlcv(s) for s in symbols], lambda: _cold(symbols)),
+        Scenario("load.store", lambda: [data_service.load_ohlcv(s) for s in symbols], data_service._cache.clear),
+        Scenario("rollups.all", lambda: build_rollups(data_service.load_ohlcv(symbol))),
+    ]
+    for tf in ordered_timeframes()[1:]:
+        if tf in timeframes:
+            scenarios.append(Scenario(f"resample.{tf}", _resample(symbol, tf)))
+
+    for tf in timeframes:
+        for fmt in ("rows", "columns", "binary"):
+            scenarios.append(Scenario(f"ohlcv.pages.{fmt}.{tf}", _pages(symbol, tf, fmt)))
+    scenarios.append(Scenario("ohlcv.format_records", _format_records(symbol)))
+
+    for tf in timeframes:
+        for strategy in STRATEGIES:
+            req = BacktestRequest(symbol=symbol, timeframe=tf, strategy=strategy, stop_loss_pct=1, take_profit_pct=2)
+            scenarios.append(Scenario(f"backtest.{strategy}.{tf}", lambda r=req: run_backtest(r), _fresh(symbol, tf)))
+        req = BacktestRequest(symbol=symbol, timeframe=tf, engine="streaming", stop_loss_pct=1, take_profit_pct=2)
+        scenarios.append(Scenario(f"backtest.streaming.{tf}", lambda r=req: run_backtest(r)))
+        scenarios.append(Scenario(f"manual_trade.{tf}", _manual_trade(symbol, tf)))
+        scenarios.append(Scenario(f"manual_trade.batch.{tf}", _manual_batch(symbol, tf)))
+    scenarios.append(Scenario("backtest.batch", _backtest_batch(symbol, timeframes)))
+    return scenarios
+
+
+# ─── Private helpers ──────────────────────────────────────────────────
+
+
+def _cold(symbols: list[str]) -> None:
+    """Empty the cache and drop the columnar stores, so loads parse the CSV."""
+    data_service._cache.clear()
+    for symbol in symbols:
+        columnar_store.remove_store(symbol)
+
+
+def _fresh(symbol: str, timeframe: str) -> Callable[[], None]:
+    """Setup: frame cached, indicators not, as for a backtest's first request."""
+    def setup():
+        data_service._cache.clear()
+        data_service.load_ohlcv(symbol, timeframe)
+
+    return setup
+
+
+def _resample(symbol: str, timeframe: str):
+    df = data_service.load_ohlcv(symbol).dropna()
+    dt = df["datetime"].to_numpy()
+    level = {
+        "datetime": dt.astype(np.int64),
+        "timestamp": df["timestamp"].to_numpy(dtype=np.int64),
+        **{col: df[col].to_numpy(dtype=np.float64) for col in ("open", "high", "low", "close", "volume")},
+    }
+    unit = np.datetime_data(dt.dtype)[0]
+    return lambda: rollup(level, timeframe, unit)
+
+
+def _pages(symbol: str, timeframe: str, fmt: str):
+    """Scroll back ``PAGES`` pages from the end, rendering each response body."""
+    def run():
+        ts = data_service.load_arrays(symbol, timeframe).timestamp
+        end_time = None
+        for _ in range(PAGES):
+            result = asyncio.run(
+                get_ohlcv(
+                    symbol=symbol, timeframe=timeframe, limit=PAGE_LIMIT, end_time=end_time,
+                    start_time=None, fmt=fmt, accept=None,
+                )
+            )
+            if not isinstance(result, Response):
+                JSONResponse(jsonable_encoder(result))
+            # Next cursor: the first candle of this page, as the chart sends it
+            end_ms = None if end_time is None else data_service.from_chart_ts(end_time)
+            lo, _ = data_service.candle_range(symbol, timeframe, None, end_ms, PAGE_LIMIT)
+            if lo == 0:
+                break
+            end_time = data_service.to_chart_ts(ts[lo])
+
+    return run
+
+
+def _format_records(symbol: str):
+    df = data_service.load_ohlcv(symbol).iloc[-100_000:]
+    return lambda: data_service.format_ohlcv_records(df)
+
+
+def _backtest_batch(symbol: str, timeframes: list[str]):
+    """Every strategy on every timeframe, twice (different stops), in one in-process batch."""
+    req = BacktestBatchRequest(
+        backtests=[
+            BacktestRequest(symbol=symbol, timeframe=tf, strategy=strategy, stop_loss_pct=stop, take_profit_pct=2)
+            for tf in timeframes
+            for strategy in STRATEGIES
+            for stop in (1, 2)
+        ],
+        max_workers=1,
+    )
+    return lambda: run_backtest_batch(req)
+
+
+def _manual_trade(symbol: str, timeframe: str):
+    """One trade from the first candle with stops too wide to hit: scans the whole series."""
+    entry = data_service.load_ohlcv(symbol, timeframe)["datetime"].iloc[0].isoformat()
+    req = ManualTradeRequest(
+        symbol=symbol, timeframe=timeframe, entry_time=entry, stop_loss_pct=99, take_profit_pct=1000
+    )
+    return lambda: simulate_manual_trade(req)
+
+
+def _manual_batch(symbol: str, timeframe: str):
+    """``MANUAL_BATCH`` trades spread over the series, 1% stops."""
+    datetimes = data_service.load_ohlcv(symbol, timeframe)["datetime"]
+    picks = np.linspace(0, len(datetimes) - 1, MANUAL_BATCH).astype(int)
+    reqs = [
+        ManualTradeRequest(
+            symbol=symbol, timeframe=timeframe, side="long" if i % 2 else "short",
+            entry_time=datetimes.iloc[k].isoformat(), stop_loss_pct=1, take_profit_pct=1,
+        )
+        for i, k in enumerate(picks.tolist())
+    ]
+    return lambda: simulate_manual_trades(reqs)
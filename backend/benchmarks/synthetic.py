@@ -0,0 +1,69 @@
+"""Deterministic synthetic 1m candles in the raw CSV layout.
+
+Prices follow a geometric random walk whose volatility changes day by
+day, so indicators cross and stops trigger like on real data. A sprinkle
+of missing minutes stands in for exchange outages. The output depends
+only on (symbol, start, days, seed).
+"""
+import os
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from config import IST_OFFSET_SEC
+
+CANDLE_MS = 60_000
+MINUTES_PER_DAY = 1440
+GAP_RATE = 1e-4  # share of minutes with no candle
+
+
+def generate_candles(symbol: str, days: float, start: str = "2023-01-01", seed: int = 0) -> pd.DataFrame:
+    """``days`` of 1m candles from ``start`` (UTC), columns as in ``data/<SYMBOL>.csv``."""
+    rng = np.random.default_rng([seed, zlib.crc32(symbol.encode())])
+    n = int(days * MINUTES_PER_DAY)
+    first = int(pd.Timestamp(start, tz="UTC").timestamp() * 1000)
+    ts = first + np.arange(n, dtype=np.int64) * CANDLE_MS
+
+    # Per-minute volatility drifts between calmer and wilder days
+    daily_vol = 1e-3 * np.exp(rng.normal(0, 0.4, n // MINUTES_PER_DAY + 1))
+    vol = daily_vol[np.arange(n) // MINUTES_PER_DAY]
+    base = 10 ** rng.uniform(1, 4.5)
+    close = base * np.exp(np.cumsum(rng.normal(0, 1, n) * vol))
+    open_ = np.concatenate(([base], close[:-1]))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 1, n)) * vol / 2)
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 1, n)) * vol / 2)
+    volume = rng.gamma(2.0, 5.0, n) * (vol / 1e-3)
+
+    keep = rng.random(n) >= GAP_RATE
+    ts = ts[keep]
+    return pd.DataFrame(
+        {
+            # Naive IST datetimes, like the exchange fetch script writes them
+            "datetime": pd.to_datetime(ts, unit="ms") + pd.Timedelta(seconds=IST_OFFSET_SEC),
+            "timestamp": ts,
+            **{
+                col: np.round(values[keep], 2)
+                for col, values in (("open", open_), ("high", high), ("low", low), ("close", close))
+            },
+            "volume": np.round(volume[keep], 3),
+        }
+    )
+
+
+def write_dataset(
+    data_dir: str, symbols: list[str], days: float, start: str = "2023-01-01", seed: int = 0
+) -> dict[str, int]:
+    """Write ``<data_dir>/<SYMBOL>.csv`` for every symbol; returns symbol → rows."""
+    os.makedirs(data_dir, exist_ok=True)
+    rows = {}
+    for symbol in symbols:
+        df = generate_candles(symbol, days, start, seed)
+        df.to_csv(os.path.join(data_dir, f"{symbol}.csv"), index=False)
+        rows[symbol] = len(df)
+    return rows
+
+
+def symbol_names(count: int) -> list[str]:
+    """``count`` distinct synthetic symbols: SYN0USDT, SYN1USDT, ..."""
+    return [f"SYN{i}USDT" for i in range(count)]
@@ -1,10 +1,28 @@
 import os
 
-DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+from dotenv import load_dotenv
+
+# Read .env before any setting below is evaluated
+load_dotenv()
+
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(os.path.dirname(__file__), "data"))
 
 # IST = UTC+5:30 → offset in seconds for lightweight-charts display
 IST_OFFSET_SEC = 5 * 3600 + 30 * 60  # 19800
 
+# Load raw data through memory-mapped .npy columns (see services/columnar_store.py)
+COLUMNAR_STORE = os.getenv("COLUMNAR_STORE", "1") == "1"
+
+# Byte budget for cached OHLCV frames per worker (LRU, resampled frames evicted first)
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", 2 * 1024 ** 3))
+
+# Cache frames in a lossless compact encoding (int32 times, scaled-int prices,
+# datetime derived on demand; see services/compact.py), decoded per request
+COMPACT_CACHE = os.getenv("COMPACT_CACHE", "0") == "1"
+
+# Build every timeframe's rollups at startup: off | eager | background
+ROLLUP_WARMUP = os.getenv("ROLLUP_WARMUP", "off")
+
 TIMEFRAME_MAP = {
     "1m": "1min",
     "5m": "5min",
@@ -13,3 +31,47 @@ TIMEFRAME_MAP = {
     "4h": "4h",
     "1d": "1D",
 }
+
+# ── Live updates ──────────────────────────────────────────────────
+# Seconds between checks for candles other processes appended to cached
+# symbols (ingestion runs, POST /api/ohlcv/append in another worker); 0 = off
+LIVE_POLL_SEC = float(os.getenv("LIVE_POLL_SEC", 5))
+
+# ── Data ingestion (python -m services.ingestion) ─────────────────
+INGEST_EXCHANGE = os.getenv("INGEST_EXCHANGE", "binance")
+INGEST_START = os.getenv("INGEST_START", "2022-01-01")  # first day to cover (UTC)
+# Symbols fetched at once; they share the exchange's rate limit
+INGEST_MAX_WORKERS = int(os.getenv("INGEST_MAX_WORKERS", 4))
+
+# ── Parameter sweeps (/api/optimize) ──────────────────────────────
+# Helper processes evaluating combinations, shared by all sweeps and walk-forward runs
+OPTIMIZE_MAX_WORKERS = int(os.getenv("OPTIMIZE_MAX_WORKERS", os.cpu_count() or 1))
+OPTIMIZE_MAX_COMBINATIONS = int(os.getenv("OPTIMIZE_MAX_COMBINATIONS", 5000))
+
+# ── Robustness runs (/api/robustness/*), on the sweeps' OPTIMIZE_MAX_WORKERS helper pool ──
+WALK_FORWARD_MAX_RUNS = int(os.getenv("WALK_FORWARD_MAX_RUNS", 50000))  # windows × combinations
+MONTE_CARLO_MAX_SIMULATIONS = int(os.getenv("MONTE_CARLO_MAX_SIMULATIONS", 100000))
+
+# ── Portfolio backtests (/api/portfolio-backtest) ─────────────────
+# Helper processes generating per-symbol trade schedules, shared by all portfolio runs
+PORTFOLIO_MAX_WORKERS = int(os.getenv("PORTFOLIO_MAX_WORKERS", os.cpu_count() or 1))
+
+# ── Batch backtests (/api/backtest/batch) ─────────────────────────
+# Helper processes running (symbol, timeframe) groups in parallel, shared by all batches
+BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", os.cpu_count() or 1))
+BATCH_MAX_BACKTESTS = int(os.getenv("BATCH_MAX_BACKTESTS", 1000))
+
+# ── Streaming backtests (engine="streaming") ──────────────────────
+# Candles read from disk per chunk; bounds memory regardless of history length
+STREAM_CHUNK_ROWS = int(os.getenv("STREAM_CHUNK_ROWS", 250_000))
+
+# ── Timing (Server-Timing header, /api/metrics); toggled at runtime via POST /api/metrics/timing ──
+TIMING_ENABLED = os.getenv("TIMING_ENABLED", "0") == "1"
+TIMING_WINDOW = int(os.getenv("TIMING_WINDOW", 1000))  # recent spans kept per stage
+
+# ── Worker pool for CPU-bound requests ────────────────────────────
+WORKER_POOL_KIND = os.getenv("WORKER_POOL_KIND", "thread")  # thread | process
+WORKER_POOL_SIZE = int(os.getenv("WORKER_POOL_SIZE", os.cpu_count() or 2))
+# Max calls queued or running at once; beyond this requests get a 429
+WORKER_QUEUE_DEPTH = int(os.getenv("WORKER_QUEUE_DEPTH", 32))
+JOB_RESULT_TTL_SEC = int(os.getenv("JOB_RESULT_TTL_SEC", 600))
@@ -1,28 +1,61 @@
+import threading
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from routes.data import router as data_router
 from routes.backtest import router as backtest_router
 from routes.trade import router as trade_router
+from routes.optimize import router as optimize_router
+from routes.portfolio import router as portfolio_router
+from routes.robustness import router as robustness_router
+from routes.jobs import router as jobs_router
+from routes.metrics import router as metrics_router
+from config import ROLLUP_WARMUP
+from services.data_service import start_source_watcher, warm_rollups
+from services.job_queue import shutdown_pool
+from services.timing import ServerTimingMiddleware
 import os
 from dotenv import load_dotenv
 
-app = FastAPI(title="Trading Backtest API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if ROLLUP_WARMUP == "eager":
+        warm_rollups()
+    elif ROLLUP_WARMUP == "background":
+        threading.Thread(target=warm_rollups, name="rollup-warmup", daemon=True).start()
+    start_source_watcher()
+    yield
+    shutdown_pool()
+
+
+app = FastAPI(title="Trading Backtest API", lifespan=lifespan)
 
 load_dotenv()
 
+# Added first, so CORS wraps it and the header reaches browsers too
+app.add_middleware(ServerTimingMiddleware)
+
 # Then modify the middleware:
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[os.getenv("CORS_ORIGIN", "http://localhost:3000"), "http://localhost:3000"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
 # ─── Include routers ──────────────────────────────────────────────────
 app.include_router(data_router)
 app.include_router(backtest_router)
 app.include_router(trade_router)
+app.include_router(optimize_router)
+app.include_router(portfolio_router)
+app.include_router(robustness_router)
+app.include_router(jobs_router)
+app.include_router(metrics_router)
 
 
 @app.get("/")
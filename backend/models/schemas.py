@@ -1,11 +1,11 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Optional, Union
 
 
 class BacktestRequest(BaseModel):
     symbol: str = "BTCUSDT"
     timeframe: str = "1h"
-    strategy: str = "sma_cross"  # sma_cross | rsi
+    strategy: str = "sma_cross"  # see GET /api/strategies (services/strategies.py)
     # SMA params
     fast_period: int = 10
     slow_period: int = 30
@@ -19,6 +19,26 @@ class BacktestRequest(BaseModel):
     stop_loss_pct: Optional[float] = None   # e.g. 2.0 means 2%
     take_profit_pct: Optional[float] = None  # e.g. 4.0 means 4%
     position_size_pct: float = 100  # % of capital per trade
+    engine: str = "vectorized"  # vectorized | streaming (chunked, no overlay) | loop (reference)
+    # Cap on points per overlay series and in the equity curve (min/max downsampled);
+    # None keeps every overlay point and the default curve size
+    max_points: Optional[int] = Field(None, ge=4)
+    # Strategy params by name (e.g. {"bb_period": 20}); override same-named fields
+    params: dict[str, Union[int, float]] = {}
+
+
+class BacktestBatchRequest(BaseModel):
+    backtests: list[BacktestRequest]
+    # Results carry stats and metrics; trades and equity curve only on request
+    include_trades: bool = False
+    include_equity_curve: bool = False
+    max_workers: Optional[int] = None
+
+
+class CandleAppendRequest(BaseModel):
+    symbol: str = "BTCUSDT"
+    # 1m rows of [timestamp (UTC ms), open, high, low, close, volume], like exchange OHLCV
+    candles: list[list[float]]
 
 
 class ManualTradeRequest(BaseModel):
@@ -30,3 +50,50 @@ class ManualTradeRequest(BaseModel):
     capital: float = 10000
     stop_loss_pct: Optional[float] = None
     take_profit_pct: Optional[float] = None
+
+
+class ManualTradeBatchRequest(BaseModel):
+    trades: list[ManualTradeRequest]
+
+
+class ParamRange(BaseModel):
+    start: float
+    stop: float  # inclusive
+    step: float = 1
+
+
+class OptimizeRequest(BaseModel):
+    base: BacktestRequest = BacktestRequest()
+    # BacktestRequest field → explicit values or an inclusive range
+    grid: dict[str, Union[list, ParamRange]] = {}
+    sort_by: str = "final_capital"  # final_capital | total_pnl | win_rate | max_drawdown | total_trades
+    top_n: Optional[int] = 50
+    max_workers: Optional[int] = None
+
+
+class WalkForwardRequest(BaseModel):
+    base: BacktestRequest = BacktestRequest()
+    grid: dict[str, Union[list, ParamRange]] = {}  # same as OptimizeRequest.grid
+    in_sample_bars: int = 2000
+    out_of_sample_bars: int = 500
+    step_bars: Optional[int] = None  # defaults to out_of_sample_bars
+    sort_by: str = "final_capital"  # metric used to pick each window's winner
+    max_workers: Optional[int] = None
+
+
+class MonteCarloRequest(BaseModel):
+    base: BacktestRequest = BacktestRequest()
+    simulations: int = 1000
+    method: str = "bootstrap"  # bootstrap (with replacement) | shuffle (permutation)
+    seed: Optional[int] = None
+    max_workers: Optional[int] = None
+
+
+class PortfolioRequest(BaseModel):
+    # Strategy and trade params; base.symbol is ignored, initial_capital is the
+    # shared pool and position_size_pct applies per position to its realized
+    # value, capped by the capital not committed to open positions. Unless
+    # given, position_size_pct is an equal split: 100 / len(symbols)
+    base: BacktestRequest = BacktestRequest()
+    symbols: list[str] = ["BTCUSDT", "ETHUSDT"]
+    max_workers: Optional[int] = None
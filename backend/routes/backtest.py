@@ -1,12 +1,73 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import JSONResponse
 
-from models.schemas import BacktestRequest
-from services.backtest_engine import run_backtest
+from models.schemas import BacktestBatchRequest, BacktestRequest
+from services.backtest_engine import overlay_window, run_backtest
+from services.batch_backtest import run_backtest_batch
+from services.data_service import from_chart_ts
+from services.job_queue import QueueFull, admit_stream, run_in_pool
+from services.payloads import ndjson, negotiate_format, render
+from services.streaming_backtest import stream_backtest
+from services.strategies import list_strategies
+from services.timing import TimedRoute
 
-router = APIRouter(prefix="/api", tags=["backtest"])
+router = APIRouter(prefix="/api", tags=["backtest"], route_class=TimedRoute)
 
 
 @router.post("/backtest")
-async def backtest(req: BacktestRequest):
-    result = run_backtest(req)
+async def backtest(
+    req: BacktestRequest,
+    fmt: str | None = Query(None, alias="format", pattern="^(rows|columns|binary)$"),
+    accept: str | None = Header(None),
+):
+    fmt = negotiate_format(fmt, accept)
+    layout = "rows" if fmt == "rows" else "columns"
+    try:
+        result = await run_in_pool(run_backtest, req, layout)
+    except QueueFull:
+        return JSONResponse(status_code=429, content={"error": "Too many backtests queued, retry later"})
+    return result if fmt == "rows" else render(result, fmt)
+
+
+@router.post("/backtest/batch")
+async def backtest_batch(req: BacktestBatchRequest):
+    # Grouped by (symbol, timeframe) so each dataset and indicator is computed once
+    try:
+        result = await run_in_pool(run_backtest_batch, req)
+    except QueueFull:
+        return JSONResponse(status_code=429, content={"error": "Too many backtests queued, retry later"})
     return result
+
+
+@router.post("/backtest/overlay")
+async def backtest_overlay(
+    req: BacktestRequest,
+    start_time: int | None = Query(None),
+    end_time: int | None = Query(None),
+    fmt: str | None = Query(None, alias="format", pattern="^(rows|columns|binary)$"),
+    accept: str | None = Header(None),
+):
+    # Overlay of the visible range [start_time, end_time] (chart times), full resolution unless max_points
+    fmt = negotiate_format(fmt, accept)
+    start_ms = None if start_time is None else from_chart_ts(start_time)
+    end_ms = None if end_time is None else from_chart_ts(end_time)
+    try:
+        result = await run_in_pool(overlay_window, req, start_ms, end_ms, "rows" if fmt == "rows" else "columns")
+    except QueueFull:
+        return JSONResponse(status_code=429, content={"error": "Too many backtests queued, retry later"})
+    return result if fmt == "rows" else render(result, fmt)
+
+
+@router.post("/backtest/stream")
+async def backtest_stream(req: BacktestRequest):
+    # NDJSON progress events from the chunked engine; disconnecting cancels the run
+    try:
+        events = admit_stream(stream_backtest(req))
+    except QueueFull:
+        return JSONResponse(status_code=429, content={"error": "Too many backtests queued, retry later"})
+    return ndjson(events)
+
+
+@router.get("/strategies")
+async def strategies():
+    return {"strategies": list_strategies()}
@@ -1,17 +1,25 @@
-import os
+from fastapi import APIRouter, Header, Query
+from fastapi.concurrency import run_in_threadpool
 
-from fastapi import APIRouter, Query
+from models.schemas import CandleAppendRequest
+from services.data_service import (
+    append_candles,
+    cache_stats as ohlcv_cache_stats,
+    format_ohlcv_records,
+    from_chart_ts,
+    list_symbols as available_symbols,
+    ohlcv_columns,
+    ohlcv_page,
+)
+from services.payloads import negotiate_format, render
+from services.timing import TimedRoute
 
-from config import DATA_DIR
-from services.data_service import load_ohlcv, format_ohlcv_records
-
-router = APIRouter(prefix="/api", tags=["data"])
+router = APIRouter(prefix="/api", tags=["data"], route_class=TimedRoute)
 
 
 @router.get("/symbols")
 async def list_symbols():
-    files = [f.replace(".csv", "") for f in os.listdir(DATA_DIR) if f.endswith(".csv")]
-    return {"symbols": sorted(files)}
+    return {"symbols": available_symbols()}
 
 
 @router.get("/ohlcv")
@@ -20,22 +28,37 @@ async def get_ohlcv(
     timeframe: str = Query("1m"),
     limit: int = Query(500, ge=1, le=100000),
     end_time: int | None = Query(None),
+    start_time: int | None = Query(None),
+    fmt: str | None = Query(None, alias="format", pattern="^(rows|columns|binary)$"),
+    accept: str | None = Header(None),
 ):
-    df = load_ohlcv(symbol, timeframe)
-    if df.empty:
+    # end_time: the last `limit` candles before it (scrolling back);
+    # start_time: the first `limit` candles after it (paging forward).
+    df_slice, total = ohlcv_page(
+        symbol,
+        timeframe,
+        start_ms=None if start_time is None else from_chart_ts(start_time),
+        end_ms=None if end_time is None else from_chart_ts(end_time),
+        limit=limit,
+    )
+    if total == 0:
         return {"error": "Symbol not found", "data": [], "total": 0}
 
-    total = len(df)
-
-    # Slice the dataframe BEFORE formatting to avoid processing all rows
-    from config import IST_OFFSET_SEC
-    if end_time is not None:
-        # Convert chart timestamp back to ms for comparison
-        end_ms = (end_time - IST_OFFSET_SEC) * 1000
-        mask = df["timestamp"] < end_ms
-        df_slice = df[mask].tail(limit)
-    else:
-        df_slice = df.tail(limit)
+    fmt = negotiate_format(fmt, accept)
+    if fmt != "rows":
+        return render({"data": ohlcv_columns(df_slice), "total": total}, fmt)
 
     records = format_ohlcv_records(df_slice)
     return {"data": records, "total": total}
+
+
+@router.post("/ohlcv/append")
+async def append_ohlcv(req: CandleAppendRequest):
+    # Not on the worker pool: the candles must land in this process's cache
+    # (other processes pick them up from the segments via the source watcher)
+    return await run_in_threadpool(append_candles, req.symbol, req.candles)
+
+
+@router.get("/cache/stats")
+async def cache_stats():
+    return ohlcv_cache_stats()
@@ -0,0 +1,70 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from models.schemas import BacktestRequest, ManualTradeRequest, OptimizeRequest, PortfolioRequest
+from services.backtest_engine import run_backtest
+from services.job_queue import QueueFull, cancel_job, job_result, job_status, pool_stats, submit_job
+from services.optimizer import run_optimization
+from services.portfolio_engine import run_portfolio_backtest
+from services.timing import TimedRoute
+from services.trade_service import simulate_manual_trade
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"], route_class=TimedRoute)
+
+
+@router.get("")
+async def stats():
+    return pool_stats()
+
+
+@router.post("/backtest")
+async def submit_backtest(req: BacktestRequest):
+    return _submit("backtest", run_backtest, req)
+
+
+@router.post("/manual-trade")
+async def submit_manual_trade(req: ManualTradeRequest):
+    return _submit("manual-trade", simulate_manual_trade, req)
+
+
+@router.post("/optimize")
+async def submit_optimize(req: OptimizeRequest):
+    return _submit("optimize", run_optimization, req)
+
+
+@router.post("/portfolio-backtest")
+async def submit_portfolio_backtest(req: PortfolioRequest):
+    return _submit("portfolio-backtest", run_portfolio_backtest, req)
+
+
+@router.get("/{job_id}")
+async def status(job_id: str):
+    info = job_status(job_id)
+    if info is None:
+        return JSONResponse(status_code=404, content={"error": "Job not found"})
+    return info
+
+
+@router.get("/{job_id}/result")
+async def result(job_id: str):
+    info = job_status(job_id)
+    if info is None:
+        return JSONResponse(status_code=404, content={"error": "Job not found"})
+    if info["status"] != "done":
+        return JSONResponse(status_code=409, content=info)
+    return job_result(job_id)
+
+
+@router.delete("/{job_id}")
+async def cancel(job_id: str):
+    if job_status(job_id) is None:
+        return JSONResponse(status_code=404, content={"error": "Job not found"})
+    return {"cancelled": cancel_job(job_id)}
+
+
+def _submit(kind: str, fn, req):
+    try:
+        job_id = submit_job(kind, fn, req)
+    except QueueFull:
+        return JSONResponse(status_code=429, content={"error": "Too many jobs queued, retry later"})
+    return job_status(job_id)
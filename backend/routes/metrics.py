@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Query
+
+from services.data_service import cache_stats
+from services.job_queue import pool_stats
+from services.timing import TimedRoute, is_enabled, reset, set_enabled, stage_stats
+
+router = APIRouter(prefix="/api", tags=["metrics"], route_class=TimedRoute)
+
+
+@router.get("/metrics")
+async def metrics():
+    return {"timing": stage_stats(), "cache": cache_stats(), "pool": pool_stats()}
+
+
+@router.post("/metrics/timing")
+async def toggle_timing(enabled: bool = Query(...)):
+    set_enabled(enabled)
+    return {"enabled": is_enabled()}
+
+
+@router.delete("/metrics")
+async def reset_metrics():
+    reset()
+    return {"status": "reset"}
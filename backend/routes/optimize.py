@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from models.schemas import OptimizeRequest
+from services.job_queue import QueueFull, run_in_pool
+from services.optimizer import run_optimization
+from services.timing import TimedRoute
+
+router = APIRouter(prefix="/api", tags=["optimize"], route_class=TimedRoute)
+
+
+@router.post("/optimize")
+async def optimize(req: OptimizeRequest):
+    try:
+        result = await run_in_pool(run_optimization, req)
+    except QueueFull:
+        return JSONResponse(status_code=429, content={"error": "Too many requests queued, retry later"})
+    return result
@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from models.schemas import PortfolioRequest
+from services.job_queue import QueueFull, run_in_pool
+from services.portfolio_engine import run_portfolio_backtest
+from services.timing import TimedRoute
+
+router = APIRouter(prefix="/api", tags=["portfolio"], route_class=TimedRoute)
+
+
+@router.post("/portfolio-backtest")
+async def portfolio_backtest(req: PortfolioRequest):
+    try:
+        result = await run_in_pool(run_portfolio_backtest, req)
+    except QueueFull:
+        return JSONResponse(status_code=429, content={"error": "Too many requests queued, retry later"})
+    return result
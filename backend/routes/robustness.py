@@ -0,0 +1,28 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from models.schemas import MonteCarloRequest, WalkForwardRequest
+from services.job_queue import QueueFull, admit_stream
+from services.payloads import ndjson
+from services.robustness import monte_carlo, walk_forward
+from services.timing import TimedRoute
+
+router = APIRouter(prefix="/api/robustness", tags=["robustness"], route_class=TimedRoute)
+
+
+@router.post("/walk-forward")
+async def run_walk_forward(req: WalkForwardRequest):
+    return _stream(walk_forward(req))
+
+
+@router.post("/monte-carlo")
+async def run_monte_carlo(req: MonteCarloRequest):
+    return _stream(monte_carlo(req))
+
+
+def _stream(events):
+    # Runs hold a worker-pool slot while streaming, so they count against its queue depth
+    try:
+        return ndjson(admit_stream(events))
+    except QueueFull:
+        return JSONResponse(status_code=429, content={"error": "Too many runs queued, retry later"})
@@ -1,12 +1,27 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 
-from models.schemas import ManualTradeRequest
-from services.trade_service import simulate_manual_trade
+from models.schemas import ManualTradeBatchRequest, ManualTradeRequest
+from services.job_queue import QueueFull, run_in_pool
+from services.timing import TimedRoute
+from services.trade_service import simulate_manual_trade, simulate_manual_trades
 
-router = APIRouter(prefix="/api", tags=["trade"])
+router = APIRouter(prefix="/api", tags=["trade"], route_class=TimedRoute)
 
 
 @router.post("/manual-trade")
 async def manual_trade(req: ManualTradeRequest):
-    result = simulate_manual_trade(req)
+    try:
+        result = await run_in_pool(simulate_manual_trade, req)
+    except QueueFull:
+        return JSONResponse(status_code=429, content={"error": "Too many requests queued, retry later"})
     return result
+
+
+@router.post("/manual-trade/batch")
+async def manual_trade_batch(req: ManualTradeBatchRequest):
+    try:
+        results = await run_in_pool(simulate_manual_trades, req.trades)
+    except QueueFull:
+        return JSONResponse(status_code=429, content={"error": "Too many requests queued, retry later"})
+    return {"results": results}
@@ -1,12 +1,328 @@
+import numpy as np
 import pandas as pd
 
+from config import IST_OFFSET_SEC
 from models.schemas import BacktestRequest
-from services.data_service import load_ohlcv, sanitize_float, to_chart_ts
-from services.indicators import compute_sma, compute_rsi
+from services.data_service import load_ohlcv, load_snapshot, sanitize_float, to_chart_ts
+from services.downsample import minmax_indices, step_positions
+from services.fills import first_touch
+from services.metrics import performance_metrics
+from services.strategies import compute_indicators, get_strategy, resolve_params
+from services.timing import span
 
+# Max points in a returned equity curve
+CURVE_POINTS = 1000
+# Optional parts of a backtest result, besides the stats and metrics
+RESULT_PARTS = ("trades", "equity_curve", "overlay")
 
-def run_backtest(req: BacktestRequest) -> dict:
-    """Execute a full backtest for the given strategy and parameters."""
+
+def run_backtest(req: BacktestRequest, layout: str = "rows") -> dict:
+    """Execute a full backtest for the given strategy and parameters.
+
+    ``layout="columns"`` returns trades, equity curve and overlay as
+    parallel arrays (NumPy for the numeric series) for ``services.payloads``
+    instead of one dict per point.
+    """
+    if req.engine == "loop":
+        with span("loop"):
+            result = _run_backtest_loop(req)
+        return _rows_to_columns(result) if layout == "columns" and "error" not in result else result
+    if req.engine == "streaming":
+        # Imported here: the streaming engine is built on this module's kernel
+        from services.streaming_backtest import run_streaming_backtest
+
+        return run_streaming_backtest(req, layout)
+
+    snapshot = load_snapshot(req.symbol, req.timeframe, indicator_specs(req))
+    if snapshot is None:
+        return {"error": "No data"}
+    data, indicators = snapshot
+    return backtest_arrays(req, data, indicators, layout)
+
+
+def backtest_arrays(
+    req: BacktestRequest, data, indicators: dict, layout: str = "rows", parts: tuple = RESULT_PARTS
+) -> dict:
+    """The vectorized engine on loaded candles (``OHLCVArrays``) and indicator series.
+
+    ``parts`` picks which of the trades, equity curve and overlay go in
+    the result besides the stats and metrics.
+    """
+    # Per-request state lives here; the cached arrays are read-only.
+    ts, close = data.timestamp, data.close
+    with span("signals"):
+        signal = signals_from_indicators(req, indicators, close)
+    with span("simulate"):
+        trades, capital, exits = simulate(ts, data.high, data.low, close, signal, req)
+    with span("stats"):
+        levels, level_idx = equity_levels(len(close), req.initial_capital, exits)
+        stats = summarize(req, trades, capital, np.asarray(levels, dtype=np.float64)[level_idx])
+        exit_idx = np.array([k for k, _ in exits], dtype=np.int64)
+        metrics = performance_metrics(
+            ts[np.concatenate(([0], exit_idx))] // 1000 + IST_OFFSET_SEC,
+            levels,
+            to_chart_ts(ts[-1]),
+            trades,
+            req.initial_capital,
+            capital,
+        )
+    result = {**stats, **metrics}
+    if "trades" in parts:
+        result["trades"] = _trade_columns(trades) if layout == "columns" else trades
+    if "equity_curve" in parts:
+        with span("stats"):
+            idx, values = equity_curve_points(len(close), req.initial_capital, exits, curve_size(req))
+            times = ts[idx] // 1000 + IST_OFFSET_SEC
+        if layout == "columns":
+            result["equity_curve"] = {"time": times, "value": np.asarray(values, dtype=np.float64)}
+        else:
+            with span("sanitize"):
+                result["equity_curve"] = [
+                    {"time": t, "value": sanitize_float(v)} for t, v in zip(times.tolist(), values)
+                ]
+    if "overlay" in parts:
+        build = _overlay_columns if layout == "columns" else _build_overlay_arrays
+        with span("overlay"):
+            result["overlay"] = build(ts, overlay_series(req, indicators), req.max_points)
+    return result
+
+
+def overlay_window(req: BacktestRequest, start_ms: int | None, end_ms: int | None, layout: str = "rows") -> dict:
+    """The strategy's overlay for candles with ``start_ms <= timestamp <= end_ms``.
+
+    Lets a chart showing a downsampled overlay (``max_points``) fetch the
+    visible range at full resolution. Indicators come from the cache and
+    are computed over the whole series, so values match ``run_backtest``'s.
+    ``req.max_points`` applies to the window.
+    """
+    snapshot = load_snapshot(req.symbol, req.timeframe, indicator_specs(req))
+    if snapshot is None:
+        return {"error": "No data"}
+    data, indicators = snapshot
+    ts = data.timestamp
+    lo = 0 if start_ms is None else int(np.searchsorted(ts, start_ms, side="left"))
+    hi = len(ts) if end_ms is None else int(np.searchsorted(ts, end_ms, side="right"))
+    hi = max(lo, hi)
+    with span("overlay"):
+        series = {name: values[lo:hi] for name, values in overlay_series(req, indicators).items()}
+        build = _overlay_columns if layout == "columns" else _build_overlay_arrays
+        overlay = build(ts[lo:hi], series, req.max_points)
+    return {"candles": hi - lo, "overlay": overlay}
+
+
+def curve_size(req: BacktestRequest) -> int:
+    """Max points in the returned equity curve."""
+    return req.max_points or CURVE_POINTS
+
+
+def indicator_specs(req: BacktestRequest) -> dict[str, tuple[str, tuple]]:
+    """Indicators the strategy needs, as name → (indicator, params)."""
+    strategy = get_strategy(req.strategy)
+    if strategy is None:
+        return {}
+    return strategy.indicators(resolve_params(strategy, req))
+
+
+def signals_from_indicators(req: BacktestRequest, indicators: dict, close: np.ndarray, state: dict | None = None):
+    """Per-candle +1/-1/0 signal from the strategy's vectorized kernel.
+
+    Pass one ``state`` dict for every chunk when computing a series in
+    pieces. Returns ``None`` for an unknown strategy, which never trades.
+    """
+    strategy = get_strategy(req.strategy)
+    if strategy is None:
+        return None
+    return strategy.signal(resolve_params(strategy, req), indicators, close, state).astype(np.int8)
+
+
+def overlay_series(req: BacktestRequest, indicators: dict) -> dict[str, np.ndarray]:
+    """Chart overlay name → values for the strategy's indicators."""
+    strategy = get_strategy(req.strategy)
+    if strategy is None:
+        return {}
+    return strategy.overlay(resolve_params(strategy, req), indicators)
+
+
+def summarize(req: BacktestRequest, trades: list[dict], capital: float, equity: np.ndarray) -> dict:
+    """Headline stats for a finished run. Sanitizes ``trades`` in place."""
+    with span("sanitize"):
+        for t in trades:
+            for k, v in t.items():
+                t[k] = sanitize_float(v)
+
+    winning = [t for t in trades if t["pnl"] and t["pnl"] > 0]
+    losing = [t for t in trades if t["pnl"] and t["pnl"] < 0]
+    total_pnl = sum(t["pnl"] for t in trades if t["pnl"])
+    max_drawdown = _calc_max_drawdown_array(equity)
+
+    return {
+        "initial_capital": req.initial_capital,
+        "final_capital": round(capital, 2),
+        "total_pnl": round(total_pnl, 2),
+        "total_trades": len(trades),
+        "winning_trades": len(winning),
+        "losing_trades": len(losing),
+        "win_rate": round(len(winning) / len(trades) * 100, 1) if trades else 0,
+        "max_drawdown": round(max_drawdown, 2),
+    }
+
+
+def simulate(ts, high, low, close, signal, req: BacktestRequest):
+    """Event-driven kernel over NumPy arrays.
+
+    Jumps from one signal change to the next and resolves SL/TP exits in
+    between with ``fills.first_touch``, so Python only runs once per trade
+    instead of once per candle. Returns (trades, final capital,
+    exits) where exits is a list of (candle index, capital after exit).
+    """
+    sim = Simulator(req)
+    sim.feed(ts, high, low, close, signal)
+    return sim.finish()
+
+
+class Simulator:
+    """``simulate`` over consecutive chunks of one series.
+
+    Each ``feed`` continues from the previous chunk's last signal, open
+    position and capital, and exit indices count from the first candle of
+    the first chunk, so feeding a series in pieces gives the same result as
+    one ``simulate`` call over all of it.
+    """
+
+    def __init__(self, req: BacktestRequest):
+        self.req = req
+        self.trades = []
+        self.exits = []
+        self.capital = req.initial_capital
+        self.position = None
+        self.offset = 0  # global index of the next chunk's first candle
+        self._entry_idx = 0  # global index of the open position's entry
+        self._prev_signal = None
+        self._last = None  # (timestamp, close) of the last candle fed
+
+    def feed(self, ts, high, low, close, signal) -> None:
+        req = self.req
+        n = len(close)
+        if n == 0:
+            return
+        if signal is None:
+            changes = np.empty(0, dtype=np.int64)
+        else:
+            changes = np.flatnonzero(signal[1:] != signal[:-1]) + 1
+            if self._prev_signal is not None and signal[0] != self._prev_signal:
+                changes = np.concatenate(([0], changes))
+            self._prev_signal = signal[-1]
+        offset = self.offset
+        position = self.position
+        capital = self.capital
+        c = 0
+
+        while True:
+            if position is None:
+                if c >= len(changes):
+                    break
+                k = int(changes[c])
+                c += 1
+                price = float(close[k])
+                position = _open_position(req, signal[k], price, capital, to_chart_ts(ts[k]))
+                self._entry_idx = offset + k
+                continue
+
+            nxt = int(changes[c]) if c < len(changes) else n
+            # SL/TP is checked before the signal on the same candle, so the
+            # search window includes the next signal candle itself.
+            k, hit_sl, hit_tp = first_touch(
+                high,
+                low,
+                max(self._entry_idx - offset + 1, 0),
+                min(nxt + 1, n),
+                position["side"],
+                position["sl"],
+                position["tp"],
+            )
+            if k >= 0:
+                # Mirrors the reference loop: TP overwrites the exit price when both
+                # levels are touched on the same candle, the reason stays "SL".
+                exit_price = position["tp"] if hit_tp else position["sl"]
+                pnl, trade = _close_trade(
+                    position, exit_price, to_chart_ts(ts[k]), req.leverage, "SL" if hit_sl else "TP"
+                )
+                capital += pnl
+                self.trades.append(trade)
+                self.exits.append((offset + k, capital))
+                position = None
+                if k == nxt:
+                    c += 1
+                    price = float(close[k])
+                    position = _open_position(req, signal[k], price, capital, to_chart_ts(ts[k]))
+                    self._entry_idx = offset + k
+                continue
+
+            if nxt >= n:
+                # Still open at the end of the chunk; the next feed resumes it.
+                break
+            price = float(close[nxt])
+            pnl, trade = _close_trade(position, price, to_chart_ts(ts[nxt]), req.leverage, "signal")
+            capital += pnl
+            self.trades.append(trade)
+            self.exits.append((offset + nxt, capital))
+            c += 1
+            position = _open_position(req, signal[nxt], price, capital, to_chart_ts(ts[nxt]))
+            self._entry_idx = offset + nxt
+
+        self.position = position
+        self.capital = capital
+        self.offset = offset + n
+        self._last = (ts[-1], close[-1])
+
+    def finish(self):
+        """Close any open position on the last candle fed; same return as ``simulate``."""
+        if self.position is not None:
+            last_ts, last_close = self._last
+            pnl, trade = _close_trade(
+                self.position, float(last_close), to_chart_ts(last_ts), self.req.leverage, "end"
+            )
+            self.capital += pnl
+            self.trades.append(trade)
+            self.position = None
+        return self.trades, self.capital, self.exits
+
+
+def equity_levels(n: int, initial_capital: float, exits: list[tuple[int, float]], at: np.ndarray | None = None):
+    """Realized equity as distinct levels plus a per-candle index into them.
+
+    Levels are rounded to cents like the reference loop's curve; capital only
+    changes on exit candles, so the curve is a step function over the levels.
+    ``at`` limits the index to those candles instead of all ``n``.
+    """
+    levels = [round(initial_capital, 2)] + [round(cap, 2) for _, cap in exits]
+    exit_idx = np.array([k for k, _ in exits], dtype=np.int64)
+    return levels, np.searchsorted(exit_idx, np.arange(n) if at is None else at, side="right")
+
+
+def equity_curve_points(
+    n: int, initial_capital: float, exits: list[tuple[int, float]], max_points: int = CURVE_POINTS
+):
+    """Candle indices and equity levels of the returned equity curve.
+
+    At most ``max_points`` points; each bucket keeps its lowest and
+    highest equity (``downsample.minmax_indices``), so drawdown extremes
+    survive. Only bucket starts and exit candles are evaluated.
+    """
+    exit_idx = np.array([k for k, _ in exits], dtype=np.int64)
+    candidates = np.union1d(step_positions(n, max_points), exit_idx)
+    levels, level_idx = equity_levels(n, initial_capital, exits, at=candidates)
+    keep = minmax_indices(np.asarray(levels, dtype=np.float64)[level_idx], max_points, candidates, n)
+    return candidates[keep], [levels[j] for j in level_idx[keep].tolist()]
+
+
+def _run_backtest_loop(req: BacktestRequest) -> dict:
+    """Reference engine: walk every candle with iterrows.
+
+    Slow, but kept as the ground truth the vectorized engine is checked
+    against (``engine="loop"``). Indicator columns go on the request's own
+    shallow copy of the frame, never on the cached one.
+    """
     df = load_ohlcv(req.symbol, req.timeframe)
     if df.empty:
         return {"error": "No data"}
@@ -16,18 +332,15 @@ def run_backtest(req: BacktestRequest) -> dict:
     position = None  # {side, entry_price, size, sl, tp, entry_time}
 
     # ── Calculate indicators ──────────────────────────────────────
-    if req.strategy == "sma_cross":
-        df["fast_sma"] = compute_sma(df["close"], req.fast_period)
-        df["slow_sma"] = compute_sma(df["close"], req.slow_period)
-        df["signal"] = 0
-        df.loc[df["fast_sma"] > df["slow_sma"], "signal"] = 1
-        df.loc[df["fast_sma"] < df["slow_sma"], "signal"] = -1
-        df["signal_change"] = df["signal"].diff()
-    elif req.strategy == "rsi":
-        df["rsi"] = compute_rsi(df["close"], req.rsi_period)
-        df["signal"] = 0
-        df.loc[df["rsi"] < req.rsi_oversold, "signal"] = 1
-        df.loc[df["rsi"] > req.rsi_overbought, "signal"] = -1
+    strategy = get_strategy(req.strategy)
+    overlay_names = []
+    if strategy is not None:
+        params = resolve_params(strategy, req)
+        indicators = compute_indicators(strategy.indicators(params), df)
+        for name, values in strategy.overlay(params, indicators).items():
+            df[name] = values
+            overlay_names.append(name)
+        df["signal"] = strategy.signal(params, indicators, df["close"].to_numpy())
         df["signal_change"] = df["signal"].diff()
 
     equity_curve = []
@@ -146,9 +459,13 @@ def run_backtest(req: BacktestRequest) -> dict:
     losing = [t for t in trades if t["pnl"] and t["pnl"] < 0]
     total_pnl = sum(t["pnl"] for t in trades if t["pnl"])
     max_drawdown = _calc_max_drawdown(equity_curve)
+    equity = np.array([np.nan if e["value"] is None else e["value"] for e in equity_curve], dtype=np.float64)
+    metrics = performance_metrics(
+        [e["time"] for e in equity_curve], equity, equity_curve[-1]["time"], trades, req.initial_capital, capital
+    )
 
     # ── Build indicator overlay data ──────────────────────────────
-    overlay = _build_overlay(req, df)
+    overlay = _build_overlay(df, overlay_names, req.max_points)
 
     return {
         "initial_capital": req.initial_capital,
@@ -159,8 +476,9 @@ def run_backtest(req: BacktestRequest) -> dict:
         "losing_trades": len(losing),
         "win_rate": round(len(winning) / len(trades) * 100, 1) if trades else 0,
         "max_drawdown": round(max_drawdown, 2),
+        **metrics,
         "trades": trades,
-        "equity_curve": equity_curve[::max(1, len(equity_curve) // 500)],
+        "equity_curve": [equity_curve[i] for i in minmax_indices(equity, curve_size(req))],
         "overlay": overlay,
     }
 
@@ -168,6 +486,109 @@ def run_backtest(req: BacktestRequest) -> dict:
 # ─── Private helpers ──────────────────────────────────────────────────
 
 
+def _open_position(req: BacktestRequest, signal: int, price: float, capital: float, ts: int) -> dict:
+    side = "long" if signal == 1 else "short"
+    size = (capital * (req.position_size_pct / 100)) / price
+    sl_price = None
+    tp_price = None
+    if req.stop_loss_pct:
+        sl_price = (
+            price * (1 - req.stop_loss_pct / 100)
+            if side == "long"
+            else price * (1 + req.stop_loss_pct / 100)
+        )
+    if req.take_profit_pct:
+        tp_price = (
+            price * (1 + req.take_profit_pct / 100)
+            if side == "long"
+            else price * (1 - req.take_profit_pct / 100)
+        )
+    return {
+        "side": side,
+        "entry_price": price,
+        "size": size,
+        "sl": sl_price,
+        "tp": tp_price,
+        "entry_time": ts,
+    }
+
+
+def _close_trade(position: dict, exit_price: float, exit_ts: int, leverage: float, reason: str):
+    pnl = _calc_pnl(position, exit_price, leverage)
+    trade = {
+        "side": position["side"],
+        "entry_price": position["entry_price"],
+        "exit_price": exit_price,
+        "entry_time": position["entry_time"],
+        "exit_time": exit_ts,
+        "pnl": round(pnl, 2),
+        "exit_reason": reason,
+    }
+    return pnl, trade
+
+
+def _calc_max_drawdown_array(equity: np.ndarray) -> float:
+    if len(equity) == 0:
+        return 0
+    values = np.where(np.isfinite(equity), equity, 0.0)
+    peak = np.maximum.accumulate(values)
+    max_dd = float((peak - values).max())
+    return max_dd if max_dd > 0 else 0
+
+
+def _build_overlay_arrays(ts: np.ndarray, indicators: dict[str, np.ndarray], max_points: int | None = None) -> dict:
+    overlay = {}
+    for name, values in indicators.items():
+        times, values = _overlay_points(ts, values, max_points)
+        overlay[name] = [
+            {"time": t, "value": sanitize_float(v)} for t, v in zip(times.tolist(), values.tolist())
+        ]
+    return overlay
+
+
+def _overlay_columns(ts: np.ndarray, indicators: dict[str, np.ndarray], max_points: int | None = None) -> dict:
+    overlay = {}
+    for name, values in indicators.items():
+        times, values = _overlay_points(ts, values, max_points)
+        overlay[name] = {"time": times, "value": values}
+    return overlay
+
+
+def _overlay_points(ts: np.ndarray, values: np.ndarray, max_points: int | None) -> tuple[np.ndarray, np.ndarray]:
+    """Chart times and values of one overlay series: NaN dropped, then min/max downsampled."""
+    values = np.asarray(values, dtype=np.float64)
+    mask = ~np.isnan(values)
+    times, values = ts[mask] // 1000 + IST_OFFSET_SEC, values[mask]
+    if max_points is not None:
+        keep = minmax_indices(values, max_points)
+        times, values = times[keep], values[keep]
+    return times, values
+
+
+def _trade_columns(trades: list[dict]) -> dict:
+    fields = ("side", "entry_price", "exit_price", "entry_time", "exit_time", "pnl", "exit_reason")
+    return {field: [t[field] for t in trades] for field in fields}
+
+
+def _rows_to_columns(result: dict) -> dict:
+    """Columnar layout of a row-layout result (used for the reference loop)."""
+    def column(points: list[dict], field: str) -> np.ndarray:
+        return np.array([np.nan if p[field] is None else p[field] for p in points], dtype=np.float64)
+
+    return {
+        **result,
+        "trades": _trade_columns(result["trades"]),
+        "equity_curve": {
+            "time": np.array([p["time"] for p in result["equity_curve"]], dtype=np.int64),
+            "value": column(result["equity_curve"], "value"),
+        },
+        "overlay": {
+            name: {"time": np.array([p["time"] for p in points], dtype=np.int64), "value": column(points, "value")}
+            for name, points in result["overlay"].items()
+        },
+    }
+
+
 def _calc_pnl(position: dict, exit_price: float, leverage: float) -> float:
     if position["side"] == "long":
         return position["size"] * (exit_price - position["entry_price"]) * leverage
@@ -190,20 +611,6 @@ def _calc_max_drawdown(equity_curve: list[dict]) -> float:
     return max_dd
 
 
-def _build_overlay(req: BacktestRequest, df) -> dict:
-    overlay = {}
-    if req.strategy == "sma_cross":
-        overlay["fast_sma"] = [
-            {"time": to_chart_ts(r["timestamp"]), "value": sanitize_float(r["fast_sma"])}
-            for _, r in df.iterrows() if not pd.isna(r["fast_sma"])
-        ]
-        overlay["slow_sma"] = [
-            {"time": to_chart_ts(r["timestamp"]), "value": sanitize_float(r["slow_sma"])}
-            for _, r in df.iterrows() if not pd.isna(r["slow_sma"])
-        ]
-    elif req.strategy == "rsi":
-        overlay["rsi"] = [
-            {"time": to_chart_ts(r["timestamp"]), "value": sanitize_float(r["rsi"])}
-            for _, r in df.iterrows() if not pd.isna(r.get("rsi", float("nan")))
-        ]
-    return overlay
+def _build_overlay(df, names: list[str], max_points: int | None = None) -> dict:
+    ts = df["timestamp"].to_numpy(dtype=np.int64)
+    return _build_overlay_arrays(ts, {name: df[name].to_numpy(dtype=np.float64) for name in names}, max_points)
@@ -0,0 +1,59 @@
+"""Many backtests in one call, sharing the work they have in common.
+
+Requests are grouped by (symbol, timeframe). A group loads its candles
+once and computes each distinct indicator (name, params) once, then runs
+every request's signals and simulation on them with the vectorized
+engine; a request asking for another ``engine`` gets an error result.
+Groups run in parallel on the shared ``"batch"`` helper pool (see
+``job_queue.fan_out``) when there are several.
+
+Results come back in request order and are compact: stats and metrics,
+plus trades and the equity curve only when asked for, never the overlay.
+"""
+from functools import partial
+
+from config import BATCH_MAX_BACKTESTS, BATCH_MAX_WORKERS
+from models.schemas import BacktestBatchRequest, BacktestRequest
+from services.backtest_engine import backtest_arrays, indicator_specs
+from services.data_service import load_snapshot
+from services.job_queue import fan_out
+
+
+def run_backtest_batch(req: BacktestBatchRequest) -> dict:
+    """Run every backtest of ``req``; per-request ``{"error": ...}`` on failure."""
+    if len(req.backtests) > BATCH_MAX_BACKTESTS:
+        return {"error": f"Batch has {len(req.backtests)} backtests (max {BATCH_MAX_BACKTESTS})"}
+    parts = tuple(
+        part for part, wanted in (("trades", req.include_trades), ("equity_curve", req.include_equity_curve))
+        if wanted
+    )
+    results = [None] * len(req.backtests)
+    groups: dict[tuple[str, str], list[int]] = {}
+    for i, r in enumerate(req.backtests):
+        if r.engine != "vectorized":
+            results[i] = {"error": f"Batches run the vectorized engine only (got engine={r.engine!r})"}
+        else:
+            groups.setdefault((r.symbol, r.timeframe), []).append(i)
+    batches = [[req.backtests[i] for i in indices] for indices in groups.values()]
+
+    workers = max(1, min(req.max_workers or BATCH_MAX_WORKERS, BATCH_MAX_WORKERS))
+    outcomes = fan_out("batch", BATCH_MAX_WORKERS, partial(run_group, parts=parts), batches, workers)
+
+    for indices, outcome in zip(groups.values(), outcomes):
+        for i, result in zip(indices, outcome):
+            results[i] = result
+    return {"groups": len(batches), "results": results}
+
+
+def run_group(requests: list[BacktestRequest], parts: tuple = ()) -> list[dict]:
+    """Backtests of one symbol and timeframe, loading the candles and each indicator once."""
+    specs = [indicator_specs(r) for r in requests]
+    unique = {spec: spec for named in specs for spec in named.values()}
+    snapshot = load_snapshot(requests[0].symbol, requests[0].timeframe, unique)
+    if snapshot is None:
+        return [{"error": "No data"} for _ in requests]
+    data, series = snapshot
+    return [
+        backtest_arrays(r, data, {name: series[spec] for name, spec in named.items()}, parts=parts)
+        for r, named in zip(requests, specs)
+    ]
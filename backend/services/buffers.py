@@ -0,0 +1,67 @@
+"""Growable column buffers for cached frames that live candles are appended to.
+
+``extend(column, new)`` is ``np.concatenate((column, new))`` without the
+copy when it can be avoided: columns it returns are prefix views of a
+buffer with spare rows, and the next ``extend`` of such a view writes into
+those spare rows. Rows covered by a view handed out earlier are never
+written, so frames and arrays already handed out stay unchanged. A column
+that is not the full written prefix of a buffer (a memory-mapped store
+column, a frame whose last row is being replaced) is copied into a new
+buffer with room to grow, so appends cost amortized O(len(new)).
+
+Spare rows (at most a quarter of the written rows, at least
+``MIN_SPARE_ROWS``) are not counted by ``frame_cache.frame_nbytes``.
+"""
+import weakref
+
+import numpy as np
+
+MIN_SPARE_ROWS = 4096
+
+# id(buffer) → (weak reference to it, rows written so far)
+_written: dict[int, tuple[weakref.ref, int]] = {}
+
+
+def extend(column: np.ndarray, new) -> np.ndarray:
+    """``column`` followed by ``new`` (cast to ``column``'s dtype), as a view of a growable buffer."""
+    new = np.asarray(new, dtype=column.dtype)
+    n, rows = len(column), len(column) + len(new)
+    buf, written = _buffer_of(column)
+    if buf is not None:
+        # Rows [n, written) belong to views handed out earlier: usable only
+        # if they already hold the leading values of ``new``
+        overlap = written - n
+        if len(buf) < rows or overlap > len(new) or not _same(buf[n:written], new[:overlap]):
+            buf = None
+    if buf is None:
+        buf = np.empty(rows + max(rows // 4, MIN_SPARE_ROWS), dtype=column.dtype)
+        buf[:n] = column
+        written = n
+        _track(buf)
+    buf[written:rows] = new[written - n :]
+    _written[id(buf)] = (_written[id(buf)][0], max(written, rows))
+    return buf[:rows]
+
+
+# ─── Private helpers ──────────────────────────────────────────────────
+
+
+def _buffer_of(column: np.ndarray) -> tuple[np.ndarray | None, int]:
+    """The tracked buffer ``column`` is a leading view of, and its rows written."""
+    buf = column.base
+    entry = _written.get(id(buf)) if buf is not None else None
+    if entry is None or entry[0]() is not buf:
+        return None, 0
+    written = entry[1]
+    if column.ndim != 1 or column.strides != buf.strides or column.ctypes.data != buf.ctypes.data or len(column) > written:
+        return None, 0
+    return buf, written
+
+
+def _track(buf: np.ndarray) -> None:
+    key = id(buf)
+    _written[key] = (weakref.ref(buf, lambda _: _written.pop(key, None)), 0)
+
+
+def _same(a: np.ndarray, b: np.ndarray) -> bool:
+    return np.array_equal(a, b, equal_nan=a.dtype.kind in "fc")
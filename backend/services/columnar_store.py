@@ -0,0 +1,269 @@
+"""Columnar on-disk copy of the raw 1m CSVs.
+
+Each symbol's raw source (its ingested segments, see
+``services/segments.py``, or else ``DATA_DIR/<symbol>.csv``) is converted
+to ``DATA_DIR/<symbol>.cols/`` holding one ``.npy`` file per column. The arrays are opened with
+``mmap_mode="r"`` so a cold load maps the file instead of parsing text, and
+the OS page cache is shared between workers.
+
+Resampled rollups (see ``services/rollups.py``) are persisted the same way
+in ``<symbol>.cols/<timeframe>/``.
+
+Every store path is a symlink to a versioned directory next to it
+(``.<name>.<random>``); rewriting a store writes a new version and swaps
+the link with ``os.replace``, so readers always find a complete store.
+
+Each store's marker records how many rows it holds and the version of the
+raw source they came from (``source_version``): a store is fresh while that
+is still the source's version, and a rollup while it was built from the
+same version as the 1m store. Live candles are appended to the 1m store in
+place (``append_store``), so it stays fresh without re-parsing the source;
+its rollups are rebuilt from it on their next load.
+
+Run ``python -m services.columnar_store [SYMBOL ...]`` from ``backend/`` to
+convert ahead of time; otherwise the loader converts on first use.
+"""
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from config import DATA_DIR
+from services import segments
+
+COLUMNS = ("datetime", "timestamp", "open", "high", "low", "close", "volume")
+STORE_SUFFIX = ".cols"
+# Written last, as JSON {"rows", "source"}: only the rows it lists are read.
+_MARKER = "_complete"
+
+
+def csv_path(symbol: str) -> str:
+    return os.path.join(DATA_DIR, f"{symbol}.csv")
+
+
+def store_path(symbol: str, timeframe: str | None = None) -> str:
+    path = os.path.join(DATA_DIR, f"{symbol}{STORE_SUFFIX}")
+    return os.path.join(path, timeframe) if timeframe else path
+
+
+def is_fresh(symbol: str, timeframe: str | None = None) -> bool:
+    """True when a complete store exists and holds the current raw source.
+
+    A rollup must also have been built from the same source as the 1m store.
+    """
+    raw = _read_marker(store_path(symbol))
+    if raw is None or raw["source"] != source_version(symbol):
+        return False
+    if timeframe:
+        rollup = _read_marker(store_path(symbol, timeframe))
+        return rollup is not None and rollup["source"] == raw["source"]
+    return True
+
+
+def source_version(symbol: str) -> dict:
+    """{file: rows} of the symbol's segments, or the legacy CSV's modification time."""
+    if segments.has_segments(symbol):
+        return {s["file"]: s["rows"] for s in segments.load_manifest(symbol)["segments"]}
+    csv_file = csv_path(symbol)
+    return {csv_file: os.path.getmtime(csv_file)} if os.path.exists(csv_file) else {}
+
+
+def source_files(symbol: str) -> list[str]:
+    """Raw CSV files of a symbol in time order: its segments, or else ``<symbol>.csv``."""
+    if segments.has_segments(symbol):
+        return segments.segment_files(symbol)
+    return [csv_path(symbol)] if os.path.exists(csv_path(symbol)) else []
+
+
+def read_csv(symbol: str) -> pd.DataFrame:
+    """Parse the raw source the same way the loader always has."""
+    frames = [pd.read_csv(f, parse_dates=["datetime"]) for f in source_files(symbol)]
+    df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    return df.sort_values("datetime").reset_index(drop=True)
+
+
+def write_store(symbol: str, df: pd.DataFrame, timeframe: str | None = None, source: dict | None = None) -> None:
+    """Write ``df`` as one ``.npy`` per column, replacing any previous store.
+
+    ``source`` is the ``source_version`` the rows come from (for a rollup,
+    that of the 1m rows it was built from); without it the store is stale.
+
+    The columns go to a new version directory that the store's link is
+    switched to (``_swap_in``), so concurrent writers never share files and
+    the old version is only deleted once the new one is in place. Rewriting
+    the 1m store drops its rollups along with it.
+    """
+    final = store_path(symbol, timeframe)
+    parent, name = os.path.split(final)
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=f".{name}.", dir=parent)
+    try:
+        for col in COLUMNS:
+            np.save(os.path.join(tmp, f"{col}.npy"), df[col].to_numpy())
+        _write_marker(tmp, len(df), source)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    _swap_in(tmp, final)
+
+
+def load_store(symbol: str, timeframe: str | None = None) -> pd.DataFrame:
+    """Open a store zero-copy: every column is a read-only memmap."""
+    return pd.DataFrame(open_columns(store_path(symbol, timeframe)), copy=False)
+
+
+def open_columns(path: str) -> dict[str, np.ndarray]:
+    """{column: read-only memmap} of the store at ``path``, cut to the rows its marker lists.
+
+    The link is resolved once, so marker and columns come from one version.
+    """
+    version = os.path.realpath(path)
+    while True:
+        try:
+            return _open_version(version)
+        except FileNotFoundError:
+            # Swapped, and the old version deleted, while it was being opened
+            version, resolved = os.path.realpath(path), version
+            if version == resolved:
+                raise
+
+
+def append_store(symbol: str, new: pd.DataFrame, before: dict, after: dict) -> bool:
+    """Append 1m rows to the store in place, taking it from source version ``before`` to ``after``.
+
+    Only when the store holds exactly ``before`` and ``new`` starts after
+    its last row. The column files grow at the end and the marker is
+    replaced last, so readers never see a partial append. Returns whether
+    the rows were appended; if not, the store is left to be rebuilt.
+    """
+    path = os.path.realpath(store_path(symbol))
+    marker = _read_marker(path)
+    if marker is None or marker["source"] != before or new.empty:
+        return False
+    rows = marker["rows"]
+    try:
+        ts = np.load(os.path.join(path, "timestamp.npy"), mmap_mode="r")
+        if rows and new["timestamp"].to_numpy()[0] <= ts[rows - 1]:
+            return False
+        del ts
+        for col in COLUMNS:
+            _append_column(os.path.join(path, f"{col}.npy"), rows, new[col].to_numpy())
+        _write_marker(path, rows + len(new), after)
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+def convert(symbol: str) -> None:
+    """(Re)build the store for one symbol from its raw source."""
+    source = source_version(symbol)
+    write_store(symbol, read_csv(symbol), source=source)
+
+
+def remove_store(symbol: str) -> None:
+    """Delete a symbol's store: its link, the version it points to and that version's rollups."""
+    final = store_path(symbol)
+    version = os.path.realpath(final)
+    if os.path.islink(final):
+        os.unlink(final)
+    shutil.rmtree(version, ignore_errors=True)
+
+
+def list_store_symbols() -> list[str]:
+    if not os.path.isdir(DATA_DIR):
+        return []
+    return [
+        f[: -len(STORE_SUFFIX)]
+        for f in os.listdir(DATA_DIR)
+        if f.endswith(STORE_SUFFIX) and os.path.exists(os.path.join(DATA_DIR, f, _MARKER))
+    ]
+
+
+# ─── Private helpers ──────────────────────────────────────────────────
+
+
+def _read_marker(path: str) -> dict | None:
+    try:
+        with open(os.path.join(path, _MARKER)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None  # missing, or written by an older version
+
+
+def _open_version(path: str) -> dict[str, np.ndarray]:
+    rows = (_read_marker(path) or {}).get("rows")
+    return {col: np.load(os.path.join(path, f"{col}.npy"), mmap_mode="r")[:rows] for col in COLUMNS}
+
+
+def _write_marker(path: str, rows: int, source: dict | None) -> None:
+    tmp = os.path.join(path, _MARKER + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump({"rows": rows, "source": source}, f)
+    os.replace(tmp, os.path.join(path, _MARKER))
+
+
+def _append_column(path: str, rows: int, values: np.ndarray) -> None:
+    """Write ``values`` after the first ``rows`` of a ``.npy`` file and grow its header's shape.
+
+    ``np.save`` pads the header so the shape can grow without moving the
+    data; raises ValueError if it cannot.
+    """
+    fmt = np.lib.format
+    with open(path, "r+b") as f:
+        version = fmt.read_magic(f)
+        read_header = fmt.read_array_header_1_0 if version == (1, 0) else fmt.read_array_header_2_0
+        _, _, dtype = read_header(f)
+        offset = f.tell()
+        header = io.BytesIO()
+        write_header = fmt.write_array_header_1_0 if version == (1, 0) else fmt.write_array_header_2_0
+        write_header(header, {"descr": fmt.dtype_to_descr(dtype), "fortran_order": False, "shape": (rows + len(values),)})
+        if header.tell() != offset:
+            raise ValueError(f"{path}: header cannot grow in place")
+        f.truncate(offset + rows * dtype.itemsize)
+        f.seek(0, os.SEEK_END)
+        f.write(np.ascontiguousarray(values.astype(dtype, copy=False)).tobytes())
+        f.seek(0)
+        f.write(header.getvalue())
+
+
+def _swap_in(tmp: str, final: str) -> None:
+    """Point the link ``final`` at the finished store ``tmp``, then delete the version it replaced.
+
+    The new link is made under a private name and renamed over ``final``
+    with ``os.replace``, which is atomic: there is no moment without a
+    store at ``final``. A store written before versioned directories (a
+    plain directory at ``final``) is first moved aside, once.
+    """
+    parent = os.path.dirname(final)
+    try:
+        previous = os.path.join(parent, os.readlink(final))
+    except FileNotFoundError:
+        previous = None
+    except OSError:
+        previous = tmp + ".old"
+        try:
+            os.rename(final, previous)
+        except FileNotFoundError:
+            pass  # another writer moved it first
+    link = tmp + ".link"
+    os.symlink(os.path.basename(tmp), link)
+    os.replace(link, final)
+    if previous is not None:
+        shutil.rmtree(previous, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    symbols = sys.argv[1:] or sorted(
+        {f[:-4] for f in os.listdir(DATA_DIR) if f.endswith(".csv")} | set(segments.list_segment_symbols())
+    )
+    for sym in symbols:
+        if is_fresh(sym):
+            print(f"{sym}: up to date")
+            continue
+        convert(sym)
+        print(f"{sym}: converted → {store_path(sym)}")
@@ -0,0 +1,222 @@
+"""Compact in-memory encoding of cached OHLCV frames (``COMPACT_CACHE=1``).
+
+A loaded frame holds a parsed ``datetime`` next to the int64 ``timestamp``
+and float64 prices and volume, about 56 bytes per candle. ``CompactFrame``
+keeps instead:
+
+- the time as int32 minutes since the first candle (int64 milliseconds if
+  a candle is off the minute); ``datetime`` is derived from it on demand
+  when it is the IST wall-clock time of ``timestamp``, as the loaders make it;
+- each price and volume column as int32 scaled by a power of ten when that
+  round-trips exactly (exchange prices have a fixed number of decimals),
+  else float32 when that round-trips, else float64.
+
+Every encoding is lossless: decoded columns are the float64 values the
+frame held, so backtests (which compute PnL in float64 on decoded arrays)
+give the same results. Rows are decoded per request, and only the rows
+asked for (``to_frame(lo, hi)``). ``nbytes``/``full_nbytes`` give the savings.
+"""
+import bisect
+
+import numpy as np
+import pandas as pd
+
+from config import IST_OFFSET_SEC
+from services import buffers
+
+MINUTE_MS = 60_000
+VALUE_COLUMNS = ("open", "high", "low", "close", "volume")
+MAX_DECIMALS = 8
+_INT32 = np.iinfo(np.int32)
+_NAN = _INT32.min  # int32 stand-in for NaN
+
+
+class CompactFrame:
+    """Read-only OHLCV frame in the compact encoding; see the module docstring."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.columns = tuple(df.columns)
+        self.full_nbytes = int(df.memory_usage(index=True, deep=True).sum())
+        self._len = len(df)
+        self._time = _encode_time(df["timestamp"].to_numpy(dtype=np.int64))
+        # datetime64 dtype to derive the column with, or None when it is stored
+        self._datetime_dtype = _derived_datetime(df)
+        self._values = {col: _encode_values(df[col].to_numpy(dtype=np.float64)) for col in VALUE_COLUMNS}
+        # Anything else (e.g. a datetime that is not derivable) is kept as is
+        skip = {"timestamp", *VALUE_COLUMNS} | ({"datetime"} if self._datetime_dtype is not None else set())
+        self._other = {col: df[col].to_numpy() for col in self.columns if col not in skip}
+
+    def __len__(self) -> int:
+        return self._len
+
+    @property
+    def empty(self) -> bool:
+        return self._len == 0
+
+    def __getitem__(self, name: str) -> pd.Series:
+        return pd.Series(self.column(name), name=name, copy=False)
+
+    @property
+    def nbytes(self) -> int:
+        encoded = [self._time[1], *(values for values, _ in self._values.values()), *self._other.values()]
+        return sum(int(arr.nbytes) for arr in encoded)
+
+    def column(self, name: str, lo: int = 0, hi: int | None = None) -> np.ndarray:
+        """Rows [lo, hi) of one column, decoded (float64 prices, int64 timestamp)."""
+        if name == "timestamp":
+            base, offsets = self._time
+            if offsets.dtype == np.int64:
+                return offsets[lo:hi].copy()
+            return base + offsets[lo:hi].astype(np.int64) * MINUTE_MS
+        if name == "datetime" and self._datetime_dtype is not None:
+            ms = self.column("timestamp", lo, hi) + IST_OFFSET_SEC * 1000
+            return ms.astype("datetime64[ms]").astype(self._datetime_dtype)
+        if name in self._values:
+            values, scale = self._values[name]
+            return _decode_values(values[lo:hi], scale)
+        return self._other[name][lo:hi]
+
+    def extend(self, df: pd.DataFrame, keep: int | None = None) -> "CompactFrame | None":
+        """Rows [0, ``keep``) of this frame followed by ``df``, in this frame's encodings.
+
+        Encoded columns grow in place where they can (``buffers.extend``);
+        this frame is left as is. Returns ``None`` when ``df``'s rows do not
+        round-trip in those encodings; re-encode the whole frame then.
+        """
+        keep = self._len if keep is None else keep
+        base, offsets = self._time
+        ts = df["timestamp"].to_numpy(dtype=np.int64)
+        if offsets.dtype != np.int64:
+            if (ts % MINUTE_MS).any():
+                return None
+            minutes = (ts - base) // MINUTE_MS
+            if len(minutes) and (minutes.min() < _INT32.min + 1 or minutes.max() > _INT32.max):
+                return None
+            ts = minutes
+        if self._datetime_dtype is not None:
+            ms = df["timestamp"].to_numpy(dtype=np.int64) + IST_OFFSET_SEC * 1000
+            dt = df["datetime"].to_numpy().astype(self._datetime_dtype)
+            if not np.array_equal(ms.astype("datetime64[ms]").astype(self._datetime_dtype), dt):
+                return None
+        values = {}
+        for col, (encoded, scale) in self._values.items():
+            new = _encode_like(df[col].to_numpy(dtype=np.float64), encoded.dtype, scale)
+            if new is None:
+                return None
+            values[col] = (buffers.extend(encoded[:keep], new), scale)
+
+        grown = object.__new__(CompactFrame)
+        grown.columns = self.columns
+        grown.full_nbytes = (self.full_nbytes * keep) // max(self._len, 1) + int(
+            df.memory_usage(index=False, deep=True).sum()
+        )
+        grown._len = keep + len(df)
+        grown._time = (base, buffers.extend(offsets[:keep], ts))
+        grown._datetime_dtype = self._datetime_dtype
+        grown._values = values
+        grown._other = {col: buffers.extend(arr[:keep], df[col].to_numpy()) for col, arr in self._other.items()}
+        return grown
+
+    def searchsorted(self, ms: int, side: str = "left") -> int:
+        """``np.searchsorted`` of timestamp ``ms`` on the encoded times, without decoding them."""
+        base, offsets = self._time
+        if offsets.dtype == np.int64:
+            return int(np.searchsorted(offsets, ms, side=side))
+        # Whole minutes after base: ts <= ms for side="right", ts < ms for side="left"
+        minutes = (ms - base) // MINUTE_MS if side == "right" else -((base - ms) // MINUTE_MS)
+        minutes = min(max(minutes, _INT32.min), _INT32.max)
+        return int(np.searchsorted(offsets, np.int32(minutes), side=side))
+
+    def bisect(self, name: str, value, side: str = "left") -> int:
+        """``np.searchsorted`` of ``value`` on a sorted column, decoding only the rows it visits."""
+        search = bisect.bisect_left if side == "left" else bisect.bisect_right
+        return search(_Rows(self, name), value)
+
+    def to_frame(self, lo: int = 0, hi: int | None = None) -> pd.DataFrame:
+        """Rows [lo, hi) as a regular DataFrame with the original columns."""
+        return pd.DataFrame({col: self.column(col, lo, hi) for col in self.columns}, copy=False)
+
+
+# ─── Private helpers ──────────────────────────────────────────────────
+
+
+class _Rows:
+    """One column of a CompactFrame as a sequence, decoded a row at a time."""
+
+    def __init__(self, frame: CompactFrame, name: str):
+        self._frame = frame
+        self._name = name
+
+    def __len__(self) -> int:
+        return len(self._frame)
+
+    def __getitem__(self, i: int):
+        return self._frame.column(self._name, i, i + 1)[0]
+
+
+def _encode_time(ts: np.ndarray) -> tuple[int, np.ndarray]:
+    """(base, offsets): int32 minutes after ``base``, or (0, ts) when that is lossy."""
+    if len(ts) == 0 or (ts % MINUTE_MS).any():
+        return 0, ts.copy()
+    minutes = (ts - ts[0]) // MINUTE_MS
+    if minutes.min() < _INT32.min + 1 or minutes.max() > _INT32.max:
+        return 0, ts.copy()
+    return int(ts[0]), minutes.astype(np.int32)
+
+
+def _derived_datetime(df: pd.DataFrame):
+    """dtype to rebuild ``datetime`` from ``timestamp`` with, if it can be derived exactly."""
+    if "datetime" not in df:
+        return None
+    dt = df["datetime"].to_numpy()
+    if dt.dtype.kind != "M":
+        return None
+    ms = df["timestamp"].to_numpy(dtype=np.int64) + IST_OFFSET_SEC * 1000
+    return dt.dtype if np.array_equal(ms.astype("datetime64[ms]").astype(dt.dtype), dt) else None
+
+
+def _encode_values(values: np.ndarray) -> tuple[np.ndarray, float | None]:
+    """(encoded, scale): scaled int32, else float32 (scale None), else float64; all lossless."""
+    nan = np.isnan(values)
+    finite = values[~nan]
+    if np.isfinite(finite).all():
+        for decimals in range(MAX_DECIMALS + 1):
+            scale = 10.0 ** decimals
+            scaled = np.round(finite * scale)
+            if len(scaled) and (scaled.min() <= _NAN or scaled.max() > _INT32.max):
+                break
+            if np.array_equal(scaled / scale, finite):
+                encoded = np.full(len(values), _NAN, dtype=np.int32)
+                encoded[~nan] = scaled
+                return encoded, scale
+    single = values.astype(np.float32)
+    if np.array_equal(single.astype(np.float64), values, equal_nan=True):
+        return single, None
+    return values.copy(), None
+
+
+def _encode_like(values: np.ndarray, dtype: np.dtype, scale: float | None) -> np.ndarray | None:
+    """``values`` in an existing column's encoding, or ``None`` if they do not round-trip in it."""
+    if scale is None:
+        encoded = values.astype(dtype)
+        return encoded if np.array_equal(encoded.astype(np.float64), values, equal_nan=True) else None
+    nan = np.isnan(values)
+    finite = values[~nan]
+    scaled = np.round(finite * scale)
+    if not np.isfinite(finite).all() or (len(scaled) and (scaled.min() <= _NAN or scaled.max() > _INT32.max)):
+        return None
+    if not np.array_equal(scaled / scale, finite):
+        return None
+    encoded = np.full(len(values), _NAN, dtype=np.int32)
+    encoded[~nan] = scaled
+    return encoded
+
+
+def _decode_values(encoded: np.ndarray, scale: float | None) -> np.ndarray:
+    if scale is None:
+        return encoded.astype(np.float64)
+    # Exact: an int32 is exact in float64 and the division rounds correctly,
+    # giving the same double as parsing the decimal text
+    values = encoded / scale
+    values[encoded == _NAN] = np.nan
+    return values
@@ -1,53 +1,593 @@
 import os
+import copy
+import logging
 import math
+import threading
+import time
+from typing import NamedTuple
+
 import numpy as np
 import pandas as pd
 
-from config import DATA_DIR, TIMEFRAME_MAP, IST_OFFSET_SEC
+from config import DATA_DIR, TIMEFRAME_MAP, IST_OFFSET_SEC, COLUMNAR_STORE, CACHE_MAX_BYTES, COMPACT_CACHE, LIVE_POLL_SEC
+from services import buffers, columnar_store, segments
+from services.compact import CompactFrame
+from services.frame_cache import FrameCache
+from services.indicators import INDICATORS
+from services.rollups import build_rollups, ordered_timeframes, rollup
+from services.timing import span
+
+logger = logging.getLogger(__name__)
+
+# ── In-memory LRU cache under one byte budget ────────────────────
+#   raw tier:       symbol → raw 1m frame
+#   derived tier:   (symbol, timeframe) → resampled frame
+#                   (frames are DataFrames, or CompactFrames with COMPACT_CACHE)
+#   indicator tier: (symbol, timeframe, name, params) → _IndicatorEntry,
+#                   children of the frame they were computed from
+_cache = FrameCache(CACHE_MAX_BYTES)
+# One lock per symbol so concurrent first requests build its rollups once
+_rollup_locks: dict[str, threading.Lock] = {}
+_rollup_locks_guard = threading.Lock()
+# symbol → columnar_store.source_version() of the data its cached raw frame holds
+_synced: dict[str, dict] = {}
+_watcher_started = False
+
 
-# ── In-memory cache: symbol → raw 1m DataFrame ──────────────────
-_cache: dict[str, pd.DataFrame] = {}
-# ── Resampled cache: (symbol, timeframe) → resampled DataFrame ──
-_resample_cache: dict[tuple[str, str], pd.DataFrame] = {}
+class _IndicatorEntry(NamedTuple):
+    """Cached indicator values plus the indicator object as it was before the
+    last candle, so an appended tail (which may revise that candle) resumes
+    from it instead of recomputing the whole series."""
+    values: object
+    resume: object
 
 
-def _load_raw(symbol: str) -> pd.DataFrame:
-    """Load raw 1m CSV into cache (once per symbol)."""
-    if symbol in _cache:
-        return _cache[symbol]
-    path = os.path.join(DATA_DIR, f"{symbol}.csv")
-    if not os.path.exists(path):
-        return pd.DataFrame()
-    df = pd.read_csv(path, parse_dates=["datetime"])
-    df = df.sort_values("datetime").reset_index(drop=True)
-    _cache[symbol] = df
+def _load_raw(symbol: str) -> pd.DataFrame | CompactFrame:
+    """Load raw 1m data into cache (once per symbol).
+
+    Prefers the memory-mapped columnar store, (re)building it from the raw
+    segments or CSV when it is missing or older; falls back to the parsed
+    source if the store cannot be written.
+    """
+    cached = _cache.get(symbol, tier="raw")
+    if cached is not None:
+        return cached
+    # Taken before reading: anything written meanwhile is picked up by refresh_symbol
+    version = columnar_store.source_version(symbol)
+    with span("load"):
+        if COLUMNAR_STORE and columnar_store.is_fresh(symbol):
+            df = columnar_store.load_store(symbol)
+        elif columnar_store.source_files(symbol):
+            df = columnar_store.read_csv(symbol)
+            if COLUMNAR_STORE:
+                try:
+                    columnar_store.write_store(symbol, df, source=version)
+                    df = columnar_store.load_store(symbol)
+                except OSError:
+                    pass
+        else:
+            return pd.DataFrame()
+        df = _compact(df)
+    _cache.put(symbol, df, tier="raw")
+    _synced[symbol] = version
     return df
 
 
+def list_symbols() -> list[str]:
+    """Symbols available as a CSV, ingested segments or a columnar store."""
+    csvs = [f[:-4] for f in os.listdir(DATA_DIR) if f.endswith(".csv")]
+    stores = columnar_store.list_store_symbols() if COLUMNAR_STORE else []
+    return sorted(set(csvs) | set(segments.list_segment_symbols()) | set(stores))
+
+
+class OHLCVArrays(NamedTuple):
+    """Read-only column views of a cached OHLCV frame."""
+    timestamp: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+
 def load_ohlcv(symbol: str, timeframe: str = "1m") -> pd.DataFrame:
-    """Load OHLCV data, resampled to the requested timeframe. Cached."""
-    key = (symbol, timeframe)
-    if key in _resample_cache:
-        return _resample_cache[key]
+    """Load OHLCV data, resampled to the requested timeframe. Cached.
+
+    Returns a shallow copy: with pandas copy-on-write, callers may add or
+    overwrite columns without touching the shared cached frame.
+    """
+    return _rows(_load_cached(symbol, timeframe)).copy(deep=False)
+
+
+def load_arrays(symbol: str, timeframe: str = "1m") -> OHLCVArrays | None:
+    """Zero-copy, write-locked NumPy views of the cached OHLCV columns.
+
+    Per-request indicator and signal arrays should live alongside these,
+    never on the cached frame. With ``COMPACT_CACHE`` the columns are
+    decoded to fresh float64 arrays instead. Returns ``None`` when there is
+    no data.
+    """
+    df = _load_cached(symbol, timeframe)
+    if df.empty:
+        return None
+    return _arrays(df)
+
+
+def load_snapshot(symbol: str, timeframe: str, specs: dict) -> tuple[OHLCVArrays, dict] | None:
+    """``load_arrays`` plus ``load_indicator`` of each of ``specs`` (name → (indicator, params)).
+
+    All come from one snapshot of the cached frame, so candles appended
+    between the two lookups cannot leave an indicator longer than the
+    columns. Returns ``None`` when there is no data.
+    """
+    df = _load_cached(symbol, timeframe)
+    if df.empty:
+        return None
+    indicators = {name: _indicator(symbol, timeframe, df, *spec) for name, spec in specs.items()}
+    return _arrays(df), indicators
+
+
+def candle_range(
+    symbol: str,
+    timeframe: str,
+    start_ms: int | None = None,
+    end_ms: int | None = None,
+    limit: int | None = None,
+) -> tuple[int, int]:
+    """Row bounds [lo, hi) of candles with ``start_ms < timestamp < end_ms``.
+
+    Binary search over the sorted timestamp column, so paging costs
+    O(log n) regardless of history length. With ``limit``, the window keeps
+    the first ``limit`` rows after ``start_ms`` when a start is given (cursor
+    paging forward), otherwise the last ``limit`` rows before ``end_ms``.
+    """
+    return _candle_range(_load_cached(symbol, timeframe), start_ms, end_ms, limit)
+
+
+def slice_ohlcv(
+    symbol: str,
+    timeframe: str,
+    start_ms: int | None = None,
+    end_ms: int | None = None,
+    limit: int | None = None,
+) -> pd.DataFrame:
+    """Zero-copy row slice of the cached frame (only those rows decoded
+    with ``COMPACT_CACHE``); see ``candle_range``."""
+    return ohlcv_page(symbol, timeframe, start_ms, end_ms, limit)[0]
+
 
-    df = _load_raw(symbol)
+def ohlcv_page(
+    symbol: str,
+    timeframe: str,
+    start_ms: int | None = None,
+    end_ms: int | None = None,
+    limit: int | None = None,
+) -> tuple[pd.DataFrame, int]:
+    """``slice_ohlcv`` plus the total candle count, both from one snapshot of
+    the cached frame; nothing beyond the slice is decoded."""
+    frame = _load_cached(symbol, timeframe)
+    if frame.empty:
+        return pd.DataFrame(), 0
+    lo, hi = _candle_range(frame, start_ms, end_ms, limit)
+    return _rows(frame, lo, hi), len(frame)
+
+
+def locate_candle(symbol: str, timeframe: str, when: pd.Timestamp) -> int:
+    """Index of the first candle whose (IST-naive) datetime is at or after ``when``.
+
+    ``when`` is compared by wall-clock time; any timezone is dropped.
+    """
+    return _locate(_load_cached(symbol, timeframe), when)
+
+
+class CandleSnapshot:
+    """Column arrays of one cached OHLCV frame, with time lookups on those same rows."""
+
+    def __init__(self, frame: pd.DataFrame | CompactFrame):
+        self._frame = frame
+        self.arrays = _arrays(frame)
+        # A DataFrame column is a zero-copy view; a compact one is decoded per row
+        self._datetimes = None if isinstance(frame, CompactFrame) else frame["datetime"]
+
+    def locate(self, when: pd.Timestamp) -> int:
+        """See ``locate_candle``."""
+        return _locate(self._frame, when)
+
+    def datetime(self, i: int) -> pd.Timestamp:
+        """``datetime`` of candle ``i`` (only that row decoded with ``COMPACT_CACHE``)."""
+        if self._datetimes is None:
+            return pd.Series(self._frame.column("datetime", i, i + 1)).iloc[0]
+        return self._datetimes.iloc[i]
+
+
+def load_candles(symbol: str, timeframe: str) -> CandleSnapshot | None:
+    """``load_arrays`` plus ``locate_candle`` and datetimes, all on one snapshot
+    of the cached frame, so appended candles cannot shift one against the
+    other. Returns ``None`` when there is no data.
+    """
+    df = _load_cached(symbol, timeframe)
     if df.empty:
-        return df
+        return None
+    return CandleSnapshot(df)
+
+
+def load_indicator(symbol: str, timeframe: str, name: str, params: tuple = ()):
+    """Indicator series for a cached OHLCV frame, memoized.
+
+    Keyed by (symbol, timeframe, name, params) and stored as a child of the
+    OHLCV entry it was computed from, so it shares the cache's byte budget
+    and is dropped whenever that entry is evicted or replaced. Returns a
+    read-only array (a tuple of them for multi-output indicators such as
+    Bollinger or MACD), or ``None`` when there is no data.
+    """
+    df = _load_cached(symbol, timeframe)
+    if df.empty:
+        return None
+    return _indicator(symbol, timeframe, df, name, params)
+
+
+def _indicator(symbol: str, timeframe: str, df: pd.DataFrame | CompactFrame, name: str, params: tuple):
+    """Values of one indicator over ``df``, the cached frame of symbol/timeframe or an older one."""
+    key = (symbol, timeframe, name, tuple(params))
+    slot = _cache_slot(symbol, timeframe)
+    cached = _cache.get(key, tier="indicator")
+    # Frames are only ever replaced by newer ones, so if ``df`` is still the
+    # cached frame, the entry found before checking was computed from it
+    if cached is not None and _cache.peek(*slot) is df:
+        return cached.values
+    with span("indicators"):
+        entry = _compute_indicator(INDICATORS[name](*params), df)
+    _cache.put(key, entry, tier="indicator", parent=slot, parent_value=df)
+    return entry.values
+
+
+def _arrays(df: pd.DataFrame | CompactFrame) -> OHLCVArrays:
+    return OHLCVArrays(*(_readonly(df[col].to_numpy()) for col in OHLCVArrays._fields))
+
+
+def _compute_indicator(indicator, df: pd.DataFrame | CompactFrame, prefix=None) -> _IndicatorEntry:
+    """Feed ``df`` to ``indicator`` and keep its state from before the last row.
+
+    ``prefix`` holds values already computed for the rows before ``df``;
+    they grow in place when they can (see ``buffers.extend``). Indicators
+    give the same values however their input is split.
+    """
+    columns = [df[col].to_numpy() for col in indicator.inputs]
+    resume = copy.deepcopy(indicator)
+    values = indicator.batch(*columns)
+    # Fed separately rather than continued, so a fresh indicator stays one
+    # pandas batch each (continuing a moving average replays it in Python)
+    resume.batch(*(c[:-1] for c in columns))
+    if prefix is None:
+        extended = values
+    elif isinstance(values, tuple):
+        extended = tuple(buffers.extend(p, v) for p, v in zip(prefix, values))
+    else:
+        extended = buffers.extend(prefix, values)
+    if isinstance(extended, tuple):
+        return _IndicatorEntry(tuple(_readonly(v) for v in extended), resume)
+    return _IndicatorEntry(_readonly(extended), resume)
+
+
+def _cache_slot(symbol: str, timeframe: str) -> tuple:
+    """(key, tier) of the cache entry holding this symbol/timeframe's frame."""
+    if TIMEFRAME_MAP.get(timeframe, "1min") == "1min":
+        return symbol, "raw"
+    return (symbol, timeframe), "derived"
+
+
+def _candle_range(
+    frame: pd.DataFrame | CompactFrame, start_ms: int | None, end_ms: int | None, limit: int | None
+) -> tuple[int, int]:
+    lo = 0 if start_ms is None else _searchsorted(frame, start_ms, "right")
+    hi = len(frame) if end_ms is None else _searchsorted(frame, end_ms, "left")
+    hi = max(lo, hi)
+    if limit is not None:
+        if start_ms is not None:
+            hi = min(hi, lo + limit)
+        else:
+            lo = max(lo, hi - limit)
+    return lo, hi
 
+
+def _searchsorted(frame: pd.DataFrame | CompactFrame, ms: int, side: str) -> int:
+    if isinstance(frame, CompactFrame):
+        return frame.searchsorted(ms, side)
+    return int(np.searchsorted(frame["timestamp"].to_numpy(), ms, side=side))
+
+
+def _locate(frame: pd.DataFrame | CompactFrame, when: pd.Timestamp) -> int:
+    if when.tzinfo is not None:
+        when = when.tz_localize(None)
+    if isinstance(frame, CompactFrame):
+        dtype = frame.column("datetime", 0, 1).dtype
+        if dtype.kind == "M":
+            return frame.bisect("datetime", when.to_datetime64().astype(dtype))
+    datetimes = frame["datetime"]
+    if getattr(datetimes.dtype, "tz", None) is not None:
+        datetimes = datetimes.dt.tz_localize(None)
+    values = datetimes.to_numpy()
+    return int(np.searchsorted(values, when.to_datetime64().astype(values.dtype), side="left"))
+
+
+def _compact(df: pd.DataFrame) -> pd.DataFrame | CompactFrame:
+    """The form a frame is cached in: compacted with ``COMPACT_CACHE`` on."""
+    return CompactFrame(df) if COMPACT_CACHE and not df.empty else df
+
+
+def _rows(frame: pd.DataFrame | CompactFrame, lo: int | None = None, hi: int | None = None) -> pd.DataFrame:
+    """Rows [lo, hi) of a cached frame as a DataFrame: a zero-copy slice, or decoded."""
+    if isinstance(frame, CompactFrame):
+        return frame.to_frame(lo or 0, hi)
+    return frame if lo is None and hi is None else frame.iloc[lo:hi]
+
+
+def _readonly(arr: np.ndarray) -> np.ndarray:
+    view = arr.view()
+    view.flags.writeable = False
+    return view
+
+
+def _load_cached(symbol: str, timeframe: str) -> pd.DataFrame | CompactFrame:
     tf = TIMEFRAME_MAP.get(timeframe, "1min")
-    if tf != "1min":
-        df = df.set_index("datetime")
-        df = df.resample(tf).agg({
-            "open": "first",
-            "high": "max",
-            "low": "min",
-            "close": "last",
-            "volume": "sum",
-            "timestamp": "first",
-        }).dropna().reset_index()
-
-    _resample_cache[key] = df
-    return df
+    if tf == "1min":
+        # The raw frame is already cached in the raw tier; don't store it twice.
+        return _load_raw(symbol)
+
+    key = (symbol, timeframe)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    with _rollup_lock(symbol):
+        # Another request may have built the rollups while we waited.
+        cached = _cache.get(key)
+        if cached is not None:
+            return cached
+        if COLUMNAR_STORE and columnar_store.is_fresh(symbol, timeframe):
+            with span("load"):
+                df = _compact(columnar_store.load_store(symbol, timeframe))
+            _cache.put(key, df)
+            return df
+        return _build_rollups(symbol).get(timeframe, pd.DataFrame())
+
+
+def _build_rollups(symbol: str) -> dict[str, pd.DataFrame | CompactFrame]:
+    """Build every timeframe in one pass over the 1m data, persist and cache it."""
+    raw = _load_raw(symbol)
+    if raw.empty:
+        return {}
+    with span("resample"):
+        frames = build_rollups(_rows(raw))
+    if COLUMNAR_STORE:
+        try:
+            with span("store"):
+                for tf, frame in frames.items():
+                    columnar_store.write_store(symbol, frame, tf, source=_synced.get(symbol))
+                frames = {tf: columnar_store.load_store(symbol, tf) for tf in frames}
+        except OSError:
+            pass
+    frames = {tf: _compact(frame) for tf, frame in frames.items()}
+    for tf, frame in frames.items():
+        _cache.put((symbol, tf), frame)
+    return frames
+
+
+def _rollup_lock(symbol: str) -> threading.Lock:
+    with _rollup_locks_guard:
+        return _rollup_locks.setdefault(symbol, threading.Lock())
+
+
+def append_candles(symbol: str, candles) -> dict:
+    """Persist new 1m candles and fold them into the cached frames in place.
+
+    ``candles`` are ``[timestamp (UTC ms), open, high, low, close, volume]``
+    rows; those not after the last stored candle are skipped. They are
+    written to the symbol's segments (see ``segments.append_candles``) and
+    appended to the cached 1m frame; cached timeframes only re-aggregate
+    their last bucket onward and cached indicators resume from their
+    saved state, so nothing is reloaded or resampled from scratch.
+    """
+    rows = np.asarray(candles, dtype=np.float64)
+    if rows.ndim != 2 or rows.shape[1] != 6:
+        return {"error": "candles must be [timestamp, open, high, low, close, volume] rows"}
+    if len(rows) and (~np.isfinite(rows[:, 0]) | (rows[:, 0] % segments.CANDLE_MS != 0)).any():
+        return {"error": "timestamps must be whole minutes in UTC milliseconds"}
+    rows = rows[np.argsort(rows[:, 0], kind="stable")]
+    # Duplicates in one push: the last row of a timestamp wins
+    rows = rows[np.append(rows[1:, 0] != rows[:-1, 0], True)]
+
+    with _rollup_lock(symbol):
+        raw = _load_raw(symbol)
+        if not raw.empty:
+            rows = rows[rows[:, 0] > raw["timestamp"].to_numpy()[-1]]
+        if len(rows) == 0:
+            return {"symbol": symbol, "appended": 0}
+        csv_file = columnar_store.csv_path(symbol)
+        if not segments.has_segments(symbol) and os.path.exists(csv_file):
+            segments.adopt_csv(symbol, csv_file)
+        start, end = int(rows[0, 0]), int(rows[-1, 0]) + segments.CANDLE_MS
+        before = columnar_store.source_version(symbol)
+        parsed = segments.append_candles(symbol, rows, start, end)
+        version = columnar_store.source_version(symbol)
+        if COLUMNAR_STORE:
+            # Keeps the store fresh, so the next cold load maps it instead of re-parsing
+            columnar_store.append_store(symbol, parsed, before, version)
+        if raw.empty:
+            _invalidate(symbol)
+        else:
+            with span("append"):
+                _extend(symbol, raw, parsed)
+            _synced[symbol] = version
+    return {"symbol": symbol, "appended": len(rows), "last_time": to_chart_ts(rows[-1, 0])}
+
+
+def refresh_symbol(symbol: str) -> int:
+    """Pick up candles another process added to a symbol's cached source.
+
+    Rows at the end of grown or new segments are appended like
+    ``append_candles``; any other change (a gap filled behind the cached
+    tail, a rewritten CSV) drops the symbol's cached frames. Returns the
+    number of candles appended.
+    """
+    with _rollup_lock(symbol):
+        raw = _cache.peek(symbol, tier="raw")
+        if raw is None:
+            return 0
+        old, version = _synced.get(symbol, {}), columnar_store.source_version(symbol)
+        changed = [name for name, rows in version.items() if old.get(name) != rows]
+        if not changed:
+            return 0
+        if not segments.has_segments(symbol) or raw.empty:
+            _invalidate(symbol)
+            return 0
+        last = raw["timestamp"].to_numpy()[-1]
+        parts = []
+        for name in sorted(changed):
+            df = pd.read_csv(os.path.join(segments.segments_path(symbol), name), parse_dates=["datetime"])
+            if name not in old and (df["timestamp"] <= last).any():
+                _invalidate(symbol)
+                return 0
+            parts.append(df[df["timestamp"] > last])
+        new = pd.concat(parts, ignore_index=True).sort_values("datetime")
+        if len(new):
+            _extend(symbol, raw, new)
+        _synced[symbol] = version
+        return len(new)
+
+
+def start_source_watcher(interval: float = LIVE_POLL_SEC) -> None:
+    """Run ``refresh_symbol`` over the cached symbols every ``interval`` seconds.
+
+    Once per process, in a daemon thread; ``interval <= 0`` disables it.
+    """
+    global _watcher_started
+    with _rollup_locks_guard:
+        if _watcher_started or interval <= 0:
+            return
+        _watcher_started = True
+
+    def watch():
+        while True:
+            time.sleep(interval)
+            _refresh_all()
+
+    threading.Thread(target=watch, name="source-watcher", daemon=True).start()
+
+
+def _refresh_all() -> None:
+    for symbol in list(_synced):
+        try:
+            refresh_symbol(symbol)
+        except Exception:
+            # A failing symbol must not stop the watcher for the others
+            logger.exception("%s: refresh failed", symbol)
+
+
+def warm_rollups() -> None:
+    """Load or build every timeframe of every symbol (startup warm-up)."""
+    for symbol in list_symbols():
+        for timeframe in TIMEFRAME_MAP:
+            _load_cached(symbol, timeframe)
+
+
+def _extend(symbol: str, raw: pd.DataFrame | CompactFrame, new: pd.DataFrame) -> None:
+    """Append parsed 1m rows to the cached frames of ``symbol`` (its rollup lock held).
+
+    Each cached timeframe re-aggregates the 1m rows from its last bucket on
+    (buckets nest, so that bucket's start is a boundary of every finer
+    timeframe too) and replaces that bucket; indicator entries resume from
+    their state before it. Entries are replaced, not mutated, so frames and
+    arrays already handed out stay valid. The 1m frame and its indicators
+    grow in place (``buffers.extend``); a timeframe's frame is copied, as
+    its last bucket changes. Only the rows involved are decoded with
+    ``COMPACT_CACHE``.
+    """
+    raw_new = _append_rows(raw, new, len(raw))
+    frames = {timeframe: _cache.peek((symbol, timeframe)) for timeframe in ordered_timeframes()[1:]}
+    updates = [(symbol, "raw", len(raw), raw_new)]
+    unit = np.datetime_data(_column(raw, "datetime", 0, 1).dtype)[0]
+    for timeframe, frame in frames.items():
+        if frame is None:
+            continue
+        if frame.empty:
+            _cache.pop((symbol, timeframe))
+            continue
+        last = _column(frame, "datetime", len(frame) - 1)[0]
+        tail = _rows(raw_new, _searchsorted_datetime(raw_new, last))
+        tail = tail.dropna(subset=["open", "high", "low", "close", "volume"])
+        level = rollup(
+            {
+                "datetime": tail["datetime"].to_numpy().astype(np.int64),
+                "timestamp": tail["timestamp"].to_numpy(dtype=np.int64),
+                **{col: tail[col].to_numpy(dtype=np.float64) for col in ("open", "high", "low", "close", "volume")},
+            },
+            timeframe,
+            unit,
+        )
+        level["datetime"] = level["datetime"].astype(f"datetime64[{unit}]")
+        updated = _append_rows(frame, pd.DataFrame(level, copy=False), len(frame) - 1)
+        updates.append(((symbol, timeframe), "derived", len(frame), updated))
+
+    for key, tier, old_rows, stored in updates:
+        children = _cache.children(key, tier)
+        _cache.put(key, stored, tier=tier)
+        for child_key, entry in children.items():
+            keep = old_rows - 1
+            values = entry.values
+            prefix = tuple(v[:keep] for v in values) if isinstance(values, tuple) else values[:keep]
+            extended = _compute_indicator(copy.deepcopy(entry.resume), _rows(stored, keep), prefix)
+            _cache.put(child_key, extended, tier="indicator", parent=(key, tier), parent_value=stored)
+
+
+def _append_rows(frame: pd.DataFrame | CompactFrame, new: pd.DataFrame, keep: int) -> pd.DataFrame | CompactFrame:
+    """Rows [0, keep) of a cached frame followed by ``new``, in the frame's form."""
+    if isinstance(frame, CompactFrame):
+        grown = frame.extend(new, keep)
+        if grown is not None:
+            return grown
+        return CompactFrame(pd.concat([frame.to_frame(0, keep), new[list(frame.columns)]], ignore_index=True))
+    return pd.DataFrame(
+        {col: buffers.extend(frame[col].to_numpy()[:keep], new[col].to_numpy()) for col in frame}, copy=False
+    )
+
+
+def _column(frame: pd.DataFrame | CompactFrame, name: str, lo: int = 0, hi: int | None = None) -> np.ndarray:
+    """Rows [lo, hi) of one column of a cached frame (only those decoded)."""
+    if isinstance(frame, CompactFrame):
+        return frame.column(name, lo, hi)
+    return frame[name].to_numpy()[lo:hi]
+
+
+def _searchsorted_datetime(frame: pd.DataFrame | CompactFrame, value: np.datetime64) -> int:
+    if isinstance(frame, CompactFrame):
+        return frame.bisect("datetime", value)
+    return int(np.searchsorted(frame["datetime"].to_numpy(), value))
+
+
+def _invalidate(symbol: str) -> None:
+    """Drop every cached frame of ``symbol`` (and with them its indicators)."""
+    _cache.pop(symbol, tier="raw")
+    for timeframe in ordered_timeframes()[1:]:
+        _cache.pop((symbol, timeframe))
+    _synced.pop(symbol, None)
+
+
+def cache_stats() -> dict:
+    """Byte usage and hit/miss/eviction counters of the OHLCV cache, and what compaction saves."""
+    frames = [f for tier in ("raw", "derived") for f in _cache.values(tier) if isinstance(f, CompactFrame)]
+    compact, full = sum(f.nbytes for f in frames), sum(f.full_nbytes for f in frames)
+    return {
+        **_cache.stats(),
+        "compact": {
+            "enabled": COMPACT_CACHE,
+            "frames": len(frames),
+            "bytes": compact,
+            "uncompacted_bytes": full,
+            "saved_bytes": full - compact,
+            "saved_pct": round((full - compact) / full * 100, 1) if full else None,
+        },
+    }
 
 
 def sanitize_float(v):
@@ -64,6 +604,19 @@ def to_chart_ts(ms_timestamp: int) -> int:
     return int(ms_timestamp) // 1000 + IST_OFFSET_SEC
 
 
+def from_chart_ts(chart_ts: int) -> int:
+    """Inverse of ``to_chart_ts``: IST chart seconds back to a millisecond UTC timestamp."""
+    return (int(chart_ts) - IST_OFFSET_SEC) * 1000
+
+
+def ohlcv_columns(df: pd.DataFrame) -> dict[str, np.ndarray]:
+    """OHLCV as parallel arrays keyed like the record fields (chart time in IST seconds)."""
+    return {
+        "time": df["timestamp"].to_numpy().astype(np.int64) // 1000 + IST_OFFSET_SEC,
+        **{col: df[col].to_numpy() for col in ("open", "high", "low", "close", "volume")},
+    }
+
+
 def format_ohlcv_records(df: pd.DataFrame) -> list[dict]:
     """Convert a DataFrame to a list of OHLCV dicts — vectorized, fast."""
     if df.empty:
@@ -0,0 +1,66 @@
+"""Point reduction for chart series that keeps their extremes.
+
+Plain striding (``values[::step]``) drops whatever falls between two
+samples, such as the bottom of a drawdown. ``minmax_indices`` splits the
+series into buckets and keeps the lowest and highest point of each (plus
+the first and last point), so the reduced line spans the same range.
+
+Step series (equity, which only changes on exits) don't need every point:
+sample each bucket's first position and every change position, and pass
+those with ``positions``/``length`` to get the same selection.
+"""
+import numpy as np
+
+
+def minmax_indices(
+    values: np.ndarray, max_points: int, positions: np.ndarray | None = None, length: int | None = None
+) -> np.ndarray:
+    """Sorted indices into ``values`` to keep, at most ``max_points`` of them.
+
+    ``positions`` (sorted) place each value in a series of ``length``
+    points; by default the values are the whole series. Ties keep the
+    earliest point; NaN is never a bucket's min or max unless the bucket is
+    all NaN.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if positions is None:
+        positions = np.arange(len(values))
+    length = len(values) if length is None else length
+    if length <= max_points:
+        return np.arange(len(values))
+
+    extremes = bucket_extremes(values, positions, bucket_length(length, max_points))
+    return np.unique(np.concatenate(([0, len(values) - 1], extremes)))
+
+
+def bucket_extremes(values: np.ndarray, positions: np.ndarray, size: int) -> np.ndarray:
+    """Indices of the first lowest and first highest value of every ``size``-position bucket.
+
+    Buckets are independent, so a series can be reduced a run of complete
+    buckets at a time (as the streamed backtest curve is).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    bucket = positions // size
+    lows = np.lexsort((positions, values, bucket))
+    highs = np.lexsort((positions, -values, bucket))
+    # Both orders sort by bucket first, so groups start at the same offsets
+    first = np.flatnonzero(np.diff(bucket[lows], prepend=-1))
+    return np.concatenate((lows[first], highs[first]))
+
+
+def step_positions(length: int, max_points: int) -> np.ndarray:
+    """Positions to sample from a step series besides its change positions.
+
+    Every bucket's first position and the last one, or all of them when the
+    series already fits in ``max_points``.
+    """
+    if length <= max_points:
+        return np.arange(length)
+    starts = np.arange(0, length, bucket_length(length, max_points))
+    return np.append(starts, length - 1)
+
+
+def bucket_length(length: int, max_points: int) -> int:
+    """Points per bucket: two kept per bucket, two more for the ends."""
+    buckets = max(1, (max_points - 2) // 2)
+    return -(-length // buckets)
@@ -0,0 +1,46 @@
+"""Vectorized stop-loss / take-profit first-touch search.
+
+Shared by the backtest engine and manual trades: instead of walking
+candles one by one, the high/low arrays after entry are scanned in
+geometrically growing chunks and the first touch is found with
+``argmax``, so a trade that never hits costs a few NumPy passes.
+"""
+import numpy as np
+
+# Candles scanned in the first chunk; each later chunk is 4x larger so early
+# hits stay cheap and long holds stay vectorized.
+SCAN_CHUNK = 256
+
+
+def first_touch(
+    high: np.ndarray,
+    low: np.ndarray,
+    start: int,
+    stop: int,
+    side: str,
+    sl: float | None = None,
+    tp: float | None = None,
+) -> tuple[int, bool, bool]:
+    """First candle in [start, stop) whose range touches SL or TP.
+
+    Returns ``(index, hit_sl, hit_tp)`` with index -1 when neither level is
+    touched. Both flags can be set when one candle spans both levels;
+    callers decide the tie-break. Falsy levels are ignored, and NaN candles
+    never touch.
+    """
+    if not sl and not tp:
+        return -1, False, False
+    long = side == "long"
+    chunk = SCAN_CHUNK
+    while start < stop:
+        end = min(start + chunk, stop)
+        hi, lo = high[start:end], low[start:end]
+        hit_sl = (lo <= sl if long else hi >= sl) if sl else np.zeros(end - start, dtype=bool)
+        hit_tp = (hi >= tp if long else lo <= tp) if tp else np.zeros(end - start, dtype=bool)
+        hit = hit_sl | hit_tp
+        if hit.any():
+            k = int(hit.argmax())
+            return start + k, bool(hit_sl[k]), bool(hit_tp[k])
+        start = end
+        chunk *= 4
+    return -1, False, False
@@ -0,0 +1,166 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Eviction order, cheapest to rebuild first: indicator series, then derived
+# (resampled) frames, and raw 1m frames only when nothing else is left.
+TIERS = ("indicator", "derived", "raw")
+
+
+def frame_nbytes(value) -> int:
+    """Actual memory held by a cached value (DataFrame, Series, ndarray or a tuple of them).
+
+    Anything else counts its ``nbytes`` attribute (e.g. ``compact.CompactFrame``).
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, tuple):
+        return sum(frame_nbytes(v) for v in value)
+    return int(getattr(value, "nbytes", 0))
+
+
+class FrameCache:
+    """Thread-safe LRU cache with a byte budget shared by all tiers.
+
+    An entry may be registered as the child of another (e.g. an indicator
+    series of the frame it was computed from); children are dropped
+    whenever their parent is evicted, replaced or popped.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._tiers: dict[str, OrderedDict] = {tier: OrderedDict() for tier in TIERS}
+        self._lock = threading.RLock()
+        self._used = 0
+        self._children: dict[tuple, set] = {}
+        self._parents: dict[tuple, tuple] = {}
+        self._counters = {
+            tier: {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0} for tier in TIERS
+        }
+
+    def get(self, key, tier: str = "derived"):
+        with self._lock:
+            entries = self._tiers[tier]
+            if key in entries:
+                entries.move_to_end(key)
+                self._counters[tier]["hits"] += 1
+                return entries[key][0]
+            self._counters[tier]["misses"] += 1
+            return None
+
+    def peek(self, key, tier: str = "derived"):
+        """Like ``get`` without counting a hit or miss or refreshing LRU order."""
+        with self._lock:
+            entry = self._tiers[tier].get(key)
+            return None if entry is None else entry[0]
+
+    def values(self, tier: str = "derived") -> list:
+        """Every value of a tier, without counting lookups or refreshing LRU order."""
+        with self._lock:
+            return [value for value, _ in self._tiers[tier].values()]
+
+    def children(self, key, tier: str = "derived") -> dict:
+        """{child key: value} of the entries registered as children of this one."""
+        with self._lock:
+            return {
+                child_key: self._tiers[child_tier][child_key][0]
+                for child_tier, child_key in self._children.get((tier, key), ())
+            }
+
+    def put(self, key, value, tier: str = "derived", parent=None, parent_value=None) -> bool:
+        """Insert ``value``; with ``parent=(key, tier)`` link it as a child.
+
+        A child is only stored if the parent entry still holds
+        ``parent_value`` (compared by identity), so values computed from a
+        frame that was replaced meanwhile are never cached. Returns whether
+        the value was stored.
+        """
+        size = frame_nbytes(value)
+        with self._lock:
+            if parent is not None:
+                parent_key, parent_tier = parent
+                current = self._tiers[parent_tier].get(parent_key)
+                if current is None or current[0] is not parent_value:
+                    return False
+            self._discard(key, tier)
+            self._tiers[tier][key] = (value, size)
+            self._used += size
+            if parent is not None:
+                node = (parent[1], parent[0])
+                self._children.setdefault(node, set()).add((tier, key))
+                self._parents[(tier, key)] = node
+            self._evict(keep=(tier, key))
+            return True
+
+    def pop(self, key, tier: str = "derived") -> None:
+        with self._lock:
+            self._discard(key, tier)
+
+    def clear(self) -> None:
+        with self._lock:
+            for entries in self._tiers.values():
+                entries.clear()
+            self._children.clear()
+            self._parents.clear()
+            self._used = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_bytes": self.max_bytes,
+                "used_bytes": self._used,
+                "tiers": {
+                    tier: {
+                        "entries": len(entries),
+                        "bytes": sum(size for _, size in entries.values()),
+                        **self._counters[tier],
+                        "hit_rate": _hit_rate(self._counters[tier]),
+                    }
+                    for tier, entries in self._tiers.items()
+                },
+            }
+
+    def _discard(self, key, tier: str) -> bool:
+        old = self._tiers[tier].pop(key, None)
+        if old is None:
+            return False
+        self._used -= old[1]
+        node = (tier, key)
+        parent = self._parents.pop(node, None)
+        if parent is not None:
+            self._children.get(parent, set()).discard(node)
+        for child_tier, child_key in self._children.pop(node, ()):
+            if self._discard(child_key, child_tier):
+                self._counters[child_tier]["invalidations"] += 1
+        return True
+
+    def _evict(self, keep) -> None:
+        """Drop LRU entries, cheapest tier first, until under budget.
+
+        The entry just inserted (``keep``) and its parent are never
+        evicted, even if they alone exceed the budget.
+        """
+        protected = {keep, self._parents.get(keep)}
+        for tier in TIERS:
+            entries = self._tiers[tier]
+            for key in list(entries):
+                if self._used <= self.max_bytes:
+                    return
+                if (tier, key) in protected or key not in entries:
+                    continue
+                self._discard(key, tier)
+                self._counters[tier]["evictions"] += 1
+
+
+# ─── Private helpers ──────────────────────────────────────────────────
+
+
+def _hit_rate(counters: dict) -> float | None:
+    lookups = counters["hits"] + counters["misses"]
+    return round(counters["hits"] / lookups, 4) if lookups else None
@@ -1,17 +1,564 @@
+"""Technical indicators, in streaming and batch form.
+
+Every indicator is a small stateful object:
+
+* ``update(...)`` consumes one candle in O(1) and returns the latest value
+  (NaN during warm-up);
+* ``batch(...)`` consumes a whole array at once with NumPy/pandas and
+  continues from the same state.
+
+Both paths use the same floating-point operations in the same order, so
+``batch`` over a series equals calling ``update`` candle by candle, and a
+series split into chunks gives the same values as the whole series. The
+``compute_*`` functions are the one-shot batch forms on pandas Series.
+
+Moving averages are bit-identical to ``Series.rolling(period).mean()``
+(see ``_RollingMean``), so backtests give the same trades as with pandas.
+"""
+import copy
+import math
+from collections import deque
+
+import numpy as np
 import pandas as pd
 
 
+# ─── Batch helpers on pandas Series ──────────────────────────────────
+
+
 def compute_sma(series: pd.Series, period: int) -> pd.Series:
     """Simple Moving Average."""
-    return series.rolling(window=period).mean()
+    return _series(SMA(period).batch(series.to_numpy(dtype=np.float64)), series)
 
 
 def compute_rsi(series: pd.Series, period: int = 14) -> pd.Series:
-    """Relative Strength Index."""
-    delta = series.diff()
-    gain = delta.where(delta > 0, 0.0)
-    loss = -delta.where(delta < 0, 0.0)
-    avg_gain = gain.rolling(window=period).mean()
-    avg_loss = loss.rolling(window=period).mean()
-    rs = avg_gain / avg_loss
-    return 100 - (100 / (1 + rs))
+    """Relative Strength Index (simple-average gains/losses)."""
+    return _series(RSI(period).batch(series.to_numpy(dtype=np.float64)), series)
+
+
+def compute_ema(series: pd.Series, period: int) -> pd.Series:
+    """Exponential Moving Average, seeded with the first value."""
+    return _series(EMA(period).batch(series.to_numpy(dtype=np.float64)), series)
+
+
+def compute_wilder_rsi(series: pd.Series, period: int = 14) -> pd.Series:
+    """Relative Strength Index with Wilder smoothing."""
+    return _series(WilderRSI(period).batch(series.to_numpy(dtype=np.float64)), series)
+
+
+def compute_atr(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> pd.Series:
+    """Average True Range with Wilder smoothing."""
+    values = ATR(period).batch(*(s.to_numpy(dtype=np.float64) for s in (high, low, close)))
+    return _series(values, close)
+
+
+def compute_bollinger(series: pd.Series, period: int = 20, k: float = 2.0):
+    """Bollinger Bands → (middle, upper, lower)."""
+    bands = Bollinger(period, k).batch(series.to_numpy(dtype=np.float64))
+    return tuple(_series(b, series) for b in bands)
+
+
+def compute_macd(series: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9):
+    """MACD → (macd line, signal line, histogram)."""
+    lines = MACD(fast, slow, signal).batch(series.to_numpy(dtype=np.float64))
+    return tuple(_series(line, series) for line in lines)
+
+
+def compute_vwap(high: pd.Series, low: pd.Series, close: pd.Series, volume: pd.Series) -> pd.Series:
+    """Cumulative Volume Weighted Average Price."""
+    values = VWAP().batch(*(s.to_numpy(dtype=np.float64) for s in (high, low, close, volume)))
+    return _series(values, close)
+
+
+# ─── Streaming indicators ────────────────────────────────────────────
+
+
+class SMA:
+    """Simple Moving Average."""
+
+    inputs = ("close",)
+
+    def __init__(self, period: int):
+        self.period = period
+        self._mean = _RollingMean(period)
+
+    def update(self, close: float) -> float:
+        return self._mean.update(close)
+
+    def batch(self, close: np.ndarray) -> np.ndarray:
+        return self._mean.batch(close)
+
+
+class EMA:
+    """Exponential Moving Average (alpha = 2 / (period + 1))."""
+
+    inputs = ("close",)
+
+    def __init__(self, period: int):
+        self.period = period
+        self._ewm = _EWM(2 / (period + 1))
+
+    def update(self, close: float) -> float:
+        value = self._ewm.update(close)
+        return value if self._ewm.count >= self.period else math.nan
+
+    def batch(self, close: np.ndarray) -> np.ndarray:
+        seen = self._ewm.count
+        return _mask_warmup(self._ewm.batch(close), seen, self.period)
+
+
+class RSI:
+    """RSI over simple moving averages of gains and losses."""
+
+    inputs = ("close",)
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self._prev = None
+        self._gain = SMA(period)
+        self._loss = SMA(period)
+
+    def update(self, close: float) -> float:
+        delta = math.nan if self._prev is None else close - self._prev
+        self._prev = close
+        # As Series.where: the first (NaN) delta is a 0 gain and a -0.0 loss
+        gain = delta if delta > 0 else 0.0
+        loss = -(delta if delta < 0 else 0.0)
+        return _rsi(self._gain.update(gain), self._loss.update(loss))
+
+    def batch(self, close: np.ndarray) -> np.ndarray:
+        close = np.asarray(close, dtype=np.float64)
+        if len(close) == 0:
+            return close.copy()
+        prev = np.concatenate(([math.nan if self._prev is None else self._prev], close[:-1]))
+        self._prev = float(close[-1])
+        delta = close - prev
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = -np.where(delta < 0, delta, 0.0)
+        return _rsi_array(self._gain.batch(gain), self._loss.batch(loss))
+
+
+class WilderRSI:
+    """RSI with Wilder smoothing (alpha = 1 / period) of gains and losses."""
+
+    inputs = ("close",)
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self._prev = None
+        self._gain = _EWM(1 / period)
+        self._loss = _EWM(1 / period)
+
+    def update(self, close: float) -> float:
+        if self._prev is None:
+            self._prev = close
+            return math.nan
+        delta = close - self._prev
+        self._prev = close
+        avg_gain = self._gain.update(delta if delta > 0 else 0.0)
+        avg_loss = self._loss.update(-delta if delta < 0 else 0.0)
+        if self._gain.count < self.period:
+            return math.nan
+        return _rsi(avg_gain, avg_loss)
+
+    def batch(self, close: np.ndarray) -> np.ndarray:
+        close = np.asarray(close, dtype=np.float64)
+        out = np.full(len(close), np.nan)
+        if len(close) == 0:
+            return out
+        start = 0
+        if self._prev is None:
+            self._prev = float(close[0])
+            start = 1
+        delta = np.diff(close[start:], prepend=self._prev)
+        self._prev = float(close[-1])
+        seen = self._gain.count
+        avg_gain = self._gain.batch(np.where(delta > 0, delta, 0.0))
+        avg_loss = self._loss.batch(np.where(delta < 0, -delta, 0.0))
+        out[start:] = _mask_warmup(_rsi_array(avg_gain, avg_loss), seen, self.period)
+        return out
+
+
+class ATR:
+    """Average True Range with Wilder smoothing."""
+
+    inputs = ("high", "low", "close")
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self._prev_close = None
+        self._ewm = _EWM(1 / period)
+
+    def update(self, high: float, low: float, close: float) -> float:
+        tr = high - low
+        if self._prev_close is not None:
+            tr = max(tr, abs(high - self._prev_close), abs(low - self._prev_close))
+        self._prev_close = close
+        value = self._ewm.update(tr)
+        return value if self._ewm.count >= self.period else math.nan
+
+    def batch(self, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+        high, low, close = (np.asarray(a, dtype=np.float64) for a in (high, low, close))
+        if len(close) == 0:
+            return close.copy()
+        prev = np.concatenate(([math.nan if self._prev_close is None else self._prev_close], close[:-1]))
+        self._prev_close = float(close[-1])
+        # fmax skips the NaN previous close on the very first candle
+        tr = np.fmax(np.fmax(high - low, np.abs(high - prev)), np.abs(low - prev))
+        seen = self._ewm.count
+        return _mask_warmup(self._ewm.batch(tr), seen, self.period)
+
+
+class Bollinger:
+    """Bollinger Bands: SMA ± k population standard deviations.
+
+    The deviation is taken from each window's own values around its mean
+    (two passes), so it has no cancellation on long price series.
+    """
+
+    inputs = ("close",)
+
+    # Rows per block of window views in ``batch`` (bounds the temporary)
+    _BLOCK = 1 << 16
+
+    def __init__(self, period: int = 20, k: float = 2.0):
+        self.period = period
+        self.k = k
+        self._mean = _RollingMean(period)
+        self._recent = deque(maxlen=period)
+
+    def update(self, close: float) -> tuple[float, float, float]:
+        mid = self._mean.update(close)
+        self._recent.append(close)
+        if math.isnan(mid):
+            return math.nan, math.nan, math.nan
+        # Same NumPy reduction over the window as ``batch``
+        window = np.fromiter(self._recent, dtype=np.float64, count=self.period)
+        std = math.sqrt(np.square(window - mid).sum() / self.period)
+        return mid, mid + self.k * std, mid - self.k * std
+
+    def batch(self, close: np.ndarray):
+        close = np.asarray(close, dtype=np.float64)
+        if len(close) == 0:
+            return close.copy(), close.copy(), close.copy()
+        mid = self._mean.batch(close)
+        prior = np.full(self.period - 1, np.nan)
+        if self.period > 1 and self._recent:
+            tail = np.fromiter(self._recent, dtype=np.float64)[-(self.period - 1):]
+            prior[len(prior) - len(tail):] = tail
+        windows = np.lib.stride_tricks.sliding_window_view(np.concatenate((prior, close)), self.period)
+        std = np.empty(len(close))
+        for lo in range(0, len(close), self._BLOCK):
+            hi = lo + self._BLOCK
+            std[lo:hi] = np.square(windows[lo:hi] - mid[lo:hi, None]).sum(axis=1) / self.period
+        std = np.sqrt(std)
+        self._recent.extend(close[-self.period:].tolist())
+        return mid, mid + self.k * std, mid - self.k * std
+
+
+class MACD:
+    """MACD line (fast EMA − slow EMA), its signal EMA and the histogram."""
+
+    inputs = ("close",)
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self._fast = EMA(fast)
+        self._slow = EMA(slow)
+        self._signal = EMA(signal)
+
+    def update(self, close: float) -> tuple[float, float, float]:
+        macd = self._fast.update(close) - self._slow.update(close)
+        if math.isnan(macd):
+            return math.nan, math.nan, math.nan
+        signal = self._signal.update(macd)
+        return macd, signal, macd - signal
+
+    def batch(self, close: np.ndarray):
+        macd = self._fast.batch(close) - self._slow.batch(close)
+        signal = np.full(len(macd), np.nan)
+        valid = ~np.isnan(macd)
+        signal[valid] = self._signal.batch(macd[valid])
+        return macd, signal, macd - signal
+
+
+class VWAP:
+    """Cumulative VWAP of the typical price (high + low + close) / 3."""
+
+    inputs = ("high", "low", "close", "volume")
+
+    def __init__(self):
+        self._pv = 0.0
+        self._volume = 0.0
+
+    def update(self, high: float, low: float, close: float, volume: float) -> float:
+        self._pv = self._pv + (high + low + close) / 3 * volume
+        self._volume = self._volume + volume
+        return _div(self._pv, self._volume)
+
+    def batch(self, high, low, close, volume) -> np.ndarray:
+        high, low, close, volume = (np.asarray(a, dtype=np.float64) for a in (high, low, close, volume))
+        if len(close) == 0:
+            return close.copy()
+        pv = np.cumsum(np.concatenate(([self._pv], (high + low + close) / 3 * volume)))[1:]
+        vol = np.cumsum(np.concatenate(([self._volume], volume)))[1:]
+        self._pv, self._volume = float(pv[-1]), float(vol[-1])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return pv / vol
+
+
+class Donchian:
+    """Donchian channel: highest high and lowest low of the last ``period`` candles."""
+
+    inputs = ("high", "low")
+
+    def __init__(self, period: int = 20):
+        self.period = period
+        self._high = _RollingMax(period)
+        self._low = _RollingMax(period)  # max of -low
+
+    def update(self, high: float, low: float) -> tuple[float, float]:
+        return self._high.update(high), -self._low.update(-low)
+
+    def batch(self, high: np.ndarray, low: np.ndarray):
+        low = np.asarray(low, dtype=np.float64)
+        return self._high.batch(high), -self._low.batch(-low)
+
+
+INDICATORS = {
+    "sma": SMA,
+    "ema": EMA,
+    "rsi": RSI,
+    "wilder_rsi": WilderRSI,
+    "atr": ATR,
+    "bollinger": Bollinger,
+    "macd": MACD,
+    "vwap": VWAP,
+    "donchian": Donchian,
+}
+
+
+# ─── Private helpers ──────────────────────────────────────────────────
+
+
+class _RollingMean:
+    """Mean of the last ``period`` values, bit-identical to ``Series.rolling(period).mean()``.
+
+    pandas keeps one Kahan-compensated running sum over the whole series:
+    each value is added as it enters the window and subtracted as it
+    leaves, so a window's mean depends on every value before it, not only
+    on the window. ``update`` repeats those steps in Python (O(1)). A
+    ``batch`` on a fresh state lets pandas compute the series and replays
+    the steps only if the state is continued later (once for all copies of
+    it); further batches replay as they go (about 1 µs per value).
+    """
+
+    def __init__(self, period: int):
+        self.period = period
+        self.count = 0
+        # pandas' roll_mean state: sum, add/remove compensations, non-NaN
+        # count, negatives, run length of equal values and the last value
+        self._sum = 0.0
+        self._add_c = 0.0
+        self._remove_c = 0.0
+        self._nobs = 0
+        self._neg = 0
+        self._same = 0
+        self._prev = math.nan
+        self._recent = deque(maxlen=period)
+        # [values, state after them or None] of a fresh batch handed to
+        # pandas, shared by copies so the values are replayed only once
+        self._pending = None
+
+    def update(self, value: float) -> float:
+        return float(self._run([value])[0])
+
+    def batch(self, values: np.ndarray) -> np.ndarray:
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return values.copy()
+        if self.count == 0 and self._pending is None:
+            self._pending = [values, None]
+            self.count = len(values)
+            return pd.Series(values).rolling(self.period).mean().to_numpy()
+        return self._run(values.tolist())
+
+    def __deepcopy__(self, memo):
+        clone = copy.copy(self)  # shares the pending values and their replay
+        clone._recent = copy.copy(self._recent)
+        return clone
+
+    def _state(self) -> tuple:
+        return (
+            self._sum, self._add_c, self._remove_c, self._nobs, self._neg, self._same, self._prev,
+            tuple(self._recent),
+        )
+
+    def _run(self, values: list) -> np.ndarray:
+        """pandas' add/remove/mean steps (``window/aggregations.pyx``) over ``values``."""
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            if pending[1] is None:
+                self.count -= len(pending[0])
+                self._run(pending[0].tolist())
+                pending[1] = self._state()
+            else:
+                *fields, recent = pending[1]
+                self._sum, self._add_c, self._remove_c, self._nobs, self._neg, self._same, self._prev = fields
+                self._recent = deque(recent, maxlen=self.period)
+        period, recent = self.period, self._recent
+        total, add_c, remove_c = self._sum, self._add_c, self._remove_c
+        nobs, neg, same, prev = self._nobs, self._neg, self._same, self._prev
+        out = np.empty(len(values))
+        for i, value in enumerate(values):
+            if len(recent) == period:
+                old = recent[0]
+                if old == old:
+                    nobs -= 1
+                    y = -old - remove_c
+                    t = total + y
+                    remove_c = t - total - y
+                    total = t
+                    if math.copysign(1.0, old) < 0:
+                        neg -= 1
+            recent.append(value)
+            if value == value:
+                nobs += 1
+                y = value - add_c
+                t = total + y
+                add_c = t - total - y
+                total = t
+                if math.copysign(1.0, value) < 0:
+                    neg += 1
+                same = same + 1 if value == prev else 1
+                prev = value
+            if nobs < period:
+                out[i] = math.nan
+                continue
+            mean = total / nobs
+            if same >= nobs:
+                mean = prev
+            elif (neg == 0 and mean < 0) or (neg == nobs and mean > 0):
+                mean = 0.0
+            out[i] = mean
+        self._sum, self._add_c, self._remove_c = total, add_c, remove_c
+        self._nobs, self._neg, self._same, self._prev = nobs, neg, same, prev
+        self.count += len(values)
+        return out
+
+
+class _RollingMax:
+    """Max of the last ``period`` values, ignoring NaN (NaN if all are NaN).
+
+    ``update`` keeps a monotonic deque of (index, value) candidates, O(1)
+    amortized; ``batch`` reduces a sliding window view with ``np.fmax``.
+    Max is exact, so both give identical values.
+    """
+
+    def __init__(self, period: int):
+        self.period = period
+        self.count = 0
+        self._candidates = deque()
+        self._recent = deque(maxlen=period)
+
+    def update(self, value: float) -> float:
+        self._push(self.count, value)
+        self.count += 1
+        if self.count < self.period:
+            return math.nan
+        return self._candidates[0][1] if self._candidates else math.nan
+
+    def batch(self, values: np.ndarray) -> np.ndarray:
+        values = np.asarray(values, dtype=np.float64)
+        n = len(values)
+        if n == 0:
+            return values.copy()
+        prior = np.full(self.period - 1, np.nan)
+        if self.period > 1 and self._recent:
+            tail = np.fromiter(self._recent, dtype=np.float64)[-(self.period - 1):]
+            prior[len(prior) - len(tail):] = tail
+        windows = np.lib.stride_tricks.sliding_window_view(np.concatenate((prior, values)), self.period)
+        out = _mask_warmup(np.fmax.reduce(windows, axis=1), self.count, self.period)
+        start = self.count + n - min(n, self.period)
+        for i, v in enumerate(values[-self.period:].tolist()):
+            self._push(start + i, v)
+        self.count += n
+        return out
+
+    def _push(self, index: int, value: float) -> None:
+        self._recent.append(value)
+        candidates = self._candidates
+        if not math.isnan(value):
+            while candidates and candidates[-1][1] <= value:
+                candidates.pop()
+            candidates.append((index, value))
+        while candidates and candidates[0][0] <= index - self.period:
+            candidates.popleft()
+
+
+class _EWM:
+    """Exponential smoothing matching ``Series.ewm(alpha, adjust=False)``.
+
+    ``update`` repeats pandas' arithmetic step for step; ``batch`` runs
+    pandas itself, prepending the current value to continue the recursion.
+    """
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        # pandas turns alpha into a center of mass and back; the round trip
+        # can move it by an ulp, so step with the value pandas ends up using
+        self._step = 1.0 / (1.0 + (1 - alpha) / alpha)
+        self.count = 0
+        self.value = None
+
+    def update(self, x: float) -> float:
+        if self.value is None:
+            self.value = x
+        elif self.value != x:
+            old_wt = 1.0 - self._step
+            self.value = (old_wt * self.value + self._step * x) / (old_wt + self._step)
+        self.count += 1
+        return self.value
+
+    def batch(self, values: np.ndarray) -> np.ndarray:
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return values.copy()
+        if self.value is None:
+            out = pd.Series(values).ewm(alpha=self.alpha, adjust=False).mean().to_numpy()
+        else:
+            seeded = pd.Series(np.concatenate(([self.value], values)))
+            out = seeded.ewm(alpha=self.alpha, adjust=False).mean().to_numpy()[1:]
+        self.value = float(out[-1])
+        self.count += len(values)
+        return out
+
+
+def _mask_warmup(values: np.ndarray, seen: int, period: int) -> np.ndarray:
+    """NaN out the leading values produced before ``period`` inputs were seen."""
+    warm = max(0, period - 1 - seen)
+    if warm:
+        values = values.copy()
+        values[:warm] = np.nan
+    return values
+
+
+def _div(a: float, b: float) -> float:
+    """``a / b`` with NumPy's float semantics for a zero divisor."""
+    if b == 0:
+        if a == 0 or math.isnan(a):
+            return math.nan
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+def _rsi(avg_gain: float, avg_loss: float) -> float:
+    return 100 - (100 / (1 + _div(avg_gain, avg_loss)))
+
+
+def _rsi_array(avg_gain: np.ndarray, avg_loss: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+def _series(values: np.ndarray, like: pd.Series) -> pd.Series:
+    return pd.Series(values, index=like.index)
@@ -0,0 +1,196 @@
+"""Incremental 1m candle ingestion into append-only segments.
+
+For each symbol the manifest (``services/segments.py``) says which ranges
+are already on disk; only the missing ranges between ``start`` and now are
+fetched, and each run of fetched candles is written as a new segment.
+Symbols are fetched concurrently, with one rate limiter shared by every
+thread so the exchange sees a single request budget.
+
+The exchange client is pluggable: anything with ``fetch(symbol, since,
+limit)`` returning ``[[timestamp, open, high, low, close, volume], ...]``
+and a ``rate_limit`` (seconds between requests) works. ``CcxtSource``
+talks to a real exchange; ``FakeSource`` generates deterministic candles
+offline.
+
+Run ``python -m services.ingestion [SYMBOL ...] [--since YYYY-MM-DD]`` from
+``backend/``. A legacy ``<symbol>.csv`` is adopted as the first segment.
+"""
+import argparse
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from config import INGEST_EXCHANGE, INGEST_MAX_WORKERS, INGEST_START
+from services import columnar_store, segments
+from services.segments import CANDLE_MS, SEGMENT_ROWS
+
+BATCH_LIMIT = 1000  # candles per request
+_MAX_RETRIES = 5
+
+
+class RateLimiter:
+    """Spaces calls at least ``interval`` seconds apart across threads."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class CcxtSource:
+    """Spot 1m candles from a ccxt exchange; symbols as ``BTCUSDT``."""
+
+    def __init__(self, exchange_id: str = INGEST_EXCHANGE):
+        # Imported here so ingestion (and FakeSource) work without ccxt
+        import ccxt
+
+        self.exchange = getattr(ccxt, exchange_id)({"options": {"defaultType": "spot"}})
+        self.rate_limit = self.exchange.rateLimit / 1000
+        self._markets = None
+        self._lock = threading.Lock()
+
+    def fetch(self, symbol: str, since: int, limit: int) -> list:
+        return self.exchange.fetch_ohlcv(self._market(symbol), "1m", since, limit)
+
+    def _market(self, symbol: str) -> str:
+        with self._lock:
+            if self._markets is None:
+                self._markets = {m["id"]: m["symbol"] for m in self.exchange.load_markets().values()}
+        return self._markets.get(symbol, symbol)
+
+
+class FakeSource:
+    """Deterministic offline candles (exchange-style rounding); a value depends only on symbol and time.
+
+    ``gaps`` are ``(start, end)`` ranges with no candles (like exchange
+    outages); nothing exists at or after ``now``. ``requests`` counts calls.
+    """
+
+    def __init__(self, now: int, gaps: tuple = (), rate_limit: float = 0.0):
+        self.now = now
+        self.gaps = list(gaps)
+        self.rate_limit = rate_limit
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def fetch(self, symbol: str, since: int, limit: int) -> list:
+        with self._lock:
+            self.requests += 1
+        first = -(-since // CANDLE_MS) * CANDLE_MS
+        ts = np.arange(first, self.now, CANDLE_MS, dtype=np.int64)
+        for lo, hi in self.gaps:
+            ts = ts[(ts < lo) | (ts >= hi)]
+        ts = ts[:limit]
+        # Smooth wave plus per-candle noise seeded by (symbol, minute)
+        base = 100 + (zlib.crc32(symbol.encode()) % 900)
+        rows = []
+        for t in ts.tolist():
+            rng = np.random.default_rng([zlib.crc32(symbol.encode()), t // CANDLE_MS])
+            mid = base * (1 + 0.05 * np.sin(t / 3.6e6))
+            o, c = mid * (1 + rng.normal(0, 1e-3, 2))
+            spread = abs(rng.normal(0, 1e-3)) * mid
+            prices = [round(float(p), 2) for p in (o, max(o, c) + spread, min(o, c) - spread, c)]
+            rows.append([t, *prices, round(float(rng.gamma(2.0, 5.0)), 3)])
+        return rows
+
+
+def ingest(
+    symbols: list[str], source, start: int, end: int | None = None, max_workers: int = INGEST_MAX_WORKERS
+) -> dict[str, dict]:
+    """Fetch every missing 1m candle of ``symbols`` in ``[start, end)``.
+
+    ``end`` defaults to the start of the current (unfinished) minute.
+    Returns symbol → ``{"rows": written}`` or ``{"error": ...}``.
+    """
+    if end is None:
+        end = int(time.time() * 1000) // CANDLE_MS * CANDLE_MS
+    limiter = RateLimiter(source.rate_limit)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(symbols)))) as pool:
+        futures = {s: pool.submit(ingest_symbol, s, source, limiter, start, end) for s in symbols}
+    results = {}
+    for symbol, future in futures.items():
+        try:
+            results[symbol] = {"rows": future.result()}
+        except Exception as e:
+            results[symbol] = {"error": str(e)}
+    return results
+
+
+def ingest_symbol(symbol: str, source, limiter: RateLimiter, start: int, end: int) -> int:
+    """Fill the gaps of one symbol's manifest in ``[start, end)``; returns rows written."""
+    csv_file = columnar_store.csv_path(symbol)
+    if not segments.has_segments(symbol) and os.path.exists(csv_file):
+        segments.adopt_csv(symbol, csv_file)
+        print(f"{symbol}: adopted {csv_file} as the first segment")
+
+    written = 0
+    for lo, hi in segments.missing_ranges(segments.load_manifest(symbol)["ranges"], start, end):
+        since = lo
+        batches = []
+        rows = 0
+        while since < hi:
+            batch = _fetch(source, limiter, symbol, since)
+            batch = batch[(batch[:, 0] >= since) & (batch[:, 0] < hi)] if len(batch) else batch
+            if len(batch) == 0:
+                break
+            batches.append(batch)
+            rows += len(batch)
+            next_since = int(batch[-1, 0]) + CANDLE_MS
+            if rows >= SEGMENT_ROWS:
+                segments.write_segment(symbol, np.concatenate(batches), lo, next_since)
+                written += rows
+                lo, batches, rows = next_since, [], 0
+            since = next_since
+        if batches:
+            segments.write_segment(symbol, np.concatenate(batches), lo, since)
+            written += rows
+        print(f"{symbol}: {written} candles written, covered until (UTC) {pd.to_datetime(since, unit='ms')}")
+    return written
+
+
+# ─── Private helpers ──────────────────────────────────────────────────
+
+
+def _fetch(source, limiter: RateLimiter, symbol: str, since: int) -> np.ndarray:
+    """One rate-limited request with exponential backoff; (n, 6) float64 rows."""
+    for attempt in range(_MAX_RETRIES):
+        limiter.wait()
+        try:
+            rows = source.fetch(symbol, since, BATCH_LIMIT)
+            return np.asarray(rows, dtype=np.float64).reshape(-1, 6)
+        except Exception as e:
+            if attempt == _MAX_RETRIES - 1:
+                raise
+            print(f"{symbol}: fetch failed ({e}), retrying")
+            time.sleep(2 ** attempt)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Fetch missing 1m candles into data/<SYMBOL>.segments/")
+    parser.add_argument("symbols", nargs="*", default=["BTCUSDT", "ETHUSDT"])
+    parser.add_argument("--since", default=INGEST_START, help="first day to cover (UTC), default %(default)s")
+    parser.add_argument("--exchange", default=INGEST_EXCHANGE)
+    parser.add_argument("--workers", type=int, default=INGEST_MAX_WORKERS)
+    args = parser.parse_args(argv)
+
+    start = int(pd.Timestamp(args.since, tz="UTC").timestamp() * 1000)
+    results = ingest(args.symbols, CcxtSource(args.exchange), start, max_workers=args.workers)
+    for symbol, result in results.items():
+        print(f"{symbol}: {result}")
+
+
+if __name__ == "__main__":
+    main()
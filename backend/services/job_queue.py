@@ -0,0 +1,220 @@
+"""Bounded worker pool for CPU-bound work plus an in-memory job registry.
+
+Routes hand blocking calls (backtests, manual trades, sweeps) to
+``run_in_pool`` instead of running them on the event loop. At most
+``WORKER_QUEUE_DEPTH`` calls may be queued or running at once; past that
+``QueueFull`` is raised so the route can answer 429. NDJSON streams, which
+run on Starlette's threadpool, hold a slot for their lifetime through
+``admit_stream``.
+
+Jobs that parallelise internally (batch groups, portfolio schedules,
+parameter sweeps) use ``fan_out``: one helper process pool per name,
+shared by every job and bounded by its size, rather than a new pool per
+call.
+"""
+import asyncio
+import contextvars
+import threading
+import time
+import uuid
+import weakref
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from config import JOB_RESULT_TTL_SEC, WORKER_POOL_KIND, WORKER_POOL_SIZE, WORKER_QUEUE_DEPTH
+from services.data_service import start_source_watcher
+
+
+class QueueFull(Exception):
+    """Raised when the worker pool already holds WORKER_QUEUE_DEPTH calls."""
+
+
+_executor: Executor | None = None
+_lock = threading.Lock()
+_inflight = 0
+# job_id → {"future", "kind", "submitted", "finished"}
+_jobs: dict[str, dict] = {}
+# name → helper ProcessPoolExecutor (see fan_out)
+_helpers: dict[str, ProcessPoolExecutor] = {}
+
+
+async def run_in_pool(fn, *args):
+    """Run ``fn(*args)`` on the worker pool and await its result."""
+    future = _submit(fn, *args)
+    return await asyncio.wrap_future(future)
+
+
+def admit_stream(items):
+    """Hold one pool slot while the generator ``items`` is streamed.
+
+    Raises ``QueueFull`` up front, like ``run_in_pool``; the slot is freed
+    once the stream ends, fails, is closed, or is dropped unstarted.
+    """
+    _acquire()
+    release = _once(_release)
+
+    def stream():
+        try:
+            yield from items
+        finally:
+            release()
+
+    held = stream()
+    weakref.finalize(held, release)
+    return held
+
+
+def fan_out(name: str, size: int, fn, items: list, workers: int) -> list:
+    """``[fn(item) for item in items]`` on up to ``workers`` processes of helper pool ``name``.
+
+    The pool (``size`` processes) is created on first use and shared by
+    every caller of ``name``; ``items`` are split into ``workers``
+    contiguous chunks so one call cannot take more than its share.
+    """
+    workers = min(workers, size, len(items))
+    if workers <= 1:
+        return [fn(item) for item in items]
+    with _lock:
+        pool = _helpers.get(name)
+        if pool is None:
+            pool = _helpers[name] = ProcessPoolExecutor(max_workers=size, initializer=start_source_watcher)
+    bounds = [len(items) * i // workers for i in range(workers + 1)]
+    futures = [pool.submit(_map_chunk, fn, items[lo:hi]) for lo, hi in zip(bounds, bounds[1:])]
+    return [result for future in futures for result in future.result()]
+
+
+def submit_job(kind: str, fn, *args) -> str:
+    """Queue ``fn(*args)`` as a pollable job and return its id."""
+    _expire_jobs()
+    future = _submit(fn, *args)
+    job_id = uuid.uuid4().hex
+    job = {"future": future, "kind": kind, "submitted": time.time(), "finished": None}
+    future.add_done_callback(lambda _: job.update(finished=time.time()))
+    with _lock:
+        _jobs[job_id] = job
+    return job_id
+
+
+def job_status(job_id: str) -> dict | None:
+    job = _jobs.get(job_id)
+    if job is None:
+        return None
+    future = job["future"]
+    if future.cancelled():
+        status = "cancelled"
+    elif future.done():
+        status = "failed" if future.exception() is not None else "done"
+    elif future.running():
+        status = "running"
+    else:
+        status = "queued"
+    info = {
+        "job_id": job_id,
+        "kind": job["kind"],
+        "status": status,
+        "submitted": job["submitted"],
+        "finished": job["finished"],
+    }
+    if status == "failed":
+        info["error"] = str(future.exception())
+    return info
+
+
+def job_result(job_id: str):
+    """The job's result; only valid once ``job_status`` reports "done"."""
+    return _jobs[job_id]["future"].result()
+
+
+def cancel_job(job_id: str) -> bool:
+    """Cancel a job that has not started yet."""
+    job = _jobs.get(job_id)
+    return job is not None and job["future"].cancel()
+
+
+def pool_stats() -> dict:
+    return {
+        "kind": WORKER_POOL_KIND,
+        "workers": WORKER_POOL_SIZE,
+        "max_queue_depth": WORKER_QUEUE_DEPTH,
+        "inflight": _inflight,
+        "jobs": len(_jobs),
+    }
+
+
+def shutdown_pool() -> None:
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+        for pool in _helpers.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        _helpers.clear()
+
+
+# ─── Private helpers ──────────────────────────────────────────────────
+
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if WORKER_POOL_KIND == "process":
+            # Each process has its own OHLCV cache; keep it current with appended candles
+            _executor = ProcessPoolExecutor(max_workers=WORKER_POOL_SIZE, initializer=start_source_watcher)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=WORKER_POOL_SIZE, thread_name_prefix="worker")
+    return _executor
+
+
+def _acquire() -> None:
+    global _inflight
+    with _lock:
+        if _inflight >= WORKER_QUEUE_DEPTH:
+            raise QueueFull(f"{_inflight} calls already queued or running")
+        _inflight += 1
+
+
+def _submit(fn, *args) -> Future:
+    _acquire()
+    with _lock:
+        executor = _get_executor()
+    try:
+        if isinstance(executor, ThreadPoolExecutor):
+            # Carry the caller's context (e.g. request-scoped state) into the thread.
+            future = executor.submit(contextvars.copy_context().run, fn, *args)
+        else:
+            future = executor.submit(fn, *args)
+    except Exception:
+        _release()
+        raise
+    future.add_done_callback(lambda _: _release())
+    return future
+
+
+def _release() -> None:
+    global _inflight
+    with _lock:
+        _inflight -= 1
+
+
+def _once(fn):
+    """``fn`` wrapped to run on the first call only."""
+    pending = [fn]
+
+    def call():
+        with _lock:
+            todo = pending.pop() if pending else None
+        if todo is not None:
+            todo()
+
+    return call
+
+
+def _map_chunk(fn, items: list) -> list:
+    return [fn(item) for item in items]
+
+
+def _expire_jobs() -> None:
+    cutoff = time.time() - JOB_RESULT_TTL_SEC
+    with _lock:
+        for job_id in [j for j, job in _jobs.items() if job["finished"] and job["finished"] < cutoff]:
+            del _jobs[job_id]
@@ -0,0 +1,101 @@
+"""Performance metrics over a realized equity curve and its trades.
+
+The curve is passed as (time, value) points of a step function: the first
+candle plus one point per exit is enough, and any superset of those points
+(such as every candle) gives the same numbers. Times are chart seconds;
+Sharpe and Sortino use end-of-day equity over calendar days, annualized
+with 365 days since crypto trades every day.
+"""
+import math
+
+import numpy as np
+
+from services.data_service import sanitize_float
+
+DAY_SEC = 86_400
+PERIODS_PER_YEAR = 365
+
+
+def performance_metrics(
+    times: np.ndarray,
+    equity: np.ndarray,
+    end_time: int,
+    trades: list[dict],
+    initial_capital: float,
+    final_capital: float,
+) -> dict:
+    """Risk-adjusted stats to merge into a backtest result.
+
+    ``end_time`` is the last candle's time; ``trades`` are already
+    sanitized (``pnl`` may be ``None``).
+    """
+    times = np.asarray(times, dtype=np.int64)
+    equity = np.asarray(equity, dtype=np.float64)
+    values = np.where(np.isfinite(equity), equity, 0.0)
+    pnl = np.array([t["pnl"] or 0.0 for t in trades], dtype=np.float64)
+    span = end_time - int(times[0]) if len(times) else 0
+
+    dd_pct, dd_days = _drawdown(times, values, end_time)
+    returns = _daily_returns(times, values, end_time)
+    downside = math.sqrt(float(np.mean(np.minimum(returns, 0.0) ** 2))) if len(returns) else 0.0
+    cagr = _cagr(initial_capital, final_capital, span)
+    gross_profit = float(pnl[pnl > 0].sum())
+    gross_loss = -float(pnl[pnl < 0].sum())
+    held = sum(t["exit_time"] - t["entry_time"] for t in trades)
+
+    metrics = {
+        "max_drawdown_pct": round(dd_pct, 2),
+        "max_drawdown_days": round(dd_days, 2),
+        "sharpe_ratio": _annualized(returns, float(np.std(returns, ddof=1)) if len(returns) > 1 else 0.0),
+        "sortino_ratio": _annualized(returns, downside),
+        "calmar_ratio": round(cagr / (dd_pct / 100), 2) if cagr is not None and dd_pct > 0 else None,
+        "profit_factor": round(gross_profit / gross_loss, 2) if gross_loss > 0 else None,
+        "exposure_pct": round(held / span * 100, 1) if span > 0 else 0,
+        "avg_trade": round(float(pnl.mean()), 2) if len(pnl) else 0,
+    }
+    return {k: sanitize_float(v) for k, v in metrics.items()}
+
+
+# ─── Private helpers ──────────────────────────────────────────────────
+
+
+def _drawdown(times: np.ndarray, values: np.ndarray, end_time: int) -> tuple[float, float]:
+    """Deepest drawdown in percent of its peak, longest time under a peak in days."""
+    if len(values) == 0:
+        return 0.0, 0.0
+    peak = np.maximum.accumulate(values)
+    depth = np.divide(peak - values, peak, out=np.zeros_like(values), where=peak > 0)
+    under = values < peak
+    if not under.any():
+        return 0.0, 0.0
+    # Index where equity last moved to its running peak
+    reached = (values == peak) & np.concatenate(([True], values[1:] != values[:-1]))
+    peak_at = np.maximum.accumulate(np.where(reached, np.arange(len(values)), 0))
+    edges = np.diff(np.concatenate(([0], under.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    # First point back at the peak, or the end of the data if never recovered
+    recovered = np.append(times, end_time)[np.flatnonzero(edges == -1)]
+    longest = int((recovered - times[peak_at[starts]]).max())
+    return float(depth.max()) * 100, longest / DAY_SEC
+
+
+def _daily_returns(times: np.ndarray, values: np.ndarray, end_time: int) -> np.ndarray:
+    if len(values) == 0:
+        return np.empty(0)
+    days = np.arange(times[0] // DAY_SEC, end_time // DAY_SEC + 1)
+    at_close = values[np.searchsorted(times, (days + 1) * DAY_SEC, side="left") - 1]
+    equity = np.concatenate((values[:1], at_close))
+    return np.divide(np.diff(equity), equity[:-1], out=np.zeros(len(days)), where=equity[:-1] > 0)
+
+
+def _annualized(returns: np.ndarray, deviation: float) -> float | None:
+    if len(returns) < 2 or deviation == 0:
+        return None
+    return round(float(np.mean(returns)) / deviation * math.sqrt(PERIODS_PER_YEAR), 2)
+
+
+def _cagr(initial: float, final: float, span_sec: int) -> float | None:
+    years = span_sec / (PERIODS_PER_YEAR * DAY_SEC)
+    if years <= 0 or initial <= 0 or final <= 0:
+        return None
+    return (final / initial) ** (1 / years) - 1
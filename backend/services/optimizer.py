@@ -0,0 +1,248 @@
+import itertools
+import math
+from contextlib import contextmanager, suppress
+from functools import partial
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from config import OPTIMIZE_MAX_COMBINATIONS, OPTIMIZE_MAX_WORKERS
+from models.schemas import BacktestRequest, OptimizeRequest, ParamRange
+from services.backtest_engine import (
+    equity_levels,
+    indicator_specs,
+    signals_from_indicators,
+    simulate,
+    summarize,
+)
+from services.data_service import load_snapshot
+from services.job_queue import fan_out
+
+RANK_FIELDS = ("final_capital", "total_pnl", "win_rate", "max_drawdown", "total_trades")
+
+# Grids smaller than this run inline; copying arrays into shared memory costs more.
+_MIN_POOL_COMBINATIONS = 8
+
+
+def run_optimization(req: OptimizeRequest) -> dict:
+    """Backtest every combination of ``req.grid`` and rank the stats."""
+    if req.sort_by not in RANK_FIELDS:
+        return {"error": f"sort_by must be one of {', '.join(RANK_FIELDS)}"}
+    try:
+        combos = expand_grid(req.grid)
+    except ValueError as e:
+        return {"error": str(e)}
+    if len(combos) > OPTIMIZE_MAX_COMBINATIONS:
+        return {"error": f"Grid has {len(combos)} combinations (max {OPTIMIZE_MAX_COMBINATIONS})"}
+
+    try:
+        # A combination that fails validation (e.g. a non-numeric leverage)
+        # raises pydantic's ValidationError, a ValueError
+        requests = [with_params(req.base, params) for params in combos]
+        arrays = load_sweep_arrays(requests)
+    except ValueError as e:
+        return {"error": str(e)}
+
+    workers = max(1, min(req.max_workers or OPTIMIZE_MAX_WORKERS, OPTIMIZE_MAX_WORKERS))
+    if workers == 1 or len(requests) < _MIN_POOL_COMBINATIONS:
+        stats = [evaluate(r, arrays[(r.symbol, r.timeframe)]) for r in requests]
+    else:
+        with shared_arrays(arrays) as layouts:
+            stats = sweep(layouts, requests, workers)
+
+    rows = sort_rows([{"params": params, **s} for params, s in zip(combos, stats)], req.sort_by)
+    return {
+        "total_combinations": len(rows),
+        "sort_by": req.sort_by,
+        "results": rows[: req.top_n] if req.top_n else rows,
+    }
+
+
+def sort_rows(rows: list[dict], sort_by: str) -> list[dict]:
+    """Best first: highest value, except the lowest ``max_drawdown``."""
+    return sorted(rows, key=lambda row: row[sort_by], reverse=sort_by != "max_drawdown")
+
+
+def expand_grid(grid: dict) -> list[dict]:
+    """Every combination of the grid axes as {field: value}; ValueError if invalid.
+
+    Besides BacktestRequest fields, ``params.<name>`` axes vary one entry
+    of ``BacktestRequest.params`` (strategy parameters without a field).
+    """
+    fields = BacktestRequest.model_fields
+    axes = []
+    for name, values in grid.items():
+        if name not in fields and not (name.startswith("params.") and len(name) > 7):
+            raise ValueError(f"Unknown BacktestRequest field: {name}")
+        if isinstance(values, ParamRange):
+            values = _range_values(values)
+        if not values:
+            raise ValueError(f"Empty range for {name}")
+        axes.append([(name, v) for v in values])
+    return [dict(combo) for combo in itertools.product(*axes)]
+
+
+def with_params(base: BacktestRequest, combo: dict) -> BacktestRequest:
+    """``base`` with one grid combination applied."""
+    fields = base.model_dump()
+    strategy_params = dict(fields["params"])
+    for name, value in combo.items():
+        if name.startswith("params."):
+            strategy_params[name[len("params."):]] = value
+        else:
+            fields[name] = value
+    return BacktestRequest(**{**fields, "params": strategy_params})
+
+
+def load_sweep_arrays(requests: list[BacktestRequest]) -> dict[tuple[str, str], dict]:
+    """Load each dataset once and compute each unique indicator once.
+
+    Returns (symbol, timeframe) → {column name or indicator spec → array};
+    raises ValueError when a dataset has no data.
+    """
+    specs: dict[tuple[str, str], dict] = {}
+    for r in requests:
+        named = specs.setdefault((r.symbol, r.timeframe), {})
+        named.update((spec, spec) for spec in indicator_specs(r).values())
+    arrays: dict[tuple[str, str], dict] = {}
+    for (symbol, timeframe), named in specs.items():
+        snapshot = load_snapshot(symbol, timeframe, named)
+        if snapshot is None:
+            raise ValueError(f"No data for {symbol} {timeframe}")
+        data, indicators = snapshot
+        arrays[(symbol, timeframe)] = {
+            "timestamp": data.timestamp,
+            "high": data.high,
+            "low": data.low,
+            "close": data.close,
+            **indicators,
+        }
+    return arrays
+
+
+def evaluate(req: BacktestRequest, arrays: dict, lo: int = 0, hi: int | None = None) -> dict:
+    """Stats for one combination over candles [lo, hi); no trade list, curve or overlay.
+
+    Indicators are computed on the full series, so a window's first candles
+    still see their real warm-up history.
+    """
+    window = slice(lo, hi)
+    indicators = {name: _window(arrays[spec], window) for name, spec in indicator_specs(req).items()}
+    close = arrays["close"][window]
+    signal = signals_from_indicators(req, indicators, close)
+    trades, capital, exits = simulate(
+        arrays["timestamp"][window], arrays["high"][window], arrays["low"][window], close, signal, req
+    )
+    levels, level_idx = equity_levels(len(close), req.initial_capital, exits)
+    stats = summarize(req, trades, capital, np.asarray(levels, dtype=np.float64)[level_idx])
+    del stats["initial_capital"]
+    return stats
+
+
+@contextmanager
+def shared_arrays(arrays: dict):
+    """Copy ``load_sweep_arrays`` output into shared memory; yields its layouts for ``sweep``.
+
+    The blocks are unlinked when the block exits.
+    """
+    blocks = []
+    try:
+        layouts = {}
+        for key, named in arrays.items():
+            block, layout = _share(named)
+            blocks.append(block)
+            layouts[key] = (block.name, layout)
+        yield layouts
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def sweep(layouts: dict, requests: list[BacktestRequest], workers: int, lo: int = 0, hi: int | None = None) -> list[dict]:
+    """``evaluate`` each request over [lo, hi) of the ``shared_arrays``, in order.
+
+    Runs on up to ``workers`` processes of the ``"optimize"`` helper pool,
+    which every sweep shares (see ``job_queue.fan_out``).
+    """
+    parts = max(1, min(workers, OPTIMIZE_MAX_WORKERS, len(requests)))
+    bounds = [len(requests) * i // parts for i in range(parts + 1)]
+    chunks = [requests[a:b] for a, b in zip(bounds, bounds[1:])]
+    task = partial(evaluate_shared, layouts, lo=lo, hi=hi)
+    return [s for stats in fan_out("optimize", OPTIMIZE_MAX_WORKERS, task, chunks, parts) for s in stats]
+
+
+def evaluate_shared(layouts: dict, requests: list[BacktestRequest], lo: int = 0, hi: int | None = None) -> list[dict]:
+    """Pool task: ``evaluate`` each request over [lo, hi) of the shared arrays.
+
+    Attaches the blocks for the duration of the task only, so a helper
+    process keeps nothing mapped once the sweep that owns them is done.
+    """
+    # The helper pool shares the parent's resource tracker, which already
+    # tracks each block until the parent unlinks it; attaching again only
+    # re-registers the same name, so there is nothing to unregister here.
+    blocks = {key: shared_memory.SharedMemory(name=name) for key, (name, _) in layouts.items()}
+    try:
+        arrays = {key: _views(blocks[key], layout) for key, (_, layout) in layouts.items()}
+        return [evaluate(r, arrays[(r.symbol, r.timeframe)], lo, hi) for r in requests]
+    finally:
+        arrays = None
+        for block in blocks.values():
+            # Views still referenced (e.g. by a traceback) keep the mapping until collected
+            with suppress(BufferError):
+                block.close()
+
+
+# ─── Private helpers ──────────────────────────────────────────────────
+
+
+def _range_values(r: ParamRange) -> list:
+    if r.step <= 0:
+        raise ValueError("Range step must be positive")
+    count = math.floor((r.stop - r.start) / r.step + 1e-9) + 1
+    values = [round(r.start + i * r.step, 10) for i in range(max(count, 0))]
+    if all(float(v).is_integer() for v in (r.start, r.step)):
+        values = [int(v) for v in values]
+    return values
+
+
+def _window(values, window: slice):
+    # Multi-output indicators (bands, channels, MACD) are tuples of arrays
+    if isinstance(values, tuple):
+        return tuple(arr[window] for arr in values)
+    return values[window]
+
+
+def _share(named: dict) -> tuple[shared_memory.SharedMemory, list]:
+    """Copy arrays into one shared-memory block; return it with its layout.
+
+    Each component of a tuple-valued indicator gets its own entry, keyed
+    by its position (``None`` for a plain array).
+    """
+    parts = [
+        (name, i, arr)
+        for name, values in named.items()
+        for i, arr in (enumerate(values) if isinstance(values, tuple) else [(None, values)])
+    ]
+    layout = []
+    offset = 0
+    for name, i, arr in parts:
+        layout.append((name, i, arr.dtype.str, offset, len(arr)))
+        offset += arr.nbytes
+    block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for (name, i, dtype, start, length), (_, _, arr) in zip(layout, parts):
+        np.ndarray(length, dtype=dtype, buffer=block.buf, offset=start)[:] = arr
+    return block, layout
+
+
+def _views(block: shared_memory.SharedMemory, layout: list) -> dict:
+    """Read-only arrays over ``block`` per ``_share`` layout; tuple entries rebuilt."""
+    views = {}
+    for name, i, dtype, offset, length in layout:
+        view = np.ndarray(length, dtype=dtype, buffer=block.buf, offset=offset)
+        view.flags.writeable = False
+        if i is None:
+            views[name] = view
+        else:
+            views[name] = (*views.get(name, ()), view)
+    return views
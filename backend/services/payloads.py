@@ -0,0 +1,107 @@
+"""Columnar response formats for large payloads.
+
+``rows`` (the default) is the original list-of-dicts JSON. ``columns``
+returns parallel arrays (``{"time": [...], "open": [...]}``) as compact
+JSON, and ``binary`` packs every NumPy array as a raw little-endian buffer
+behind a JSON header:
+
+    uint32 header length | header JSON (space-padded to 8 bytes) | buffers
+
+The header holds the rest of the payload under ``meta`` plus one
+``{"name", "dtype", "offset", "length"}`` entry per buffer, where ``name``
+is the dotted path of the array in the payload (e.g. ``overlay.rsi.value``)
+and ``offset`` is relative to the end of the header. NaN stays NaN in
+binary buffers and becomes ``null`` in JSON.
+
+Long runs stream NDJSON instead (``ndjson``): one JSON event per line as
+the runner produces it, so no single response holds the whole result.
+"""
+import json
+import struct
+
+import numpy as np
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from services.timing import span
+
+FORMATS = ("rows", "columns", "binary")
+COLUMNS_MEDIA_TYPE = "application/vnd.columns+json"
+BINARY_MEDIA_TYPE = "application/octet-stream"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def negotiate_format(fmt: str | None, accept: str | None) -> str:
+    """Explicit ``format`` query param first, then the Accept header, else rows."""
+    if fmt:
+        return fmt
+    accept = accept or ""
+    if BINARY_MEDIA_TYPE in accept:
+        return "binary"
+    if COLUMNS_MEDIA_TYPE in accept:
+        return "columns"
+    return "rows"
+
+
+def json_column(arr: np.ndarray) -> list:
+    """Array → JSON-safe list, NaN/Inf masked to None in one vectorized pass."""
+    if arr.dtype.kind != "f":
+        return arr.tolist()
+    bad = ~np.isfinite(arr)
+    if not bad.any():
+        return arr.tolist()
+    out = arr.astype(object)
+    out[bad] = None
+    return out.tolist()
+
+
+def render(payload: dict, fmt: str) -> Response:
+    """Encode a payload whose array leaves are NumPy arrays; errors stay JSON."""
+    with span("render"):
+        if fmt == "binary" and "error" not in payload:
+            return Response(encode_binary(payload), media_type=BINARY_MEDIA_TYPE)
+        return JSONResponse(_to_json(payload), media_type=COLUMNS_MEDIA_TYPE if fmt == "columns" else None)
+
+
+def ndjson(items) -> StreamingResponse:
+    """Stream one JSON object per line as the generator ``items`` yields them.
+
+    The sync generator is iterated on Starlette's threadpool, so the event
+    loop stays free; closing the connection stops the runner.
+    """
+    return StreamingResponse((json.dumps(item) + "\n" for item in items), media_type=NDJSON_MEDIA_TYPE)
+
+
+def encode_binary(payload: dict) -> bytes:
+    """Pack ``payload`` into the header + raw buffers layout described above."""
+    columns, buffers = [], []
+    offset = 0
+
+    def collect(tree: dict, prefix: str) -> dict:
+        nonlocal offset
+        meta = {}
+        for key, value in tree.items():
+            path = f"{prefix}{key}"
+            if isinstance(value, dict):
+                meta[key] = collect(value, path + ".")
+            elif isinstance(value, np.ndarray):
+                arr = np.ascontiguousarray(value, dtype=value.dtype.newbyteorder("<"))
+                pad = (-arr.nbytes) % 8
+                columns.append({"name": path, "dtype": arr.dtype.str, "offset": offset, "length": len(arr)})
+                buffers.extend((arr.tobytes(), b"\0" * pad))
+                offset += arr.nbytes + pad
+            else:
+                meta[key] = value
+        return meta
+
+    meta = collect(payload, "")
+    header = json.dumps({"meta": meta, "columns": columns}, separators=(",", ":")).encode()
+    header += b" " * ((-(len(header) + 4)) % 8)
+    return struct.pack("<I", len(header)) + header + b"".join(buffers)
+
+
+def _to_json(value):
+    if isinstance(value, dict):
+        return {k: _to_json(v) for k, v in value.items()}
+    if isinstance(value, np.ndarray):
+        return json_column(value)
+    return value
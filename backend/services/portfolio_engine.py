@@ -0,0 +1,151 @@
+"""Multi-symbol backtests sharing one capital pool.
+
+Each symbol's trade schedule (entries, exits, prices, reasons) only depends
+on its own candles and signals, so it is generated per symbol, in parallel
+on the shared ``"portfolio"`` helper pool (see ``job_queue.fan_out``) for
+larger portfolios, by the single-symbol kernel. A single time-ordered pass
+then merges every schedule on a common timestamp grid and re-sizes each
+position at entry: ``position_size_pct`` of the realized capital (an equal
+split of the pool unless given), capped by the free capital (realized
+capital less the margin of open positions).
+The margin is reserved until the position exits; an entry with no free
+capital is skipped along with its exit.
+"""
+import heapq
+
+import numpy as np
+
+from config import IST_OFFSET_SEC, PORTFOLIO_MAX_WORKERS
+from models.schemas import BacktestRequest, PortfolioRequest
+from services.backtest_engine import (
+    _close_trade,
+    _open_position,
+    equity_curve_points,
+    equity_levels,
+    indicator_specs,
+    signals_from_indicators,
+    simulate,
+    summarize,
+)
+from services.data_service import load_arrays, load_snapshot, sanitize_float
+from services.job_queue import fan_out
+from services.metrics import performance_metrics
+
+# Event phases at one timestamp: exits realize PnL before entries size new
+# positions; end-of-data closes run last (a position may open on that candle).
+_EXIT, _ENTRY, _END = 0, 1, 2
+
+
+def run_portfolio_backtest(req: PortfolioRequest) -> dict:
+    """Backtest ``req.base``'s strategy on every symbol with shared capital."""
+    symbols = list(dict.fromkeys(req.symbols))
+    if not symbols:
+        return {"error": "No symbols given"}
+    base = req.base
+    if "position_size_pct" not in base.model_fields_set:
+        # Equal split by default: at 100% the first symbol to enter would hold the whole pool
+        base = base.model_copy(update={"position_size_pct": 100 / len(symbols)})
+    fields = base.model_dump()
+    requests = [BacktestRequest(**{**fields, "symbol": s}) for s in symbols]
+
+    times = []
+    for r in requests:
+        data = load_arrays(r.symbol, r.timeframe)
+        if data is None:
+            return {"error": f"No data for {r.symbol} {r.timeframe}"}
+        times.append(data.timestamp // 1000 + IST_OFFSET_SEC)
+    # Common grid: the union of every symbol's candle times (chart seconds)
+    grid = np.unique(np.concatenate(times))
+
+    workers = max(1, min(req.max_workers or PORTFOLIO_MAX_WORKERS, PORTFOLIO_MAX_WORKERS))
+    schedules = fan_out("portfolio", PORTFOLIO_MAX_WORKERS, _schedule, requests, workers)
+
+    # ── One time-ordered pass over all symbols' events ──────────────
+    events = heapq.merge(*(_events(rank, schedule) for rank, schedule in enumerate(schedules)))
+    capital = base.initial_capital
+    positions = {}
+    # symbol → margin reserved by its open position
+    reserved = {}
+    trades = []
+    exits = []
+    symbol_pnl = {s: 0.0 for s in symbols}
+    symbol_exits = {s: [] for s in symbols}
+    for time, phase, rank, _, planned in events:
+        symbol = symbols[rank]
+        if phase == _ENTRY:
+            free = capital - sum(reserved.values())
+            if free <= 0:
+                continue
+            price = planned["entry_price"]
+            signal = 1 if planned["side"] == "long" else -1
+            margin = min(capital * (base.position_size_pct / 100), free)
+            positions[symbol] = _open_position(base, signal, price, capital, time)
+            positions[symbol]["size"] = margin / price
+            reserved[symbol] = margin
+            continue
+        if symbol not in positions:
+            continue  # its entry was skipped
+        del reserved[symbol]
+        pnl, trade = _close_trade(
+            positions.pop(symbol), planned["exit_price"], time, base.leverage, planned["exit_reason"]
+        )
+        capital += pnl
+        symbol_pnl[symbol] += pnl
+        k = int(np.searchsorted(grid, time))
+        trades.append({"symbol": symbol, **trade})
+        exits.append((k, capital))
+        symbol_exits[symbol].append((k, symbol_pnl[symbol]))
+
+    levels, level_idx = equity_levels(len(grid), base.initial_capital, exits)
+    equity = np.asarray(levels, dtype=np.float64)[level_idx]
+    stats = summarize(base, trades, capital, equity)
+    # Several symbols may exit on one candle: use the equity after all of them
+    points = np.union1d([0], [k for k, _ in exits])
+    metrics = performance_metrics(grid[points], equity[points], int(grid[-1]), trades, base.initial_capital, capital)
+    return {
+        **stats,
+        **metrics,
+        "symbols": {
+            s: _symbol_summary([t for t in trades if t["symbol"] == s], grid, symbol_exits[s])
+            for s in symbols
+        },
+        "trades": trades,
+        "equity_curve": _curve(grid, base.initial_capital, exits),
+    }
+
+
+# ─── Private helpers ──────────────────────────────────────────────────
+
+
+def _schedule(req: BacktestRequest) -> list[dict]:
+    """One symbol's trades from the single-symbol kernel (sizes are redone later)."""
+    data, indicators = load_snapshot(req.symbol, req.timeframe, indicator_specs(req))
+    signal = signals_from_indicators(req, indicators, data.close)
+    trades, _, _ = simulate(data.timestamp, data.high, data.low, data.close, signal, req)
+    return trades
+
+
+def _events(rank: int, schedule: list[dict]):
+    """(time, phase, rank, seq, trade) per entry and exit, already in time order."""
+    for seq, trade in enumerate(schedule):
+        yield trade["entry_time"], _ENTRY, rank, 2 * seq, trade
+        phase = _END if trade["exit_reason"] == "end" else _EXIT
+        yield trade["exit_time"], phase, rank, 2 * seq + 1, trade
+
+
+def _symbol_summary(trades: list[dict], grid: np.ndarray, exits: list) -> dict:
+    winning = [t for t in trades if t["pnl"] and t["pnl"] > 0]
+    losing = [t for t in trades if t["pnl"] and t["pnl"] < 0]
+    return {
+        "total_pnl": round(sum(t["pnl"] for t in trades if t["pnl"]), 2),
+        "total_trades": len(trades),
+        "winning_trades": len(winning),
+        "losing_trades": len(losing),
+        "win_rate": round(len(winning) / len(trades) * 100, 1) if trades else 0,
+        "pnl_curve": _curve(grid, 0, exits),
+    }
+
+
+def _curve(grid: np.ndarray, initial: float, exits: list) -> list[dict]:
+    idx, values = equity_curve_points(len(grid), initial, exits)
+    return [{"time": t, "value": sanitize_float(v)} for t, v in zip(grid[idx].tolist(), values)]
@@ -0,0 +1,218 @@
+"""Overfitting checks: rolling walk-forward analysis and Monte Carlo resampling.
+
+Both runners are generators that yield one JSON-ready dict per finished
+unit of work (a walk-forward window, a batch of simulations) followed by a
+``"summary"`` dict, so routes can stream them as NDJSON. Heavy work runs on
+the ``"optimize"`` helper pool shared with parameter sweeps (see
+``job_queue.fan_out``); results are still yielded in order.
+"""
+import numpy as np
+
+from config import MONTE_CARLO_MAX_SIMULATIONS, OPTIMIZE_MAX_WORKERS, WALK_FORWARD_MAX_RUNS
+from models.schemas import MonteCarloRequest, WalkForwardRequest
+from services.backtest_engine import run_backtest
+from services.data_service import to_chart_ts
+from services.job_queue import fan_out
+from services.optimizer import (
+    RANK_FIELDS,
+    evaluate,
+    expand_grid,
+    load_sweep_arrays,
+    shared_arrays,
+    sort_rows,
+    sweep,
+    with_params,
+)
+
+# Monte Carlo batch: at most this many simulations (one progress line each)
+# and simulations × trades cells held in memory
+_MC_BATCH_SIMULATIONS = 1000
+_MC_BATCH_CELLS = 2_000_000
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def walk_forward(req: WalkForwardRequest):
+    """Optimize on each in-sample window, test the winner on the next window.
+
+    Windows slide by ``step_bars`` (default: ``out_of_sample_bars``). Each
+    window's in-sample sweep runs on the shared ``"optimize"`` helper pool;
+    windows are yielded in order as soon as their out-of-sample run is done.
+    """
+    if req.sort_by not in RANK_FIELDS:
+        yield {"type": "error", "error": f"sort_by must be one of {', '.join(RANK_FIELDS)}"}
+        return
+    fixed = {"symbol", "timeframe", "engine"} & set(req.grid)
+    if fixed:
+        yield {"type": "error", "error": f"Cannot vary {', '.join(sorted(fixed))} in a walk-forward grid"}
+        return
+    if req.in_sample_bars < 1 or req.out_of_sample_bars < 1 or (req.step_bars or 1) < 1:
+        yield {"type": "error", "error": "Window sizes must be positive"}
+        return
+    try:
+        combos = expand_grid(req.grid) or [{}]
+        requests = [with_params(req.base, params) for params in combos]
+        arrays = load_sweep_arrays(requests)
+    except ValueError as e:
+        yield {"type": "error", "error": str(e)}
+        return
+
+    named = arrays[(req.base.symbol, req.base.timeframe)]
+    n = len(named["close"])
+    step = req.step_bars or req.out_of_sample_bars
+    windows = [
+        (lo, lo + req.in_sample_bars, min(lo + req.in_sample_bars + req.out_of_sample_bars, n))
+        for lo in range(0, n - req.in_sample_bars, step)
+    ]
+    if not windows:
+        yield {"type": "error", "error": f"Need more than {req.in_sample_bars} candles, have {n}"}
+        return
+    if len(windows) * len(requests) > WALK_FORWARD_MAX_RUNS:
+        yield {
+            "type": "error",
+            "error": f"{len(windows)} windows × {len(requests)} combinations exceeds {WALK_FORWARD_MAX_RUNS} runs",
+        }
+        return
+
+    workers = max(1, min(req.max_workers or OPTIMIZE_MAX_WORKERS, OPTIMIZE_MAX_WORKERS))
+    totals = {"is_pnl": 0.0, "is_bars": 0, "oos_pnl": 0.0, "oos_bars": 0, "profitable": 0}
+    if workers == 1:
+        in_sample = ([evaluate(r, named, lo, mid) for r in requests] for lo, mid, _ in windows)
+        for i, (window, stats) in enumerate(zip(windows, in_sample)):
+            yield _window_result(i, window, requests, combos, stats, named, req.sort_by, totals)
+    else:
+        with shared_arrays(arrays) as layouts:
+            for i, window in enumerate(windows):
+                stats = sweep(layouts, requests, workers, *window[:2])
+                yield _window_result(i, window, requests, combos, stats, named, req.sort_by, totals)
+
+    yield {
+        "type": "summary",
+        "windows": len(windows),
+        "profitable_windows": totals["profitable"],
+        "out_of_sample_pnl": round(totals["oos_pnl"], 2),
+        "in_sample_pnl": round(totals["is_pnl"], 2),
+        # Out-of-sample PnL per candle relative to in-sample PnL per candle
+        "walk_forward_efficiency": (
+            round((totals["oos_pnl"] / totals["oos_bars"]) / (totals["is_pnl"] / totals["is_bars"]), 3)
+            if totals["is_pnl"] > 0
+            else None
+        ),
+    }
+
+
+def monte_carlo(req: MonteCarloRequest):
+    """Resample the trade list of ``req.base``'s backtest ``simulations`` times.
+
+    Each trade is turned into a return on the capital it was opened with;
+    ``bootstrap`` draws trades with replacement, ``shuffle`` permutes them
+    (same final capital, different drawdown path). Yields progress per
+    batch, then percentiles of final capital and max drawdown.
+    """
+    if req.method not in ("bootstrap", "shuffle"):
+        yield {"type": "error", "error": "method must be bootstrap or shuffle"}
+        return
+    if not 1 <= req.simulations <= MONTE_CARLO_MAX_SIMULATIONS:
+        yield {"type": "error", "error": f"simulations must be between 1 and {MONTE_CARLO_MAX_SIMULATIONS}"}
+        return
+    result = run_backtest(req.base)
+    if "error" in result:
+        yield {"type": "error", "error": result["error"]}
+        return
+
+    pnl = np.array([t["pnl"] or 0.0 for t in result["trades"]], dtype=np.float64)
+    initial = float(req.base.initial_capital)
+    before = initial + np.concatenate(([0.0], np.cumsum(pnl)[:-1]))
+    returns = np.divide(pnl, before, out=np.zeros_like(pnl), where=before > 0)
+    yield {
+        "type": "original",
+        "total_trades": len(pnl),
+        "final_capital": result["final_capital"],
+        "max_drawdown": result["max_drawdown"],
+    }
+
+    batch = max(1, min(req.simulations, _MC_BATCH_SIMULATIONS, _MC_BATCH_CELLS // max(len(pnl), 1)))
+    sizes = [min(batch, req.simulations - i) for i in range(0, req.simulations, batch)]
+    seeds = np.random.SeedSequence(req.seed).spawn(len(sizes))
+    args = [(returns, initial, size, req.method, seed) for size, seed in zip(sizes, seeds)]
+
+    finals, drawdowns = [], []
+    workers = max(1, min(req.max_workers or OPTIMIZE_MAX_WORKERS, OPTIMIZE_MAX_WORKERS, len(sizes)))
+    # ``workers`` batches per round, so progress is reported as rounds finish
+    rounds = (
+        fan_out("optimize", OPTIMIZE_MAX_WORKERS, _simulate, args[i : i + workers], workers)
+        for i in range(0, len(args), workers)
+    )
+    yield from _collect((b for batches in rounds for b in batches), finals, drawdowns, req.simulations)
+
+    final = np.concatenate(finals)
+    drawdown = np.concatenate(drawdowns)
+    yield {
+        "type": "summary",
+        "simulations": len(final),
+        "method": req.method,
+        "final_capital": _percentiles(final),
+        "max_drawdown": _percentiles(drawdown),
+        "probability_of_loss": round(float((final < initial).mean()), 4),
+    }
+
+
+# ─── Private helpers ──────────────────────────────────────────────────
+
+
+def _window_result(i, window, requests, combos, stats, named, sort_by, totals) -> dict:
+    """Pick the in-sample winner, run it out of sample, update running totals."""
+    lo, mid, hi = window
+    best = sort_rows([{"index": j, **s} for j, s in enumerate(stats)], sort_by)[0]
+    j = best.pop("index")
+    oos = evaluate(requests[j], named, mid, hi)
+    totals["is_pnl"] += best["total_pnl"]
+    totals["is_bars"] += mid - lo
+    totals["oos_pnl"] += oos["total_pnl"]
+    totals["oos_bars"] += hi - mid
+    totals["profitable"] += oos["total_pnl"] > 0
+    ts = named["timestamp"]
+    return {
+        "type": "window",
+        "index": i,
+        "in_sample": {"start": to_chart_ts(ts[lo]), "end": to_chart_ts(ts[mid - 1]), "candles": mid - lo},
+        "out_of_sample": {"start": to_chart_ts(ts[mid]), "end": to_chart_ts(ts[hi - 1]), "candles": hi - mid},
+        "best_params": combos[j],
+        "in_sample_stats": best,
+        "out_of_sample_stats": oos,
+    }
+
+
+def _simulate_batch(returns: np.ndarray, initial: float, size: int, method: str, seed) -> tuple:
+    """Final capital and max drawdown of ``size`` resampled equity paths at once."""
+    rng = np.random.default_rng(seed)
+    n = len(returns)
+    if n == 0:
+        return np.full(size, initial), np.zeros(size)
+    if method == "shuffle":
+        idx = rng.permuted(np.broadcast_to(np.arange(n), (size, n)), axis=1)
+    else:
+        idx = rng.integers(0, n, size=(size, n))
+    equity = initial * np.cumprod(1.0 + returns[idx], axis=1)
+    peak = np.maximum(np.maximum.accumulate(equity, axis=1), initial)
+    return equity[:, -1], (peak - equity).max(axis=1)
+
+
+def _simulate(args: tuple) -> tuple:
+    return _simulate_batch(*args)
+
+
+def _collect(batches, finals: list, drawdowns: list, total: int):
+    for final, drawdown in batches:
+        finals.append(final)
+        drawdowns.append(drawdown)
+        done = sum(len(f) for f in finals)
+        yield {
+            "type": "progress",
+            "completed": done,
+            "total": total,
+            "median_final_capital": round(float(np.median(np.concatenate(finals))), 2),
+        }
+
+
+def _percentiles(values: np.ndarray) -> dict:
+    return {f"p{q}": round(float(v), 2) for q, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
@@ -0,0 +1,85 @@
+"""Multi-timeframe rollups built in one pass over the 1m arrays.
+
+Each timeframe in ``TIMEFRAME_MAP`` is aggregated from the next finer one
+(1m → 5m → 15m → 1h → 4h → 1d) with ``np.*.reduceat`` over bucket
+boundaries, instead of resampling the full 1m frame once per timeframe.
+Buckets and columns match ``df.resample(tf).agg(...).dropna()``: the
+bucket label is the floored ``datetime``, ``timestamp`` is the first
+candle's, and empty buckets are skipped. Volume is summed level by level,
+so it can differ from a single sum in the last bits.
+"""
+import numpy as np
+import pandas as pd
+
+from config import TIMEFRAME_MAP
+
+_PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+def ordered_timeframes() -> list[str]:
+    """Timeframes from finest to coarsest."""
+    return sorted(TIMEFRAME_MAP, key=lambda tf: pd.Timedelta(TIMEFRAME_MAP[tf]))
+
+
+def build_rollups(raw: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """Every coarser-than-1m timeframe of ``raw``, keyed like ``TIMEFRAME_MAP``."""
+    raw = raw.dropna(subset=list(_PRICE_COLUMNS))
+    dt = raw["datetime"].to_numpy()
+    unit = np.datetime_data(dt.dtype)[0]
+    level = {
+        "datetime": dt.astype(np.int64),
+        "timestamp": raw["timestamp"].to_numpy(dtype=np.int64),
+        **{col: raw[col].to_numpy(dtype=np.float64) for col in _PRICE_COLUMNS},
+    }
+
+    frames = {}
+    for tf in ordered_timeframes()[1:]:
+        level = _aggregate(level, bucket_size(tf, unit))
+        frames[tf] = pd.DataFrame(
+            {
+                "datetime": level["datetime"].astype(dt.dtype),
+                "timestamp": level["timestamp"],
+                **{col: level[col] for col in _PRICE_COLUMNS},
+            },
+            copy=False,
+        )
+    return frames
+
+
+def rollup(level: dict, timeframe: str, unit: str) -> dict:
+    """Aggregate 1m columns up to ``timeframe`` through every finer level.
+
+    ``level`` maps ``datetime`` (int64 count of ``unit``), ``timestamp`` and
+    the price columns to arrays without NaN prices, and must end on a
+    complete ``timeframe`` bucket for the last candle to match
+    ``build_rollups``.
+    """
+    for tf in ordered_timeframes()[1:]:
+        level = _aggregate(level, bucket_size(tf, unit))
+        if tf == timeframe:
+            break
+    return level
+
+
+def bucket_size(timeframe: str, unit: str) -> int:
+    """Length of one ``timeframe`` candle in ``unit``s of the datetime column."""
+    return pd.Timedelta(TIMEFRAME_MAP[timeframe]) // pd.Timedelta(1, unit=unit)
+
+
+def _aggregate(level: dict, step: int) -> dict:
+    """Aggregate one level into buckets of ``step`` datetime units."""
+    labels = level["datetime"] - level["datetime"] % step
+    if len(labels) == 0:
+        return {**level, "datetime": labels}
+    starts = np.flatnonzero(np.diff(labels)) + 1
+    starts = np.concatenate(([0], starts))
+    ends = np.concatenate((starts[1:], [len(labels)])) - 1
+    return {
+        "datetime": labels[starts],
+        "timestamp": level["timestamp"][starts],
+        "open": level["open"][starts],
+        "high": np.maximum.reduceat(level["high"], starts),
+        "low": np.minimum.reduceat(level["low"], starts),
+        "close": level["close"][ends],
+        "volume": np.add.reduceat(level["volume"], starts),
+    }
@@ -0,0 +1,189 @@
+"""Append-only segment files for raw 1m candles.
+
+Ingestion writes each fetched run of candles once, as its own CSV under
+``DATA_DIR/<symbol>.segments/`` (same columns as the legacy
+``<symbol>.csv``), and never rewrites it. ``manifest.json`` next to them
+lists the segments and the timestamp ranges already covered, i.e. asked
+from the exchange, including stretches where it had no candles, so only
+the gaps are fetched again.
+
+Ranges are ``[start, end)`` in UTC milliseconds and kept merged.
+
+Live candles (``append_candles``) extend the last segment in place while
+it is short and contiguous: rows are only ever added at its end, and the
+manifest records its size, so a write interrupted before the manifest was
+replaced is cut off again by the next append.
+"""
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from config import DATA_DIR, IST_OFFSET_SEC
+
+SEGMENTS_SUFFIX = ".segments"
+CANDLE_MS = 60_000
+SEGMENT_ROWS = 100_000  # candles per segment file
+CSV_COLUMNS = ("datetime", "timestamp", "open", "high", "low", "close", "volume")
+_MANIFEST = "manifest.json"
+
+
+def segments_path(symbol: str) -> str:
+    return os.path.join(DATA_DIR, f"{symbol}{SEGMENTS_SUFFIX}")
+
+
+def manifest_path(symbol: str) -> str:
+    return os.path.join(segments_path(symbol), _MANIFEST)
+
+
+def has_segments(symbol: str) -> bool:
+    return os.path.exists(manifest_path(symbol))
+
+
+def load_manifest(symbol: str) -> dict:
+    """{"ranges": [[start, end], ...], "segments": [{file, start, end, rows}, ...]}."""
+    if not has_segments(symbol):
+        return {"ranges": [], "segments": []}
+    with open(manifest_path(symbol)) as f:
+        return json.load(f)
+
+
+def segment_files(symbol: str) -> list[str]:
+    """Segment CSV paths in time order."""
+    segments = sorted(load_manifest(symbol)["segments"], key=lambda s: s["start"])
+    return [os.path.join(segments_path(symbol), s["file"]) for s in segments]
+
+
+def list_segment_symbols() -> list[str]:
+    if not os.path.isdir(DATA_DIR):
+        return []
+    return [
+        f[: -len(SEGMENTS_SUFFIX)]
+        for f in os.listdir(DATA_DIR)
+        if f.endswith(SEGMENTS_SUFFIX) and os.path.exists(os.path.join(DATA_DIR, f, _MANIFEST))
+    ]
+
+
+def missing_ranges(covered: list, start: int, end: int) -> list[tuple[int, int]]:
+    """Parts of ``[start, end)`` not in the merged ``covered`` ranges."""
+    gaps = []
+    cursor = start
+    for lo, hi in covered:
+        if hi <= cursor:
+            continue
+        if lo >= end:
+            break
+        if lo > cursor:
+            gaps.append((cursor, lo))
+        cursor = max(cursor, hi)
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def write_segment(symbol: str, candles: np.ndarray, start: int, end: int) -> None:
+    """Write ``candles`` (rows of timestamp, open, high, low, close, volume) as a new segment.
+
+    ``[start, end)`` is the range they cover; it is merged into the
+    manifest, which is replaced atomically after the segment is on disk.
+    """
+    os.makedirs(segments_path(symbol), exist_ok=True)
+    manifest = load_manifest(symbol)
+    if len(candles):
+        _new_segment(symbol, manifest, _csv_text(candles), candles, start, end)
+    _save_manifest(symbol, manifest, start, end)
+
+
+def append_candles(symbol: str, candles: np.ndarray, start: int, end: int) -> pd.DataFrame:
+    """Persist live ``candles`` covering ``[start, end)``, after everything on disk.
+
+    They go at the end of the latest segment when it ends at ``start`` and
+    holds fewer than ``SEGMENT_ROWS`` rows, else into a new segment.
+    Returns the rows as the loader will parse them back from the file.
+    """
+    os.makedirs(segments_path(symbol), exist_ok=True)
+    manifest = load_manifest(symbol)
+    text = _csv_text(candles)
+    last = max(manifest["segments"], key=lambda s: s["start"], default=None)
+    if last is not None and "bytes" in last and last["end"] == start and last["rows"] < SEGMENT_ROWS:
+        path = os.path.join(segments_path(symbol), last["file"])
+        os.truncate(path, last["bytes"])
+        with open(path, "a", newline="") as f:
+            f.write(text[text.index("\n") + 1 :])
+        last.update(end=end, rows=last["rows"] + len(candles), bytes=os.path.getsize(path))
+    else:
+        _new_segment(symbol, manifest, text, candles, start, end)
+    _save_manifest(symbol, manifest, start, end)
+    return pd.read_csv(io.StringIO(text), parse_dates=["datetime"])
+
+
+def adopt_csv(symbol: str, csv_file: str) -> None:
+    """Move a legacy ``<symbol>.csv`` into the segments as their first segment.
+
+    The file is moved, not copied or rewritten, unless it is unsorted or
+    has duplicate timestamps; its whole span counts as covered.
+    """
+    ts = pd.read_csv(csv_file, usecols=["timestamp"])["timestamp"].to_numpy(dtype=np.int64)
+    if len(ts) == 0:
+        os.remove(csv_file)
+        return
+    os.makedirs(segments_path(symbol), exist_ok=True)
+    name = f"{ts.min()}-{ts.max()}.csv"
+    target = os.path.join(segments_path(symbol), name)
+    if (np.diff(ts) > 0).all():
+        os.replace(csv_file, target)
+    else:
+        df = pd.read_csv(csv_file).drop_duplicates(subset=["timestamp"], keep="last").sort_values("timestamp")
+        _write_atomic(target, lambda f: df.to_csv(f, index=False))
+        os.remove(csv_file)
+    start, end = int(ts.min()), int(ts.max()) + CANDLE_MS
+    manifest = load_manifest(symbol)
+    manifest["segments"].append({"file": name, "start": start, "end": end, "rows": int(len(np.unique(ts)))})
+    _save_manifest(symbol, manifest, start, end)
+
+
+# ─── Private helpers ──────────────────────────────────────────────────
+
+
+def _csv_text(candles: np.ndarray) -> str:
+    """Segment CSV (with header) of (timestamp, open, high, low, close, volume) rows."""
+    frame = pd.DataFrame(candles, columns=CSV_COLUMNS[1:])
+    frame["timestamp"] = frame["timestamp"].astype(np.int64)
+    # Naive IST datetimes, as the exchange fetch script always wrote them
+    ist = pd.to_datetime(frame["timestamp"], unit="ms") + pd.Timedelta(seconds=IST_OFFSET_SEC)
+    frame.insert(0, "datetime", ist)
+    return frame.to_csv(index=False)
+
+
+def _new_segment(symbol: str, manifest: dict, text: str, candles: np.ndarray, start: int, end: int) -> None:
+    name = f"{int(candles[0, 0])}-{int(candles[-1, 0])}.csv"
+    path = os.path.join(segments_path(symbol), name)
+    _write_atomic(path, lambda f: f.write(text))
+    manifest["segments"].append(
+        {"file": name, "start": start, "end": end, "rows": len(candles), "bytes": os.path.getsize(path)}
+    )
+
+
+def _save_manifest(symbol: str, manifest: dict, start: int, end: int) -> None:
+    """Mark ``[start, end)`` covered and replace the manifest atomically."""
+    manifest["ranges"] = _merge(manifest["ranges"] + [[start, end]])
+    _write_atomic(manifest_path(symbol), lambda f: json.dump(manifest, f, indent=1))
+
+
+def _merge(ranges: list) -> list[list[int]]:
+    merged = []
+    for lo, hi in sorted(ranges):
+        if merged and lo <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], hi)
+        else:
+            merged.append([lo, hi])
+    return merged
+
+
+def _write_atomic(path: str, write) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", newline="") as f:
+        write(f)
+    os.replace(tmp, path)
@@ -0,0 +1,210 @@
+"""Strategy registry.
+
+A strategy declares its parameters (name → default), the indicators it
+needs as ``{name: (INDICATORS key, params)}``, a vectorized signal function
+over NumPy arrays and the series it draws on the chart. Engines only talk
+to this interface, so registering a class with ``@register`` is all it
+takes to add a strategy.
+
+Signals are per-candle +1 (long) / -1 (short) / 0; the engines open a
+position whenever the signal changes. The streaming engine computes them
+chunk by chunk and passes the same ``state`` dict for every chunk of a run;
+signals that look back past the current candle keep their carry in it. Indicators are requested by spec, so
+strategies (and sweeps) that need the same indicator share one computation
+through the indicator cache.
+
+Parameter values come from ``BacktestRequest.params`` first, then from a
+request field of the same name (``fast_period``, ``rsi_period``, ...), then
+from the strategy's default.
+"""
+import numpy as np
+
+from models.schemas import BacktestRequest
+from services.indicators import INDICATORS
+
+STRATEGIES: dict[str, "Strategy"] = {}
+
+
+class Strategy:
+    """Base class; subclasses set ``name``/``params`` and implement the hooks."""
+
+    name = ""
+    description = ""
+    params: dict = {}
+
+    def indicators(self, p: dict) -> dict[str, tuple[str, tuple]]:
+        raise NotImplementedError
+
+    def signal(self, p: dict, ind: dict, close: np.ndarray, state: dict | None = None) -> np.ndarray:
+        raise NotImplementedError
+
+    def overlay(self, p: dict, ind: dict) -> dict[str, np.ndarray]:
+        """Chart series; by default every single-output indicator."""
+        return {name: v for name, v in ind.items() if isinstance(v, np.ndarray)}
+
+
+def register(cls):
+    STRATEGIES[cls.name] = cls()
+    return cls
+
+
+def get_strategy(name: str) -> Strategy | None:
+    return STRATEGIES.get(name)
+
+
+def resolve_params(strategy: Strategy, req: BacktestRequest) -> dict:
+    """Strategy parameters for a request, cast to the type of each default."""
+    resolved = {}
+    for name, default in strategy.params.items():
+        if name in req.params:
+            value = req.params[name]
+        else:
+            value = getattr(req, name, default)
+        resolved[name] = type(default)(value)
+    return resolved
+
+
+def list_strategies() -> list[dict]:
+    return [
+        {
+            "name": s.name,
+            "description": s.description,
+            "params": s.params,
+            "indicators": sorted({spec[0] for spec in s.indicators(s.params).values()}),
+        }
+        for s in STRATEGIES.values()
+    ]
+
+
+def compute_indicators(specs: dict[str, tuple[str, tuple]], columns) -> dict:
+    """Compute ``specs`` from scratch over ``columns`` (e.g. a DataFrame)."""
+    out = {}
+    for name, (indicator, params) in specs.items():
+        ind = INDICATORS[indicator](*params)
+        out[name] = ind.batch(*(np.asarray(columns[col], dtype=np.float64) for col in ind.inputs))
+    return out
+
+
+# ─── Built-in strategies ──────────────────────────────────────────────
+
+
+@register
+class SMACross(Strategy):
+    name = "sma_cross"
+    description = "Long while the fast SMA is above the slow SMA, short while below"
+    params = {"fast_period": 10, "slow_period": 30}
+
+    def indicators(self, p):
+        return {"fast_sma": ("sma", (p["fast_period"],)), "slow_sma": ("sma", (p["slow_period"],))}
+
+    def signal(self, p, ind, close, state=None):
+        return _cross(ind["fast_sma"], ind["slow_sma"])
+
+
+@register
+class RSIReversion(Strategy):
+    name = "rsi"
+    description = "Long below the oversold level, short above the overbought level"
+    params = {"rsi_period": 14, "rsi_overbought": 70.0, "rsi_oversold": 30.0}
+
+    def indicators(self, p):
+        return {"rsi": ("rsi", (p["rsi_period"],))}
+
+    def signal(self, p, ind, close, state=None):
+        rsi = ind["rsi"]
+        return np.where(rsi > p["rsi_overbought"], -1, np.where(rsi < p["rsi_oversold"], 1, 0))
+
+
+@register
+class EMACross(Strategy):
+    name = "ema_cross"
+    description = "Long while the fast EMA is above the slow EMA, short while below"
+    params = {"fast_period": 10, "slow_period": 30}
+
+    def indicators(self, p):
+        return {"fast_ema": ("ema", (p["fast_period"],)), "slow_ema": ("ema", (p["slow_period"],))}
+
+    def signal(self, p, ind, close, state=None):
+        return _cross(ind["fast_ema"], ind["slow_ema"])
+
+
+@register
+class BollingerBreakout(Strategy):
+    name = "bollinger_breakout"
+    description = "Long on a close above the upper band, short below the lower band"
+    params = {"bb_period": 20, "bb_std": 2.0}
+
+    def indicators(self, p):
+        return {"bands": ("bollinger", (p["bb_period"], p["bb_std"]))}
+
+    def signal(self, p, ind, close, state=None):
+        _, upper, lower = ind["bands"]
+        return _hold(np.where(close > upper, 1, np.where(close < lower, -1, 0)), state)
+
+    def overlay(self, p, ind):
+        middle, upper, lower = ind["bands"]
+        return {"bb_middle": middle, "bb_upper": upper, "bb_lower": lower}
+
+
+@register
+class MACDCross(Strategy):
+    name = "macd"
+    description = "Long while the MACD line is above its signal line, short while below"
+    params = {"macd_fast": 12, "macd_slow": 26, "macd_signal": 9}
+
+    def indicators(self, p):
+        return {"macd": ("macd", (p["macd_fast"], p["macd_slow"], p["macd_signal"]))}
+
+    def signal(self, p, ind, close, state=None):
+        macd, signal, _ = ind["macd"]
+        return _cross(macd, signal)
+
+    def overlay(self, p, ind):
+        macd, signal, histogram = ind["macd"]
+        return {"macd": macd, "macd_signal": signal, "macd_histogram": histogram}
+
+
+@register
+class DonchianBreakout(Strategy):
+    name = "donchian"
+    description = "Long on a close above the previous N-candle high, short below the previous low"
+    params = {"donchian_period": 20}
+
+    def indicators(self, p):
+        return {"channel": ("donchian", (p["donchian_period"],))}
+
+    def signal(self, p, ind, close, state=None):
+        upper, lower = (_shift(band, state, key) for band, key in zip(ind["channel"], ("upper", "lower")))
+        return _hold(np.where(close > upper, 1, np.where(close < lower, -1, 0)), state)
+
+    def overlay(self, p, ind):
+        upper, lower = ind["channel"]
+        return {"donchian_upper": upper, "donchian_lower": lower}
+
+
+# ─── Private helpers ──────────────────────────────────────────────────
+
+
+def _cross(fast: np.ndarray, slow: np.ndarray) -> np.ndarray:
+    return np.where(fast < slow, -1, np.where(fast > slow, 1, 0))
+
+
+def _hold(raw: np.ndarray, state: dict | None = None) -> np.ndarray:
+    """Carry the last non-zero signal forward (breakouts keep their side)."""
+    if state is not None:
+        # Leading zeros continue the previous chunk's side
+        raw = np.concatenate(([state.get("hold", 0)], raw))
+    last = np.where(raw != 0, np.arange(len(raw)), 0)
+    held = raw[np.maximum.accumulate(last)] if len(raw) else raw
+    if state is None:
+        return held
+    state["hold"] = held[-1]
+    return held[1:]
+
+
+def _shift(values: np.ndarray, state: dict | None = None, key: str = "shift") -> np.ndarray:
+    """Values of the previous candle (NaN for the first, or the previous chunk's last)."""
+    first = np.nan if state is None else state.get(key, np.nan)
+    if state is not None and len(values):
+        state[key] = values[-1]
+    return np.concatenate(([first], values[:-1]))[: len(values)]
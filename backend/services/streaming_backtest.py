@@ -0,0 +1,260 @@
+"""Backtests over histories larger than memory, one chunk at a time.
+
+Candles are read in fixed-size chunks: slices of the memory-mapped columnar
+store, or of the raw segment files / CSV when there is no store. Timeframes without a persisted
+rollup are aggregated from 1m chunks on the fly; the rows of the last,
+possibly incomplete, bucket are held back until the next chunk. Indicator
+objects, the strategy's signal state and the open position
+(``backtest_engine.Simulator``) carry over chunk boundaries, so results
+equal the in-memory engine's while memory is bounded by the chunk size
+(plus the trade list).
+
+The equity curve is downsampled like ``run_backtest``'s, which needs the
+candle count up front: free for a store, one extra read pass otherwise.
+There is no indicator overlay (one point per candle).
+"""
+
+import numpy as np
+import pandas as pd
+
+from config import COLUMNAR_STORE, IST_OFFSET_SEC, STREAM_CHUNK_ROWS, TIMEFRAME_MAP
+from models.schemas import BacktestRequest
+from services import columnar_store
+from services.backtest_engine import (
+    Simulator,
+    _rows_to_columns,
+    curve_size,
+    equity_levels,
+    indicator_specs,
+    signals_from_indicators,
+    summarize,
+)
+from services.data_service import sanitize_float
+from services.downsample import bucket_extremes, bucket_length, step_positions
+from services.indicators import INDICATORS
+from services.metrics import performance_metrics
+from services.rollups import bucket_size, rollup
+from services.timing import span
+
+_PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+def run_streaming_backtest(req: BacktestRequest, layout: str = "rows", chunk_rows: int = STREAM_CHUNK_ROWS) -> dict:
+    """``run_backtest`` reading ``chunk_rows`` candles at a time; no overlay."""
+    trades, curve = [], []
+    for event in stream_backtest(req, chunk_rows):
+        if event["type"] == "error":
+            return {"error": event["error"]}
+        if event["type"] == "progress":
+            trades += event["trades"]
+            curve += event["equity_curve"]
+        else:
+            summary = {k: v for k, v in event.items() if k != "type"}
+    result = {**summary, "trades": trades, "equity_curve": curve, "overlay": {}}
+    return _rows_to_columns(result) if layout == "columns" else result
+
+
+def stream_backtest(req: BacktestRequest, chunk_rows: int = STREAM_CHUNK_ROWS):
+    """Run ``req`` chunk by chunk, yielding JSON-ready events as it goes.
+
+    After every chunk a ``progress`` event carries the candles done so far,
+    the trades closed in that chunk and the equity curve points that are
+    final by then; a ``summary`` with the stats and metrics ends the run.
+    Together they hold ``run_streaming_backtest``'s result. Closing the
+    generator stops the run after the current chunk.
+    """
+    try:
+        n = count_candles(req.symbol, req.timeframe, chunk_rows)
+    except ValueError as e:
+        yield {"type": "error", "error": str(e)}
+        return
+    if n == 0:
+        yield {"type": "error", "error": "No data"}
+        return
+    max_points = curve_size(req)
+    sampled = step_positions(n, max_points)
+
+    indicators = {name: INDICATORS[ind](*params) for name, (ind, params) in indicator_specs(req).items()}
+    state = {}
+    sim = Simulator(req)
+    # Candle times the curve and metrics may need: sampled candles and exits
+    sample_ts, exit_ts = [], []
+    # Curve candidates (sampled candles and exits) not streamed yet
+    pending_idx, pending_ts = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    for chunk in iter_candles(req.symbol, req.timeframe, chunk_rows):
+        start, done, closed = sim.offset, len(sim.exits), len(sim.trades)
+        if start + len(chunk["close"]) > n:
+            # Candles appended since they were counted belong to the next run
+            chunk = {col: values[: n - start] for col, values in chunk.items()}
+        close, ts = chunk["close"], chunk["timestamp"]
+        with span("indicators"):
+            series = {name: ind.batch(*(chunk[col] for col in ind.inputs)) for name, ind in indicators.items()}
+        with span("signals"):
+            signal = signals_from_indicators(req, series, close, state)
+        with span("simulate"):
+            sim.feed(ts, chunk["high"], chunk["low"], close, signal)
+            if sim.offset == n:
+                sim.finish()
+        local = sampled[(sampled >= start) & (sampled < start + len(close))] - start
+        exit_local = np.array([k - start for k, _ in sim.exits[done:]], dtype=np.int64)
+        sample_ts.append(ts[local])
+        exit_ts.append(ts[exit_local])
+
+        candidates = np.union1d(local, exit_local)
+        pending_idx = np.concatenate((pending_idx, candidates + start))
+        pending_ts = np.concatenate((pending_ts, ts[candidates] // 1000 + IST_OFFSET_SEC))
+        ready = _curve_ready(pending_idx, sim.offset, n, max_points)
+        points = _curve_points(
+            pending_idx[:ready], pending_ts[:ready], n, req.initial_capital, sim.exits, max_points
+        )
+        pending_idx, pending_ts = pending_idx[ready:], pending_ts[ready:]
+        yield {
+            "type": "progress",
+            "completed": sim.offset,
+            "total": n,
+            "pct": round(sim.offset / n * 100, 1),
+            "trades": sim.trades[closed:],
+            "equity_curve": points,
+        }
+        if sim.offset == n:
+            break
+    trades, capital, exits = sim.finish()
+
+    exit_ts = np.concatenate(exit_ts).astype(np.int64) // 1000 + IST_OFFSET_SEC
+    sample_ts = np.concatenate(sample_ts) // 1000 + IST_OFFSET_SEC
+    levels, _ = equity_levels(n, req.initial_capital, exits, at=sampled)
+    # At most one exit per candle, so every level is held on at least one
+    # candle in order: the drawdown over the levels is the per-candle one.
+    stats = summarize(req, trades, capital, np.asarray(levels, dtype=np.float64))
+    metrics = performance_metrics(
+        np.concatenate((sample_ts[:1], exit_ts)), levels, int(sample_ts[-1]), trades, req.initial_capital, capital
+    )
+    yield {"type": "summary", **stats, **metrics}
+
+
+def count_candles(symbol: str, timeframe: str, chunk_rows: int = STREAM_CHUNK_ROWS) -> int:
+    """Number of candles ``iter_candles`` yields; ValueError on an unsorted CSV."""
+    path = _store(symbol, _native(timeframe))
+    if path is not None:
+        return len(columnar_store.open_columns(path)["timestamp"])
+    return sum(len(chunk["close"]) for chunk in iter_candles(symbol, timeframe, chunk_rows))
+
+
+def iter_candles(symbol: str, timeframe: str, chunk_rows: int = STREAM_CHUNK_ROWS):
+    """{column: ndarray} chunks of the candles ``load_arrays`` would return, in order.
+
+    Chunks hold ``chunk_rows`` rows of the source (the timeframe's store, or
+    1m rows for on-the-fly rollups). Raises ValueError when the CSV is not
+    sorted by datetime.
+    """
+    timeframe = _native(timeframe)
+    path = _store(symbol, timeframe)
+    if path is not None:
+        yield from _store_chunks(path, chunk_rows)
+    elif timeframe is None:
+        yield from _raw_chunks(symbol, chunk_rows)
+    else:
+        yield from _rolled_chunks(_raw_chunks(symbol, chunk_rows), timeframe)
+
+
+# ─── Private helpers ──────────────────────────────────────────────────
+
+
+def _curve_ready(idx: np.ndarray, completed: int, n: int, max_points: int) -> int:
+    """How many of the pending curve candidates ``idx`` lie in finished buckets.
+
+    A bucket's extremes are final once its last candle has been fed.
+    """
+    if completed == n or n <= max_points:
+        return len(idx)
+    size = bucket_length(n, max_points)
+    return int(np.searchsorted(idx, completed // size * size))
+
+
+def _curve_points(
+    idx: np.ndarray, times: np.ndarray, n: int, initial_capital: float, exits: list, max_points: int
+) -> list[dict]:
+    """``equity_curve_points``' selection among the candidates of whole buckets."""
+    if len(idx) == 0:
+        return []
+    levels, level_idx = equity_levels(n, initial_capital, exits, at=idx)
+    if n > max_points:
+        values = np.asarray(levels, dtype=np.float64)[level_idx]
+        ends = np.flatnonzero((idx == 0) | (idx == n - 1))
+        keep = np.unique(np.concatenate((ends, bucket_extremes(values, idx, bucket_length(n, max_points)))))
+        idx, times, level_idx = idx[keep], times[keep], level_idx[keep]
+    return [{"time": t, "value": sanitize_float(levels[j])} for t, j in zip(times.tolist(), level_idx.tolist())]
+
+
+def _native(timeframe: str) -> str | None:
+    """The timeframe's rollup name, or ``None`` for 1m (and unknown names, like the loader)."""
+    return None if TIMEFRAME_MAP.get(timeframe, "1min") == "1min" else timeframe
+
+
+def _store(symbol: str, timeframe: str | None) -> str | None:
+    if COLUMNAR_STORE and columnar_store.is_fresh(symbol, timeframe):
+        return columnar_store.store_path(symbol, timeframe)
+    return None
+
+
+def _raw_chunks(symbol: str, chunk_rows: int):
+    path = _store(symbol, None)
+    if path is not None:
+        yield from _store_chunks(path, chunk_rows)
+    else:
+        yield from _csv_chunks(symbol, chunk_rows)
+
+
+def _store_chunks(path: str, chunk_rows: int):
+    """Slices of the memory-mapped columns; pages are read as they are touched."""
+    columns = columnar_store.open_columns(path)
+    for lo in range(0, len(columns["timestamp"]), chunk_rows):
+        yield {col: np.asarray(arr[lo : lo + chunk_rows]) for col, arr in columns.items()}
+
+
+def _csv_chunks(symbol: str, chunk_rows: int):
+    """Chunks of the raw segment files (or CSV) in turn."""
+    last = None
+    for path in columnar_store.source_files(symbol):
+        with pd.read_csv(path, parse_dates=["datetime"], chunksize=chunk_rows) as reader:
+            for df in reader:
+                dt = df["datetime"].to_numpy()
+                if len(dt) and ((last is not None and dt[0] < last) or (dt[1:] < dt[:-1]).any()):
+                    raise ValueError(
+                        f"{symbol} raw data is not sorted by datetime; convert it with python -m services.columnar_store"
+                    )
+                last = dt[-1] if len(dt) else last
+                yield {
+                    "datetime": dt,
+                    "timestamp": df["timestamp"].to_numpy(dtype=np.int64),
+                    **{col: df[col].to_numpy(dtype=np.float64) for col in _PRICE_COLUMNS},
+                }
+
+
+def _rolled_chunks(chunks, timeframe: str):
+    """Aggregate 1m chunks to ``timeframe``, yielding complete buckets only."""
+    carry = None
+    unit = None
+    for chunk in chunks:
+        if unit is None:
+            unit = np.datetime_data(chunk["datetime"].dtype)[0]
+            size = bucket_size(timeframe, unit)
+        # Same rows as build_rollups: candles with a NaN price are dropped
+        keep = ~np.any([np.isnan(chunk[col]) for col in _PRICE_COLUMNS], axis=0)
+        level = {
+            "datetime": chunk["datetime"][keep].astype(np.int64),
+            "timestamp": chunk["timestamp"][keep],
+            **{col: chunk[col][keep] for col in _PRICE_COLUMNS},
+        }
+        if carry is not None:
+            level = {col: np.concatenate((carry[col], values)) for col, values in level.items()}
+        if len(level["datetime"]) == 0:
+            continue
+        # The last bucket may continue in the next chunk
+        labels = level["datetime"] - level["datetime"] % size
+        cut = int(np.searchsorted(labels, labels[-1]))
+        carry = {col: values[cut:].copy() for col, values in level.items()}
+        if cut:
+            yield rollup({col: values[:cut] for col, values in level.items()}, timeframe, unit)
+    if carry is not None and len(carry["datetime"]):
+        yield rollup(carry, timeframe, unit)
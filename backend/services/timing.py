@@ -0,0 +1,187 @@
+"""Span timing for the request hot paths.
+
+``with span("indicators"):`` times a stage. Every finished span goes into
+a rolling window per stage (``stage_stats`` → ``/api/metrics``) and, inside
+a request, into that request's ``Server-Timing`` header
+(``ServerTimingMiddleware``). Spans of one name in one request are summed.
+
+Timing is switched with ``set_enabled`` at runtime (``TIMING_ENABLED`` at
+startup). While off, ``span`` returns a shared no-op context manager, so
+an instrumented call costs one flag check.
+
+Request-scoped spans travel in a ``ContextVar``, which ``run_in_pool``
+copies into worker threads; with ``WORKER_POOL_KIND=process`` the stages
+run in other processes and only API-process stages are reported.
+"""
+import contextlib
+import functools
+import inspect
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+import numpy as np
+from fastapi.routing import APIRoute
+
+from config import TIMING_ENABLED, TIMING_WINDOW
+
+# Upper edges of the histogram buckets, in milliseconds (the last is open)
+HISTOGRAM_EDGES_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000)
+
+_enabled = TIMING_ENABLED
+_lock = threading.Lock()
+_windows: dict[str, deque] = {}
+# {"spans": {name: seconds}, "returned": perf_counter at endpoint return} of the current request
+_request: ContextVar[dict | None] = ContextVar("timing_request", default=None)
+_NOOP = contextlib.nullcontext()
+
+
+def set_enabled(enabled: bool) -> None:
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def span(name: str):
+    """Context manager timing one stage; a no-op while timing is off."""
+    if not _enabled:
+        return _NOOP
+    return _Span(name)
+
+
+def timed(name: str):
+    """Decorator form of ``span``."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def record(name: str, seconds: float) -> None:
+    """Add one duration to the stage's window and the current request."""
+    with _lock:
+        window = _windows.get(name)
+        if window is None:
+            window = _windows[name] = deque(maxlen=TIMING_WINDOW)
+        window.append(seconds)
+    request = _request.get()
+    if request is not None:
+        spans = request["spans"]
+        spans[name] = spans.get(name, 0.0) + seconds
+
+
+def stage_stats() -> dict:
+    """Latency percentiles and histogram per stage over its last ``TIMING_WINDOW`` spans."""
+    with _lock:
+        windows = {name: np.array(window) * 1e3 for name, window in _windows.items()}
+    stages = {}
+    for name, ms in sorted(windows.items()):
+        counts = np.bincount(np.searchsorted(HISTOGRAM_EDGES_MS, ms), minlength=len(HISTOGRAM_EDGES_MS) + 1)
+        p50, p90, p99 = np.percentile(ms, (50, 90, 99))
+        stages[name] = {
+            "count": len(ms),
+            "mean_ms": round(float(ms.mean()), 3),
+            "p50_ms": round(float(p50), 3),
+            "p90_ms": round(float(p90), 3),
+            "p99_ms": round(float(p99), 3),
+            "max_ms": round(float(ms.max()), 3),
+            "histogram": {"le_ms": [*HISTOGRAM_EDGES_MS, None], "counts": counts.tolist()},
+        }
+    return {"enabled": _enabled, "window": TIMING_WINDOW, "stages": stages}
+
+
+def reset() -> None:
+    with _lock:
+        _windows.clear()
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware adding a ``Server-Timing`` header with the request's spans.
+
+    Also records ``total`` (until the response starts) and ``encode`` (from
+    the endpoint returning to the response starting, i.e. serialization).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _enabled:
+            await self.app(scope, receive, send)
+            return
+        request = {"spans": {}, "returned": None}
+        token = _request.set(request)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                now = time.perf_counter()
+                if request["returned"] is not None:
+                    record("encode", now - request["returned"])
+                record("total", now - started)
+                header = ", ".join(f"{name};dur={sec * 1e3:.2f}" for name, sec in request["spans"].items())
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request.reset(token)
+
+
+class TimedRoute(APIRoute):
+    """Route class marking when the endpoint returns, so ``encode`` can be timed."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _mark_return(endpoint), **kwargs)
+
+
+# ─── Private helpers ──────────────────────────────────────────────────
+
+
+class _Span:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.started)
+        return False
+
+
+def _mark_return(endpoint):
+    def mark():
+        request = _request.get()
+        if request is not None:
+            request["returned"] = time.perf_counter()
+
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            result = await endpoint(*args, **kwargs)
+            mark()
+            return result
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            result = endpoint(*args, **kwargs)
+            mark()
+            return result
+
+    return wrapper
@@ -1,31 +1,46 @@
 import pandas as pd
 
 from models.schemas import ManualTradeRequest
-from services.data_service import load_ohlcv
+from services.data_service import CandleSnapshot, load_candles
+from services.fills import first_touch
+from services.timing import span
 
 
 def simulate_manual_trade(req: ManualTradeRequest) -> dict:
     """Simulate a single manual trade from a given entry candle."""
-    df = load_ohlcv(req.symbol, req.timeframe)
-    if df.empty:
-        return {"error": "No data"}
+    return simulate_manual_trades([req])[0]
 
-    # Find the entry candle
-    df["ts_sec"] = df["timestamp"] // 1000
-    entry_ts = pd.Timestamp(req.entry_time)
 
-    # Ensure tz-compatibility: strip timezone info from both sides
-    if entry_ts.tzinfo is not None:
-        entry_ts = entry_ts.tz_localize(None)
-    if hasattr(df["datetime"].dtype, "tz") and df["datetime"].dtype.tz is not None:
-        df["datetime"] = df["datetime"].dt.tz_localize(None)
+def simulate_manual_trades(reqs: list[ManualTradeRequest]) -> list[dict]:
+    """Resolve many manual trades, loading each symbol/timeframe only once.
 
-    idx = df["datetime"].searchsorted(entry_ts)
-    if idx >= len(df):
-        return {"error": "Entry time out of range"}
+    Results (or per-trade ``{"error": ...}`` dicts) are in request order.
+    """
+    snapshots = {}
+    results = []
+    for req in reqs:
+        key = (req.symbol, req.timeframe)
+        if key not in snapshots:
+            snapshots[key] = load_candles(*key)
+        candles = snapshots[key]
+        if candles is None:
+            results.append({"error": "No data"})
+            continue
 
-    entry_row = df.iloc[idx]
-    entry_price = entry_row["close"]
+        # Find the entry candle (binary search on the snapshot's time index)
+        with span("locate"):
+            idx = candles.locate(pd.Timestamp(req.entry_time))
+        if idx >= len(candles.arrays.close):
+            results.append({"error": "Entry time out of range"})
+            continue
+        with span("resolve"):
+            results.append(_resolve(req, candles, idx))
+    return results
+
+
+def _resolve(req: ManualTradeRequest, candles: CandleSnapshot, idx: int) -> dict:
+    data = candles.arrays
+    entry_price = data.close[idx]
     size = req.capital / entry_price
 
     sl_price = None
@@ -43,41 +58,31 @@ def simulate_manual_trade(req: ManualTradeRequest) -> dict:
             else entry_price * (1 - req.take_profit_pct / 100)
         )
 
-    # Walk forward through candles
-    for j in range(idx + 1, len(df)):
-        row = df.iloc[j]
-        if req.side == "long":
-            if sl_price and row["low"] <= sl_price:
-                pnl = size * (sl_price - entry_price) * req.leverage
-                return _trade_result(req, entry_price, sl_price, entry_row, row, pnl, "SL")
-            if tp_price and row["high"] >= tp_price:
-                pnl = size * (tp_price - entry_price) * req.leverage
-                return _trade_result(req, entry_price, tp_price, entry_row, row, pnl, "TP")
-        else:
-            if sl_price and row["high"] >= sl_price:
-                pnl = size * (entry_price - sl_price) * req.leverage
-                return _trade_result(req, entry_price, sl_price, entry_row, row, pnl, "SL")
-            if tp_price and row["low"] <= tp_price:
-                pnl = size * (entry_price - tp_price) * req.leverage
-                return _trade_result(req, entry_price, tp_price, entry_row, row, pnl, "TP")
+    # First candle after entry touching SL or TP; SL wins when both are hit
+    k, hit_sl, _ = first_touch(
+        data.high, data.low, idx + 1, len(data.close), req.side, sl_price, tp_price
+    )
+    if k >= 0:
+        exit_price, reason = (sl_price, "SL") if hit_sl else (tp_price, "TP")
+    else:
+        # No SL/TP hit — close at last candle
+        k = len(data.close) - 1
+        exit_price, reason = data.close[k], "end"
 
-    # No SL/TP hit — close at last candle
-    last = df.iloc[-1]
-    exit_price = last["close"]
     if req.side == "long":
         pnl = size * (exit_price - entry_price) * req.leverage
     else:
         pnl = size * (entry_price - exit_price) * req.leverage
-    return _trade_result(req, entry_price, exit_price, entry_row, last, pnl, "end")
+    return _trade_result(req, entry_price, exit_price, candles.datetime(idx), candles.datetime(k), pnl, reason)
 
 
-def _trade_result(req, entry_price, exit_price, entry_row, exit_row, pnl, reason):
+def _trade_result(req, entry_price, exit_price, entry_time, exit_time, pnl, reason):
     return {
         "side": req.side,
         "entry_price": round(entry_price, 2),
         "exit_price": round(exit_price, 2),
-        "entry_time": str(entry_row["datetime"]),
-        "exit_time": str(exit_row["datetime"]),
+        "entry_time": str(entry_time),
+        "exit_time": str(exit_time),
         "pnl": round(pnl, 2),
         "pnl_pct": round(pnl / req.capital * 100, 2),
         "exit_reason": reason,
@@ -0,0 +1,58 @@
+"""Shared setup: a small synthetic dataset (``benchmarks.synthetic``) in a temporary ``DATA_DIR``.
+
+config reads its environment once, on first import, so it is set here,
+before any test module imports the services.
+"""
+import os
+import shutil
+import tempfile
+
+import pytest
+
+DATA_DIR = tempfile.mkdtemp(prefix="tests-")
+os.environ["DATA_DIR"] = DATA_DIR
+os.environ["LIVE_POLL_SEC"] = "0"  # no source-watcher threads
+
+from benchmarks.synthetic import generate_candles, write_dataset  # noqa: E402
+
+SYMBOLS = ["SYNAUSDT", "SYNBUSDT"]
+DAYS = 10
+
+write_dataset(DATA_DIR, SYMBOLS, DAYS)
+
+
+def pytest_unconfigure(config):
+    from services import job_queue
+
+    job_queue.shutdown_pool()
+    shutil.rmtree(DATA_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def fresh_cache():
+    """Empty OHLCV cache before and after the test."""
+    from services import data_service
+
+    data_service._cache.clear()
+    data_service._synced.clear()
+    yield data_service
+    data_service._cache.clear()
+    data_service._synced.clear()
+
+
+@pytest.fixture
+def live_symbol(request):
+    """A symbol of its own (``<test name>`` based) with a few days of 1m candles, for tests that append."""
+    symbol = "LIVE" + "".join(c for c in request.node.name.upper() if c.isalnum())[-20:] + "USDT"
+    generate_candles(symbol, 3).to_csv(os.path.join(DATA_DIR, f"{symbol}.csv"), index=False)
+    return symbol
+
+
+@pytest.fixture
+def client():
+    """API client without the app's lifespan (no warmup, no watcher, no pool shutdown)."""
+    from fastapi.testclient import TestClient
+
+    from main import app
+
+    return TestClient(app)
@@ -0,0 +1,283 @@
+"""Cached OHLCV data: the compact encoding round-trips, and appended candles match a cold load."""
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_candles
+from config import TIMEFRAME_MAP
+from models.schemas import BacktestRequest, ManualTradeRequest
+from services import buffers, columnar_store
+from services.backtest_engine import run_backtest
+from services.compact import CompactFrame
+from services.trade_service import simulate_manual_trades
+from tests.conftest import SYMBOLS
+
+INDICATOR_SPECS = [("sma", (20,)), ("rsi", (14,)), ("bollinger", (20, 2.0)), ("macd", (12, 26, 9)), ("atr", (14,))]
+
+
+def _assert_same_frame(got: pd.DataFrame, expected: pd.DataFrame):
+    # Column by column: a memory-mapped store column counts as a different array class to pandas
+    assert list(got.columns) == list(expected.columns)
+    for col in got.columns:
+        assert got[col].dtype == expected[col].dtype, col
+        np.testing.assert_array_equal(got[col].to_numpy(), expected[col].to_numpy(), err_msg=col)
+
+
+def _assert_same_values(got, expected):
+    for a, b in zip(*(v if isinstance(v, tuple) else (v,) for v in (got, expected)), strict=True):
+        np.testing.assert_array_equal(a, b)
+
+
+def _new_candles(last_ts: int, n: int, price: float) -> list[list[float]]:
+    ts = last_ts + 60_000 * np.arange(1, n + 1)
+    prices = price + np.arange(n) * 0.25
+    return np.column_stack([ts, prices, prices + 1, prices - 1, prices + 0.5, np.full(n, 2.5)]).tolist()
+
+
+# ─── Compact encoding ────────────────────────────────────────────────
+
+
+def test_compact_frame_round_trips():
+    df = generate_candles("SYNCUSDT", 2)
+    compact = CompactFrame(df)
+    pd.testing.assert_frame_equal(compact.to_frame(), df, check_exact=True)
+    pd.testing.assert_frame_equal(compact.to_frame(100, 200), df.iloc[100:200].reset_index(drop=True), check_exact=True)
+    assert compact.nbytes < compact.full_nbytes / 2
+
+
+def test_compact_frame_round_trips_awkward_values():
+    df = generate_candles("SYNCUSDT", 1)
+    df.loc[5, "close"] = np.nan
+    df.loc[6, "volume"] = 1 / 3  # no exact decimal scale
+    df.loc[7:, "timestamp"] += 1  # off the minute: timestamps are kept whole
+    pd.testing.assert_frame_equal(CompactFrame(df).to_frame(), df, check_exact=True)
+
+
+def test_compact_cache_gives_the_same_backtests(fresh_cache, monkeypatch):
+    requests = [
+        BacktestRequest(symbol=SYMBOLS[0], timeframe=timeframe, strategy=strategy, stop_loss_pct=1, take_profit_pct=2)
+        for timeframe in ("1m", "1h")
+        for strategy in ("sma_cross", "bollinger_breakout")
+    ]
+    plain = [run_backtest(r) for r in requests]
+    fresh_cache._cache.clear()
+    monkeypatch.setattr(fresh_cache, "COMPACT_CACHE", True)
+    assert [run_backtest(r) for r in requests] == plain
+    assert fresh_cache.cache_stats()["compact"]["frames"] > 0
+
+
+def test_compact_searchsorted_matches_numpy():
+    df = generate_candles("SYNCUSDT", 1)
+    ts = df["timestamp"].to_numpy()
+    compact = CompactFrame(df)
+    for ms in (ts[0] - 10**12, ts[0] - 1, ts[0], ts[0] + 1, ts[500], ts[500] + 30_000, ts[-1], ts[-1] + 10**12):
+        for side in ("left", "right"):
+            assert compact.searchsorted(int(ms), side) == np.searchsorted(ts, ms, side=side)
+
+
+def test_compact_pages_decode_only_their_rows(fresh_cache, monkeypatch):
+    ds = fresh_cache
+    ts = ds.load_arrays(SYMBOLS[0], "5m").timestamp
+    windows = [(None, None, 500), (None, int(ts[1000]), 300), (int(ts[7]), None, 50), (int(ts[7]), int(ts[30]), 500)]
+    plain = [ds.ohlcv_page(SYMBOLS[0], "5m", *w) for w in windows]
+    ds._cache.clear()
+    monkeypatch.setattr(ds, "COMPACT_CACHE", True)
+    decoded = []
+    to_frame = CompactFrame.to_frame
+    monkeypatch.setattr(CompactFrame, "to_frame", lambda self, lo=0, hi=None: decoded.append((lo, hi)) or to_frame(self, lo, hi))
+    for window, (rows, total) in zip(windows, plain, strict=True):
+        got, got_total = ds.ohlcv_page(SYMBOLS[0], "5m", *window)
+        assert got_total == total == len(ts)
+        _assert_same_frame(got, rows)
+    assert all(hi is not None and hi - lo <= 500 for lo, hi in decoded)
+
+
+def test_compact_cache_gives_the_same_manual_trades(fresh_cache, monkeypatch):
+    ds = fresh_cache
+    requests = []
+    for i, timeframe in enumerate(("1m", "15m", "4h")):
+        datetimes = ds.load_ohlcv(SYMBOLS[1], timeframe)["datetime"]
+        for j, pos in enumerate((0.1, 0.5, 0.9)):
+            when = datetimes.iloc[int(len(datetimes) * pos)] + pd.Timedelta(seconds=j * 7)
+            requests.append(
+                ManualTradeRequest(
+                    symbol=SYMBOLS[1], timeframe=timeframe, side=("long", "short")[(i + j) % 2],
+                    entry_time=when.isoformat(), stop_loss_pct=1.5, take_profit_pct=2.5,
+                )
+            )
+    plain = simulate_manual_trades(requests)
+    ds._cache.clear()
+    monkeypatch.setattr(ds, "COMPACT_CACHE", True)
+    assert simulate_manual_trades(requests) == plain
+    for req in requests:
+        when = pd.Timestamp(req.entry_time)
+        values = ds.load_ohlcv(req.symbol, req.timeframe)["datetime"].to_numpy()
+        assert ds.locate_candle(req.symbol, req.timeframe, when) == np.searchsorted(values, when.to_datetime64())
+
+
+# ─── Live appends ────────────────────────────────────────────────────
+
+
+@pytest.mark.parametrize("compact", [False, True], ids=["plain", "compact"])
+def test_appended_candles_match_a_cold_load(fresh_cache, live_symbol, monkeypatch, compact):
+    ds = fresh_cache
+    monkeypatch.setattr(ds, "COMPACT_CACHE", compact)
+    for timeframe in TIMEFRAME_MAP:
+        for name, params in INDICATOR_SPECS:
+            ds.load_indicator(live_symbol, timeframe, name, params)
+    last = int(ds.load_arrays(live_symbol).timestamp[-1])
+    for i, n in enumerate((1, 37, 600)):
+        assert ds.append_candles(live_symbol, _new_candles(last, n, 100.0 + i))["appended"] == n
+        last += n * 60_000
+
+    hot = {
+        timeframe: (
+            ds.load_ohlcv(live_symbol, timeframe),
+            [ds.load_indicator(live_symbol, timeframe, name, params) for name, params in INDICATOR_SPECS],
+        )
+        for timeframe in TIMEFRAME_MAP
+    }
+    ds._cache.clear()
+    ds._synced.clear()
+    for timeframe, (frame, values) in hot.items():
+        _assert_same_frame(frame, ds.load_ohlcv(live_symbol, timeframe))
+        for (name, params), got in zip(INDICATOR_SPECS, values, strict=True):
+            _assert_same_values(got, ds.load_indicator(live_symbol, timeframe, name, params))
+
+
+def test_buffer_extend_never_rewrites_handed_out_rows():
+    a = buffers.extend(np.arange(3.0), [3.0])
+    b = buffers.extend(a, [4.0, 5.0])
+    assert np.shares_memory(a, b) and b.tolist() == [0, 1, 2, 3, 4, 5]
+    # Replacing the last row of ``b`` must not touch ``b``: copied
+    c = buffers.extend(b[:-1], [9.0])
+    assert not np.shares_memory(b, c) and b[-1] == 5 and c.tolist() == [0, 1, 2, 3, 4, 9]
+    # ... unless the row it would write already holds that value
+    d = buffers.extend(b[:-1], [5.0, 6.0])
+    assert np.shares_memory(b, d) and d.tolist() == [0, 1, 2, 3, 4, 5, 6]
+    # ``a`` is no longer the written end of its buffer
+    e = buffers.extend(a, [7.0])
+    assert not np.shares_memory(a, e) and d[4] == 4
+
+
+def test_appends_grow_the_1m_frame_in_place(fresh_cache, live_symbol):
+    ds = fresh_cache
+    last = int(ds.load_arrays(live_symbol).timestamp[-1])
+    ds.load_indicator(live_symbol, "1m", "sma", (20,))
+    # The first append copies the memory-mapped columns and the indicator into growable buffers
+    ds.append_candles(live_symbol, _new_candles(last, 1, 90.0))
+    before = ds.load_arrays(live_symbol)
+    sma = ds.load_indicator(live_symbol, "1m", "sma", (20,))
+    kept = (before.close.copy(), sma.copy())
+    for i in range(1, 6):
+        ds.append_candles(live_symbol, _new_candles(last + i * 60_000, 1, 90.0 + i))
+    after = ds.load_arrays(live_symbol)
+    grown = ds.load_indicator(live_symbol, "1m", "sma", (20,))
+    assert len(after.close) == len(before.close) + 5 and len(grown) == len(sma) + 5
+    assert np.shares_memory(after.close, before.close) and np.shares_memory(grown, sma)
+    # Arrays handed out before the appends are unchanged
+    np.testing.assert_array_equal(before.close, kept[0])
+    np.testing.assert_array_equal(sma, kept[1])
+
+
+def test_appends_keep_the_columnar_store_fresh(fresh_cache, live_symbol):
+    ds = fresh_cache
+    ds.load_arrays(live_symbol)
+    last = int(ds.load_arrays(live_symbol).timestamp[-1])
+    # The first append moves the CSV into segments; the next cold load rebuilds the store once
+    ds.append_candles(live_symbol, _new_candles(last, 5, 50.0))
+    ds._cache.clear()
+    ds._synced.clear()
+    ds.load_arrays(live_symbol, "1h")
+    assert columnar_store.is_fresh(live_symbol) and columnar_store.is_fresh(live_symbol, "1h")
+
+    last = int(ds.load_arrays(live_symbol).timestamp[-1])
+    for i in range(3):
+        ds.append_candles(live_symbol, _new_candles(last + i * 10 * 60_000, 10, 60.0 + i))
+        assert columnar_store.is_fresh(live_symbol)
+    # Rollups are rebuilt from the 1m store on their next load
+    assert not columnar_store.is_fresh(live_symbol, "1h")
+    _assert_same_frame(columnar_store.load_store(live_symbol), columnar_store.read_csv(live_symbol))
+
+
+def test_append_store_refuses_a_stale_store(fresh_cache, live_symbol):
+    fresh_cache.load_arrays(live_symbol)
+    store = columnar_store.load_store(live_symbol)
+    new = store.iloc[-3:].copy()
+    new["timestamp"] += 3 * 60_000
+    before = columnar_store.source_version(live_symbol)
+    assert not columnar_store.append_store(live_symbol, new, {"other.csv": 1}, before)
+    # Rows must come after the store's last one
+    assert not columnar_store.append_store(live_symbol, store.iloc[-3:], before, before)
+    assert len(columnar_store.load_store(live_symbol)) == len(store)
+
+
+def test_store_rewrites_never_leave_readers_without_a_store(live_symbol):
+    columnar_store.convert(live_symbol)
+    df, source = columnar_store.read_csv(live_symbol), columnar_store.source_version(live_symbol)
+    done = threading.Event()
+
+    def rewrite():
+        for _ in range(50):
+            columnar_store.write_store(live_symbol, df, source=source)
+        done.set()
+
+    writer = threading.Thread(target=rewrite)
+    writer.start()
+    reads = 0
+    while not done.is_set() or not reads:
+        assert columnar_store.is_fresh(live_symbol)
+        assert len(columnar_store.load_store(live_symbol)) == len(df)
+        reads += 1
+    writer.join()
+    # Only the current version is left on disk
+    parent = os.path.dirname(columnar_store.store_path(live_symbol))
+    prefix = f".{live_symbol}{columnar_store.STORE_SUFFIX}."
+    assert [f for f in os.listdir(parent) if f.startswith(prefix)] == [
+        os.path.basename(os.path.realpath(columnar_store.store_path(live_symbol)))
+    ]
+
+
+def test_candle_snapshot_lookups_stay_on_its_rows(fresh_cache, live_symbol):
+    ds = fresh_cache
+    old = ds.load_candles(live_symbol, "1m")
+    n = len(old.arrays.close)
+    ds.append_candles(live_symbol, _new_candles(int(old.arrays.timestamp[-1]), 30, 80.0))
+    after_old_end = old.datetime(n - 1) + pd.Timedelta(minutes=10)
+    assert old.locate(after_old_end) == n
+    assert ds.load_candles(live_symbol, "1m").locate(after_old_end) == n + 9
+
+
+@pytest.mark.parametrize("timeframe", ["1m", "15m"])
+def test_snapshot_indicators_match_the_snapshot_frame(fresh_cache, live_symbol, timeframe):
+    ds = fresh_cache
+    old = ds._load_cached(live_symbol, timeframe)
+    ds.load_indicator(live_symbol, timeframe, "sma", (20,))
+    last = int(ds.load_arrays(live_symbol).timestamp[-1])
+    ds.append_candles(live_symbol, _new_candles(last, 120, 70.0))
+    # The cached indicator now belongs to the newer frame; the old snapshot gets its own
+    assert len(ds._indicator(live_symbol, timeframe, old, "sma", (20,))) == len(old)
+    data, indicators = ds.load_snapshot(live_symbol, timeframe, {"fast": ("sma", (20,))})
+    assert len(indicators["fast"]) == len(data.close) > len(old)
+
+
+
+def test_source_watcher_logs_failures_and_carries_on(fresh_cache, monkeypatch, caplog):
+    ds = fresh_cache
+    ds._synced.update({"BADUSDT": {}, "GOODUSDT": {}})
+    refreshed = []
+
+    def refresh(symbol):
+        if symbol == "BADUSDT":
+            raise OSError("disk gone")
+        refreshed.append(symbol)
+
+    monkeypatch.setattr(ds, "refresh_symbol", refresh)
+    ds._refresh_all()
+    assert refreshed == ["GOODUSDT"]
+    (record,) = caplog.records
+    assert record.name == "services.data_service" and "BADUSDT: refresh failed" in record.getMessage()
+    assert record.exc_info[0] is OSError
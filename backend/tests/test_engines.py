@@ -0,0 +1,85 @@
+"""The loop, vectorized and streaming engines give the same trades and stats."""
+import json
+
+import pytest
+
+from models.schemas import BacktestBatchRequest, BacktestRequest, PortfolioRequest
+from services.backtest_engine import run_backtest
+from services.batch_backtest import run_backtest_batch
+from services.portfolio_engine import run_portfolio_backtest
+from services.streaming_backtest import run_streaming_backtest
+from services.strategies import STRATEGIES
+from tests.conftest import SYMBOLS
+
+CASES = [
+    {"symbol": symbol, "timeframe": timeframe, "strategy": strategy, **exits}
+    for symbol, timeframe in ((SYMBOLS[0], "15m"), (SYMBOLS[1], "1h"))
+    for strategy in STRATEGIES
+    for exits in ({}, {"stop_loss_pct": 0.5, "take_profit_pct": 1.0, "leverage": 3, "position_size_pct": 50})
+]
+
+
+def _canonical(result: dict) -> str:
+    # The columns layout holds NumPy arrays
+    return json.dumps(result, sort_keys=True, default=lambda arr: arr.tolist())
+
+
+def _case_id(case: dict) -> str:
+    return "-".join(str(v) for v in case.values())
+
+
+@pytest.mark.parametrize("case", CASES, ids=_case_id)
+def test_vectorized_matches_loop(case):
+    vectorized = run_backtest(BacktestRequest(**case))
+    assert vectorized["total_trades"] > 0
+    assert _canonical(vectorized) == _canonical(run_backtest(BacktestRequest(engine="loop", **case)))
+
+
+@pytest.mark.parametrize("case", CASES, ids=_case_id)
+@pytest.mark.parametrize("layout", ["rows", "columns"])
+def test_streaming_matches_vectorized(case, layout):
+    req = BacktestRequest(**case)
+    expected = run_backtest(req, layout)
+    expected["overlay"] = {}  # the streaming engine has no overlay
+    for chunk_rows in (1000, 7777):
+        assert _canonical(run_streaming_backtest(req, layout, chunk_rows)) == _canonical(expected)
+
+
+def test_streaming_1m_matches_vectorized():
+    req = BacktestRequest(symbol=SYMBOLS[0], timeframe="1m", stop_loss_pct=1, take_profit_pct=2)
+    expected = run_backtest(req)
+    expected["overlay"] = {}
+    assert _canonical(run_streaming_backtest(req, "rows", 4096)) == _canonical(expected)
+
+
+def test_batch_matches_single_backtests():
+    backtests = [BacktestRequest(**case) for case in CASES[:6]]
+    batch = run_backtest_batch(BacktestBatchRequest(backtests=backtests, include_trades=True))
+    for req, result in zip(backtests, batch["results"], strict=True):
+        single = run_backtest(req)
+        assert result["trades"] == single["trades"]
+        assert result["final_capital"] == single["final_capital"]
+
+
+def test_batch_rejects_other_engines():
+    batch = run_backtest_batch(BacktestBatchRequest(backtests=[BacktestRequest(symbol=SYMBOLS[0], engine="loop")]))
+    assert "error" in batch["results"][0]
+
+
+def test_portfolio_never_commits_more_than_its_capital():
+    # Full-size positions: while one symbol holds the pool, the other cannot enter
+    result = run_portfolio_backtest(
+        PortfolioRequest(base=BacktestRequest(timeframe="15m", position_size_pct=100), symbols=SYMBOLS)
+    )
+    spans = sorted((t["entry_time"], t["exit_time"]) for t in result["trades"])
+    assert spans and all(prev_exit <= entry for (_, prev_exit), (entry, _) in zip(spans, spans[1:]))
+
+
+def test_portfolio_splits_the_pool_equally_by_default():
+    base = {"timeframe": "15m", "strategy": "ema_cross"}
+    default = run_portfolio_backtest(PortfolioRequest(base=BacktestRequest(**base), symbols=SYMBOLS))
+    split = run_portfolio_backtest(
+        PortfolioRequest(base=BacktestRequest(**base, position_size_pct=100 / len(SYMBOLS)), symbols=SYMBOLS)
+    )
+    assert _canonical(default) == _canonical(split)
+    assert all(default["symbols"][s]["total_trades"] > 0 for s in SYMBOLS)
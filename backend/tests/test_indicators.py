@@ -0,0 +1,129 @@
+"""Indicators: ``update`` vs ``batch`` vs chunked ``batch`` vs ``compute_*`` vs pandas."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_candles
+from services import indicators
+from services.indicators import INDICATORS
+
+CANDLES = generate_candles("SYNIUSDT", 3)
+SPECS = [
+    ("sma", (20,)),
+    ("ema", (5,)),
+    ("ema", (9,)),
+    ("ema", (20,)),
+    ("rsi", (5,)),
+    ("rsi", (14,)),
+    ("wilder_rsi", (5,)),
+    ("wilder_rsi", (14,)),
+    ("wilder_rsi", (20,)),
+    ("atr", (5,)),
+    ("atr", (14,)),
+    ("atr", (20,)),
+    ("bollinger", (20, 2.0)),
+    ("macd", (12, 26, 9)),
+    ("vwap", ()),
+    ("donchian", (20,)),
+]
+
+
+def _inputs(name: str) -> list[np.ndarray]:
+    return [CANDLES[col].to_numpy(dtype=np.float64) for col in INDICATORS[name].inputs]
+
+
+def _outputs(values) -> list[np.ndarray]:
+    return [np.asarray(v, dtype=np.float64) for v in (values if isinstance(values, tuple) else (values,))]
+
+
+def _assert_identical(got, expected):
+    for a, b in zip(_outputs(got), _outputs(expected), strict=True):
+        np.testing.assert_array_equal(a, b)
+
+
+@pytest.mark.parametrize("name, params", SPECS)
+def test_update_matches_batch(name, params):
+    columns = _inputs(name)
+    stream = INDICATORS[name](*params)
+    updates = [stream.update(*row) for row in zip(*(c.tolist() for c in columns))]
+    per_output = list(zip(*updates)) if isinstance(updates[0], tuple) else [updates]
+    batch = _outputs(INDICATORS[name](*params).batch(*columns))
+    for got, expected in zip(per_output, batch, strict=True):
+        np.testing.assert_array_equal(np.asarray(got, dtype=np.float64), expected)
+
+
+@pytest.mark.parametrize("name, params", SPECS)
+def test_chunked_batch_matches_whole(name, params):
+    columns = _inputs(name)
+    whole = _outputs(INDICATORS[name](*params).batch(*columns))
+    chunked = INDICATORS[name](*params)
+    bounds = [0, 1, 5, 777, 2000, len(columns[0])]
+    parts = [_outputs(chunked.batch(*(c[lo:hi] for c in columns))) for lo, hi in zip(bounds, bounds[1:])]
+    _assert_identical(tuple(np.concatenate(p) for p in zip(*parts)), tuple(whole))
+
+
+@pytest.mark.parametrize(
+    "compute, name, params",
+    [
+        (indicators.compute_sma, "sma", (20,)),
+        (indicators.compute_ema, "ema", (9,)),
+        (indicators.compute_rsi, "rsi", (14,)),
+        (indicators.compute_wilder_rsi, "wilder_rsi", (14,)),
+        (indicators.compute_atr, "atr", (14,)),
+        (indicators.compute_bollinger, "bollinger", (20, 2.0)),
+        (indicators.compute_macd, "macd", (12, 26, 9)),
+        (indicators.compute_vwap, "vwap", ()),
+    ],
+)
+def test_compute_matches_batch(compute, name, params):
+    series = [CANDLES[col] for col in INDICATORS[name].inputs]
+    _assert_identical(compute(*series, *params), INDICATORS[name](*params).batch(*_inputs(name)))
+
+
+def test_sma_and_rsi_are_bit_identical_to_pandas():
+    close = CANDLES["close"]
+    for period in (10, 14, 50):
+        np.testing.assert_array_equal(indicators.compute_sma(close, period), close.rolling(period).mean())
+        delta = close.diff()
+        gain = delta.where(delta > 0, 0.0).rolling(period).mean()
+        loss = (-delta.where(delta < 0, 0.0)).rolling(period).mean()
+        np.testing.assert_array_equal(indicators.compute_rsi(close, period), 100 - (100 / (1 + gain / loss)))
+
+
+def test_channels_match_pandas():
+    close, high, low = CANDLES["close"], CANDLES["high"], CANDLES["low"]
+    mid, upper, lower = indicators.compute_bollinger(close, 20, 2.0)
+    np.testing.assert_array_equal(mid, close.rolling(20).mean())
+    std = close.rolling(20).std(ddof=0)
+    np.testing.assert_allclose(upper, mid + 2 * std, rtol=1e-9)
+    np.testing.assert_allclose(lower, mid - 2 * std, rtol=1e-9)
+    top, bottom = INDICATORS["donchian"](20).batch(high.to_numpy(), low.to_numpy())
+    np.testing.assert_array_equal(top, high.rolling(20).max())
+    np.testing.assert_array_equal(bottom, low.rolling(20).min())
+
+
+@pytest.mark.parametrize("period", [5, 9, 14, 20])
+def test_smoothed_indicators_are_bit_identical_to_pandas(period):
+    close, high, low = (CANDLES[c] for c in ("close", "high", "low"))
+    warm = np.arange(len(close)) < period - 1
+    ema = close.ewm(alpha=2 / (period + 1), adjust=False).mean().mask(warm)
+    np.testing.assert_array_equal(indicators.compute_ema(close, period), ema)
+
+    prev = close.shift()
+    tr = pd.concat([high - low, (high - prev).abs(), (low - prev).abs()], axis=1).max(axis=1)
+    atr = tr.ewm(alpha=1 / period, adjust=False).mean().mask(warm)
+    np.testing.assert_array_equal(indicators.compute_atr(high, low, close, period), atr)
+
+    delta = close.diff().iloc[1:]
+    gain = delta.clip(lower=0).ewm(alpha=1 / period, adjust=False).mean()
+    loss = (-delta.clip(upper=0)).ewm(alpha=1 / period, adjust=False).mean()
+    rsi = (100 - 100 / (1 + gain / loss)).reindex(close.index).mask(np.arange(len(close)) < period)
+    np.testing.assert_array_equal(indicators.compute_wilder_rsi(close, period), rsi)
+
+
+def test_vwap_matches_pandas():
+    high, low, close, volume = (CANDLES[c] for c in ("high", "low", "close", "volume"))
+    typical = (high + low + close) / 3
+    np.testing.assert_allclose(
+        indicators.compute_vwap(high, low, close, volume), (typical * volume).cumsum() / volume.cumsum(), rtol=1e-12
+    )
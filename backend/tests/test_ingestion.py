@@ -0,0 +1,100 @@
+"""Ingestion: a fake exchange's candles land in segments once, gaps included, and load back unchanged."""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services import columnar_store, ingestion, segments
+from services.segments import CANDLE_MS
+
+START = 1_700_000_000_000 // CANDLE_MS * CANDLE_MS
+END = START + 2 * 24 * 60 * CANDLE_MS
+# A two-hour outage and a single missing candle
+GAPS = ((START + 300 * CANDLE_MS, START + 420 * CANDLE_MS), (START + 2000 * CANDLE_MS, START + 2001 * CANDLE_MS))
+
+
+@pytest.fixture
+def symbol(request):
+    return "ING" + "".join(c for c in request.node.name.upper() if c.isalnum())[-20:] + "USDT"
+
+
+@pytest.fixture(autouse=True)
+def small_segments(monkeypatch):
+    monkeypatch.setattr(ingestion, "SEGMENT_ROWS", 1500)
+    monkeypatch.setattr(ingestion.time, "sleep", lambda _: None)  # no retry backoff
+
+
+def _expected(symbol: str, start: int, end: int) -> np.ndarray:
+    """Every candle the source has in ``[start, end)``, in one request."""
+    rows = ingestion.FakeSource(end, GAPS).fetch(symbol, start, 10**9)
+    return np.asarray(rows, dtype=np.float64).reshape(-1, 6)
+
+
+def _loaded(symbol: str) -> np.ndarray:
+    df = columnar_store.read_csv(symbol)
+    return df[["timestamp", "open", "high", "low", "close", "volume"]].to_numpy(dtype=np.float64)
+
+
+def test_ingest_writes_every_candle_once(symbol):
+    source = ingestion.FakeSource(END, GAPS)
+    assert ingestion.ingest([symbol], source, START, END) == {symbol: {"rows": len(_expected(symbol, START, END))}}
+    np.testing.assert_array_equal(_loaded(symbol), _expected(symbol, START, END))
+    manifest = segments.load_manifest(symbol)
+    # Gaps count as covered: the exchange was asked and had nothing
+    assert manifest["ranges"] == [[START, END]]
+    assert len(manifest["segments"]) > 1 and all(s["rows"] <= 1500 + ingestion.BATCH_LIMIT for s in manifest["segments"])
+
+    requests = source.requests
+    assert ingestion.ingest([symbol], source, START, END) == {symbol: {"rows": 0}}
+    assert source.requests == requests
+
+
+def test_ingest_fetches_only_missing_ranges(symbol):
+    middle = START + 1000 * CANDLE_MS
+    source = ingestion.FakeSource(END, GAPS)
+    ingestion.ingest([symbol], source, middle, middle + 500 * CANDLE_MS)
+    ingestion.ingest([symbol], source, START, END)
+    np.testing.assert_array_equal(_loaded(symbol), _expected(symbol, START, END))
+    assert segments.load_manifest(symbol)["ranges"] == [[START, END]]
+    assert segments.missing_ranges([[START, END]], START - CANDLE_MS, END + CANDLE_MS) == [
+        (START - CANDLE_MS, START),
+        (END, END + CANDLE_MS),
+    ]
+
+
+def test_ingest_adopts_a_legacy_csv(symbol):
+    legacy = _expected(symbol, START, START + 600 * CANDLE_MS)
+    ts = legacy[:, 0].astype(np.int64)
+    pd.DataFrame(
+        {
+            "datetime": pd.to_datetime(ts, unit="ms") + pd.Timedelta(hours=5, minutes=30),
+            "timestamp": ts,
+            **{col: legacy[:, i + 1] for i, col in enumerate(("open", "high", "low", "close", "volume"))},
+        }
+    ).to_csv(columnar_store.csv_path(symbol), index=False)
+    ingestion.ingest([symbol], ingestion.FakeSource(END, GAPS), START, END)
+    assert segments.has_segments(symbol)
+    np.testing.assert_array_equal(_loaded(symbol), _expected(symbol, START, END))
+
+
+class _Flaky(ingestion.FakeSource):
+    """Fails every other request."""
+
+    def fetch(self, symbol, since, limit):
+        self.requests += 1
+        if self.requests % 2:
+            raise ConnectionError("timeout")
+        return super().fetch(symbol, since, limit)
+
+
+class _Down(ingestion.FakeSource):
+    def fetch(self, symbol, since, limit):
+        raise ConnectionError("exchange down")
+
+
+def test_ingest_retries_and_reports_errors_per_symbol(symbol):
+    down = symbol.replace("ING", "DWN")
+    assert ingestion.ingest([symbol], _Flaky(END, GAPS), START, END)[symbol] == {"rows": len(_expected(symbol, START, END))}
+    assert ingestion.ingest([down], _Down(END), START, END) == {down: {"error": "exchange down"}}
+    assert not os.path.exists(segments.manifest_path(down))
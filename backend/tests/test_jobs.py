@@ -0,0 +1,79 @@
+"""Worker pool and job API: full queues answer 429, jobs run to the same result as a direct call."""
+import time
+
+import pytest
+
+from config import WORKER_QUEUE_DEPTH
+from models.schemas import BacktestRequest
+from services import job_queue
+from services.backtest_engine import run_backtest
+from tests.conftest import SYMBOLS
+
+BACKTEST = {"symbol": SYMBOLS[0], "timeframe": "1h", "stop_loss_pct": 1.0}
+
+
+def _wait(client, job_id: str) -> dict:
+    for _ in range(500):
+        info = client.get(f"/api/jobs/{job_id}").json()
+        if info["status"] not in ("queued", "running"):
+            return info
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def _boom():
+    raise ValueError("boom")
+
+
+@pytest.mark.parametrize(
+    "path, body",
+    [
+        ("/api/backtest", BACKTEST),
+        ("/api/backtest/batch", {"backtests": [BACKTEST]}),
+        ("/api/backtest/stream", BACKTEST),
+        ("/api/manual-trade", {"symbol": SYMBOLS[0], "entry_time": "2024-01-02T00:00:00"}),
+        ("/api/optimize", {"base": BACKTEST}),
+        ("/api/portfolio-backtest", {"base": BACKTEST, "symbols": SYMBOLS}),
+        ("/api/jobs/backtest", BACKTEST),
+    ],
+)
+def test_full_queue_answers_429(client, monkeypatch, path, body):
+    monkeypatch.setattr(job_queue, "_inflight", WORKER_QUEUE_DEPTH)
+    response = client.post(path, json=body)
+    assert response.status_code == 429 and "error" in response.json()
+
+
+def test_job_runs_to_the_direct_result(client):
+    before = job_queue.pool_stats()["inflight"]
+    submitted = client.post("/api/jobs/backtest", json=BACKTEST).json()
+    assert submitted["kind"] == "backtest" and submitted["status"] in ("queued", "running", "done")
+    assert _wait(client, submitted["job_id"])["status"] == "done"
+    assert client.get(f"/api/jobs/{submitted['job_id']}/result").json() == run_backtest(BacktestRequest(**BACKTEST))
+    assert job_queue.pool_stats()["inflight"] == before
+
+
+def test_failed_and_unknown_jobs(client):
+    job_id = job_queue.submit_job("test", _boom)
+    info = _wait(client, job_id)
+    assert info["status"] == "failed" and info["error"] == "boom"
+    assert client.get(f"/api/jobs/{job_id}/result").status_code == 409
+    for response in (client.get("/api/jobs/nope"), client.get("/api/jobs/nope/result"), client.delete("/api/jobs/nope")):
+        assert response.status_code == 404
+
+
+def test_dropped_streams_release_their_slot():
+    before = job_queue.pool_stats()["inflight"]
+    stream = job_queue.admit_stream(iter(range(3)))
+    assert job_queue.pool_stats()["inflight"] == before + 1
+    del stream
+    assert job_queue.pool_stats()["inflight"] == before
+    closed = job_queue.admit_stream(iter(range(3)))
+    next(closed)
+    closed.close()
+    assert job_queue.pool_stats()["inflight"] == before
+
+
+def test_fan_out_matches_a_loop():
+    items = list(range(23))
+    assert job_queue.fan_out("test", 3, abs, [-i for i in items], 3) == items
+    assert "test" in job_queue._helpers
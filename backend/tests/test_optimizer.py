@@ -0,0 +1,41 @@
+"""Parameter sweeps: pooled runs rank the same stats as inline runs."""
+import pytest
+
+from models.schemas import BacktestRequest, OptimizeRequest
+from services import job_queue, optimizer
+from tests.conftest import SYMBOLS
+
+
+def _sweep(monkeypatch, workers: int, **fields) -> dict:
+    monkeypatch.setattr(optimizer, "OPTIMIZE_MAX_WORKERS", workers)
+    return optimizer.run_optimization(OptimizeRequest(max_workers=workers, top_n=None, **fields))
+
+
+def test_pooled_sweep_matches_inline(monkeypatch):
+    grid = {"fast_period": [5, 8, 10], "slow_period": [20, 30, 40], "timeframe": ["15m", "1h"]}
+    base = BacktestRequest(symbol=SYMBOLS[1], stop_loss_pct=1.0)
+    pooled = _sweep(monkeypatch, 3, base=base, grid=grid, sort_by="max_drawdown")
+    assert pooled["total_combinations"] == 18
+    assert "optimize" in job_queue._helpers
+    assert pooled == _sweep(monkeypatch, 1, base=base, grid=grid, sort_by="max_drawdown")
+
+
+def test_invalid_grids_are_errors():
+    assert "error" in optimizer.run_optimization(OptimizeRequest(grid={"leverage": ["x"]}))
+    assert "error" in optimizer.run_optimization(OptimizeRequest(grid={"no_such_field": [1]}))
+    assert "error" in optimizer.run_optimization(OptimizeRequest(sort_by="sharpe"))
+
+
+@pytest.mark.parametrize(
+    "strategy, grid",
+    [
+        ("macd", {"params.macd_fast": [8, 12], "params.macd_slow": [21, 26], "stop_loss_pct": [None, 1.0]}),
+        ("bollinger_breakout", {"params.bb_period": [10, 20], "params.bb_std": [1.5, 2.0], "leverage": [1, 2]}),
+        ("donchian", {"params.donchian_period": [10, 20, 30, 40], "take_profit_pct": [None, 2.0]}),
+    ],
+)
+def test_pooled_sweep_of_multi_output_strategies(monkeypatch, strategy, grid):
+    base = BacktestRequest(symbol=SYMBOLS[0], timeframe="15m", strategy=strategy)
+    pooled = _sweep(monkeypatch, 2, base=base, grid=grid)
+    assert pooled["total_combinations"] >= 8
+    assert pooled == _sweep(monkeypatch, 1, base=base, grid=grid)
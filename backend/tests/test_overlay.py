@@ -0,0 +1,58 @@
+"""Overlay window endpoint: the visible range of a backtest's overlay, at full or reduced resolution."""
+import pytest
+
+from config import WORKER_QUEUE_DEPTH
+from services import job_queue
+from tests.conftest import SYMBOLS
+
+BACKTEST = {"symbol": SYMBOLS[1], "timeframe": "15m", "strategy": "bollinger_breakout"}
+
+
+@pytest.fixture
+def full(client) -> dict[str, list[dict]]:
+    return client.post("/api/backtest", json=BACKTEST).json()["overlay"]
+
+
+def _window(client, start: int | None, end: int | None, fmt: str = "rows", **fields) -> dict:
+    params = {k: v for k, v in (("start_time", start), ("end_time", end), ("format", fmt)) if v is not None}
+    return client.post("/api/backtest/overlay", params=params, json={**BACKTEST, **fields}).json()
+
+
+def test_whole_range_is_the_backtest_overlay(client, full):
+    assert _window(client, None, None)["overlay"] == full
+
+
+def test_window_keeps_the_points_inside_it(client, full):
+    times = [p["time"] for p in next(iter(full.values()))]
+    for start, end in ((times[100], times[400]), (times[100] + 1, times[400] - 1), (times[-50], None), (None, times[30])):
+        got = _window(client, start, end)
+        for name, points in full.items():
+            inside = [p for p in points if (start is None or p["time"] >= start) and (end is None or p["time"] <= end)]
+            assert got["overlay"][name] == inside, (name, start, end)
+    # The window counts candles, not points: early indicator values are NaN and dropped
+    assert _window(client, None, times[0])["candles"] > 1
+
+
+def test_window_columns_match_rows(client):
+    rows = _window(client, None, None, max_points=300)["overlay"]
+    columns = _window(client, None, None, "columns", max_points=300)["overlay"]
+    assert columns == {name: {"time": [p["time"] for p in pts], "value": [p["value"] for p in pts]} for name, pts in rows.items()}
+
+
+def test_max_points_keeps_the_extremes_of_the_window(client, full):
+    times = [p["time"] for p in next(iter(full.values()))]
+    start, end = times[50], times[-50]
+    window = _window(client, start, end)["overlay"]
+    reduced = _window(client, start, end, max_points=40)["overlay"]
+    for name, points in window.items():
+        kept = reduced[name]
+        assert len(kept) <= 40 and all(p in points for p in kept)
+        assert kept[0] == points[0] and kept[-1] == points[-1]
+        values = [p["value"] for p in points]
+        assert {min(values), max(values)} <= {p["value"] for p in kept}
+
+
+def test_window_errors(client, monkeypatch):
+    assert client.post("/api/backtest/overlay", json={**BACKTEST, "symbol": "NOPEUSDT"}).json() == {"error": "No data"}
+    monkeypatch.setattr(job_queue, "_inflight", WORKER_QUEUE_DEPTH)
+    assert client.post("/api/backtest/overlay", json=BACKTEST).status_code == 429
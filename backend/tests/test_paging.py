@@ -0,0 +1,56 @@
+"""/api/ohlcv paging: binary-searched start_time/end_time pages match a boolean-mask filter."""
+import pandas as pd
+import pytest
+
+from config import IST_OFFSET_SEC
+from tests.conftest import SYMBOLS
+
+
+def _masked(df: pd.DataFrame, start_ms: int | None, end_ms: int | None, limit: int) -> pd.DataFrame:
+    """The page a full scan gives: after ``start_ms``, before ``end_ms``, ``limit`` rows from the anchored end."""
+    ts = df["timestamp"]
+    mask = pd.Series(True, index=df.index)
+    if start_ms is not None:
+        mask &= ts > start_ms
+    if end_ms is not None:
+        mask &= ts < end_ms
+    rows = df[mask]
+    return rows.head(limit) if start_ms is not None else rows.tail(limit)
+
+
+def _chart(ms: int) -> int:
+    return ms // 1000 + IST_OFFSET_SEC
+
+
+@pytest.mark.parametrize("compact", [False, True], ids=["plain", "compact"])
+@pytest.mark.parametrize("timeframe", ["1m", "1h"])
+def test_pages_match_a_masked_scan(client, fresh_cache, monkeypatch, compact, timeframe):
+    monkeypatch.setattr(fresh_cache, "COMPACT_CACHE", compact)
+    df = fresh_cache.load_ohlcv(SYMBOLS[0], timeframe)
+    ts = df["timestamp"].tolist()
+    step = ts[1] - ts[0]
+    # On a candle, between candles, before the first and after the last
+    edges = [ts[0] - 10 * step, ts[0], ts[40], ts[40] + step // 2, ts[len(ts) // 2], ts[-1], ts[-1] + 10 * step]
+    windows = [(start, None) for start in edges] + [(None, end) for end in edges]
+    windows += [(ts[10], ts[30]), (ts[30], ts[10]), (ts[10], ts[10] + step // 2), (ts[5] - 1000, ts[-1] + 1000)]
+    for start_ms, end_ms in windows:
+        for limit in (1, 7, 500, 100000):
+            params = {"symbol": SYMBOLS[0], "timeframe": timeframe, "limit": limit, "format": "columns"}
+            if start_ms is not None:
+                params["start_time"] = _chart(start_ms)
+            if end_ms is not None:
+                params["end_time"] = _chart(end_ms)
+            page = client.get("/api/ohlcv", params=params).json()
+            expected = _masked(df, start_ms, end_ms, limit)
+            assert page["total"] == len(df)
+            assert page["data"]["time"] == [_chart(ms) for ms in expected["timestamp"].tolist()], (start_ms, end_ms, limit)
+            assert page["data"]["close"] == expected["close"].tolist()
+
+
+def test_pages_scroll_back_without_gaps(client):
+    params = {"symbol": SYMBOLS[1], "timeframe": "15m", "limit": 250, "format": "columns"}
+    pages = [client.get("/api/ohlcv", params=params).json()]
+    while pages[-1]["data"]["time"]:
+        pages.append(client.get("/api/ohlcv", params={**params, "end_time": pages[-1]["data"]["time"][0]}).json())
+    times = [t for page in reversed(pages) for t in page["data"]["time"]]
+    assert len(times) == pages[0]["total"] and times == sorted(set(times))
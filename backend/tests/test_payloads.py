@@ -0,0 +1,100 @@
+"""Response formats: columns and binary payloads decode to the same data as rows."""
+import json
+import struct
+
+import numpy as np
+import pytest
+
+from services.payloads import BINARY_MEDIA_TYPE, COLUMNS_MEDIA_TYPE, encode_binary
+from tests.conftest import SYMBOLS
+
+
+def _decode_binary(body: bytes) -> dict:
+    """Inverse of ``encode_binary``: the header's meta with every buffer put back at its path."""
+    (size,) = struct.unpack_from("<I", body)
+    assert (4 + size) % 8 == 0
+    header = json.loads(body[4 : 4 + size])
+    payload = header["meta"]
+    for col in header["columns"]:
+        assert col["offset"] % 8 == 0
+        dtype = np.dtype(col["dtype"])
+        arr = np.frombuffer(body, dtype, col["length"], 4 + size + col["offset"])
+        *parents, leaf = col["name"].split(".")
+        node = payload
+        for key in parents:
+            node = node.setdefault(key, {})
+        node[leaf] = arr
+    return payload
+
+
+def _rows_to_columns(rows: list[dict]) -> dict[str, list]:
+    return {key: [row[key] for row in rows] for key in rows[0]}
+
+
+def _as_json(arr: np.ndarray) -> list:
+    return [None if isinstance(v, float) and np.isnan(v) else v for v in arr.tolist()]
+
+
+def test_binary_round_trips_nested_arrays():
+    payload = {
+        "total": 3,
+        "name": "x",
+        "data": {"time": np.arange(3, dtype=np.int64), "value": np.array([1.5, np.nan, -2.0])},
+        "overlay": {"rsi": {"value": np.array([0.1, 0.2, 0.3, 0.4, 0.5], dtype=np.float32)}, "empty": {}},
+        "flags": np.array([True, False, True]),
+    }
+    decoded = _decode_binary(encode_binary(payload))
+    assert decoded["total"] == 3 and decoded["name"] == "x" and decoded["overlay"]["empty"] == {}
+    for got, expected in (
+        (decoded["data"]["time"], payload["data"]["time"]),
+        (decoded["data"]["value"], payload["data"]["value"]),
+        (decoded["overlay"]["rsi"]["value"], payload["overlay"]["rsi"]["value"]),
+        (decoded["flags"], payload["flags"]),
+    ):
+        assert got.dtype == expected.dtype
+        np.testing.assert_array_equal(got, expected)
+
+
+@pytest.mark.parametrize("window", [{}, {"limit": 77}, {"start_time": 1672600000, "limit": 300}], ids=["default", "limit", "start"])
+def test_ohlcv_formats_carry_the_same_candles(client, window):
+    params = {"symbol": SYMBOLS[0], "timeframe": "15m", **window}
+    rows = client.get("/api/ohlcv", params=params).json()
+    assert rows["data"] and rows["total"] > len(rows["data"])
+
+    columns = client.get("/api/ohlcv", params={**params, "format": "columns"})
+    assert columns.headers["content-type"] == COLUMNS_MEDIA_TYPE
+    assert columns.json() == {"data": _rows_to_columns(rows["data"]), "total": rows["total"]}
+
+    binary = client.get("/api/ohlcv", params=params, headers={"Accept": BINARY_MEDIA_TYPE})
+    assert binary.headers["content-type"] == BINARY_MEDIA_TYPE
+    decoded = _decode_binary(binary.content)
+    assert decoded["total"] == rows["total"]
+    assert {key: _as_json(arr) for key, arr in decoded["data"].items()} == _rows_to_columns(rows["data"])
+
+
+def test_backtest_formats_carry_the_same_result(client):
+    req = {"symbol": SYMBOLS[1], "timeframe": "1h", "strategy": "rsi", "stop_loss_pct": 1.0}
+    rows = client.post("/api/backtest", json=req).json()
+    assert rows["total_trades"] > 0
+    expected = {
+        **rows,
+        "trades": _rows_to_columns(rows["trades"]),
+        "equity_curve": _rows_to_columns(rows["equity_curve"]),
+        "overlay": {name: _rows_to_columns(points) for name, points in rows["overlay"].items()},
+    }
+    assert client.post("/api/backtest", params={"format": "columns"}, json=req).json() == expected
+
+    binary = client.post("/api/backtest", json=req, headers={"Accept": BINARY_MEDIA_TYPE})
+    decoded = _decode_binary(binary.content)
+    decoded["equity_curve"] = {key: _as_json(arr) for key, arr in decoded["equity_curve"].items()}
+    decoded["overlay"] = {
+        name: {key: _as_json(arr) for key, arr in series.items()} for name, series in decoded["overlay"].items()
+    }
+    assert decoded == expected
+
+
+def test_errors_stay_json(client):
+    response = client.get("/api/ohlcv", params={"symbol": "NOPEUSDT", "format": "binary"})
+    assert response.json()["error"]
+    response = client.post("/api/backtest", params={"format": "binary"}, json={"symbol": "NOPEUSDT"})
+    assert response.headers["content-type"] == "application/json" and response.json()["error"]
@@ -0,0 +1,89 @@
+"""Walk-forward and Monte Carlo runners: pooled runs match inline runs, streams are admitted like jobs."""
+import json
+
+import pytest
+
+from config import WORKER_QUEUE_DEPTH
+from models.schemas import BacktestRequest, MonteCarloRequest, WalkForwardRequest
+from services import job_queue, optimizer, robustness
+from services.backtest_engine import run_backtest
+from tests.conftest import SYMBOLS
+
+
+def _run(monkeypatch, runner, req, workers: int) -> list[dict]:
+    monkeypatch.setattr(optimizer, "OPTIMIZE_MAX_WORKERS", workers)
+    monkeypatch.setattr(robustness, "OPTIMIZE_MAX_WORKERS", workers)
+    return list(runner(req.model_copy(update={"max_workers": workers})))
+
+
+@pytest.mark.parametrize(
+    "strategy, grid",
+    [
+        ("sma_cross", {"fast_period": [5, 10], "slow_period": [20, 30, 40]}),
+        ("macd", {"params.macd_fast": [8, 12], "params.macd_slow": [21, 26, 30]}),
+    ],
+)
+def test_walk_forward_pooled_matches_inline(monkeypatch, strategy, grid):
+    req = WalkForwardRequest(
+        base=BacktestRequest(symbol=SYMBOLS[0], timeframe="15m", strategy=strategy),
+        grid=grid,
+        in_sample_bars=300,
+        out_of_sample_bars=100,
+    )
+    pooled = _run(monkeypatch, robustness.walk_forward, req, 2)
+    assert pooled == _run(monkeypatch, robustness.walk_forward, req, 1)
+    windows = [e for e in pooled if e["type"] == "window"]
+    assert [w["index"] for w in windows] == list(range(len(windows))) and len(windows) >= 5
+    assert all(w["in_sample"]["candles"] == 300 for w in windows)
+    assert pooled[-1]["type"] == "summary" and pooled[-1]["windows"] == len(windows)
+
+
+def test_walk_forward_rejects_bad_requests():
+    base = BacktestRequest(symbol=SYMBOLS[0], timeframe="1h")
+    for req in (
+        WalkForwardRequest(base=base, grid={"symbol": [SYMBOLS[1]]}),
+        WalkForwardRequest(base=base, in_sample_bars=0),
+        WalkForwardRequest(base=base, in_sample_bars=10**6),
+        WalkForwardRequest(base=base, sort_by="sharpe"),
+    ):
+        assert [e["type"] for e in robustness.walk_forward(req)] == ["error"]
+
+
+@pytest.mark.parametrize("method", ["bootstrap", "shuffle"])
+def test_monte_carlo_pooled_matches_inline(monkeypatch, method):
+    base = BacktestRequest(symbol=SYMBOLS[1], timeframe="15m", stop_loss_pct=1.0)
+    req = MonteCarloRequest(base=base, simulations=2500, method=method, seed=7)
+    pooled = _run(monkeypatch, robustness.monte_carlo, req, 2)
+    assert json.dumps(pooled) == json.dumps(_run(monkeypatch, robustness.monte_carlo, req, 1))
+    progress = [e["completed"] for e in pooled if e["type"] == "progress"]
+    assert progress == sorted(progress) and progress[-1] == 2500
+    summary = pooled[-1]
+    assert summary["type"] == "summary" and summary["simulations"] == 2500
+    if method == "shuffle":
+        # A permutation of the same returns ends at the same capital
+        final = run_backtest(base)["final_capital"]
+        assert all(v == pytest.approx(final) for v in summary["final_capital"].values())
+
+
+def test_monte_carlo_percentiles_are_ordered():
+    req = MonteCarloRequest(base=BacktestRequest(symbol=SYMBOLS[0], timeframe="1h"), simulations=300, seed=1)
+    summary = list(robustness.monte_carlo(req))[-1]
+    for stat in ("final_capital", "max_drawdown"):
+        values = list(summary[stat].values())
+        assert values == sorted(values)
+    assert 0 <= summary["probability_of_loss"] <= 1
+
+
+@pytest.mark.parametrize("path", ["/api/robustness/walk-forward", "/api/robustness/monte-carlo"])
+def test_streams_are_refused_when_the_queue_is_full(client, monkeypatch, path):
+    monkeypatch.setattr(job_queue, "_inflight", WORKER_QUEUE_DEPTH)
+    response = client.post(path, json={"base": {"symbol": SYMBOLS[0]}})
+    assert response.status_code == 429
+
+
+def test_streams_hold_a_slot_until_done(client):
+    before = job_queue.pool_stats()["inflight"]
+    response = client.post("/api/robustness/monte-carlo", json={"base": {"symbol": SYMBOLS[0]}, "simulations": 50})
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert events[-1]["type"] == "summary"
+    assert job_queue.pool_stats()["inflight"] == before
@@ -0,0 +1,75 @@
+"""Hot-path timing: Server-Timing headers per request and rolling stage stats on /api/metrics."""
+import time
+
+import pytest
+
+from services import timing
+from tests.conftest import SYMBOLS
+
+BACKTEST = {"symbol": SYMBOLS[0], "timeframe": "1h", "strategy": "rsi"}
+
+
+@pytest.fixture
+def timed(client):
+    """Client with timing switched on (through the API) and empty stage windows."""
+    assert client.post("/api/metrics/timing", params={"enabled": True}).json() == {"enabled": True}
+    timing.reset()
+    yield client
+    timing.set_enabled(False)
+    timing.reset()
+
+
+def _server_timing(response) -> dict[str, float]:
+    spans = {}
+    for entry in response.headers["server-timing"].split(", "):
+        name, dur = entry.split(";dur=")
+        spans[name] = float(dur)
+    return spans
+
+
+def test_no_header_while_timing_is_off(client):
+    assert not timing.is_enabled()
+    assert "server-timing" not in client.post("/api/backtest", json=BACKTEST).headers
+    assert timing.span("load") is timing.span("simulate")  # the shared no-op
+
+
+def test_responses_carry_their_stages(timed):
+    spans = _server_timing(timed.post("/api/backtest", json=BACKTEST))
+    assert {"signals", "simulate", "stats", "encode"} <= set(spans)
+    assert all(dur >= 0 for dur in spans.values())
+
+    spans = _server_timing(timed.get("/api/ohlcv", params={"symbol": SYMBOLS[0], "format": "binary"}))
+    assert "render" in spans and "encode" in spans
+
+
+def test_metrics_summarise_every_span(timed):
+    for _ in range(3):
+        timed.post("/api/backtest", json=BACKTEST)
+    stages = timed.get("/api/metrics").json()["timing"]["stages"]
+    # /api/metrics itself has not finished when its stats are taken
+    assert stages["total"]["count"] == 3 and stages["simulate"]["count"] == 3
+    for stats in stages.values():
+        assert stats["p50_ms"] <= stats["p90_ms"] <= stats["p99_ms"] <= stats["max_ms"]
+        assert sum(stats["histogram"]["counts"]) == stats["count"]
+        assert len(stats["histogram"]["counts"]) == len(stats["histogram"]["le_ms"])
+
+    assert timed.delete("/api/metrics").json() == {"status": "reset"}
+    # Only the DELETE itself, which finished after the reset
+    stages = timing.stage_stats()["stages"]
+    assert set(stages) == {"encode", "total"} and all(s["count"] == 1 for s in stages.values())
+
+
+def test_spans_of_one_name_add_up_in_a_request():
+    timing.set_enabled(True)
+    request = {"spans": {}, "returned": None}
+    token = timing._request.set(request)
+    try:
+        for _ in range(2):
+            with timing.span("nap"):
+                time.sleep(0.01)
+    finally:
+        timing._request.reset(token)
+        timing.set_enabled(False)
+    assert request["spans"]["nap"] >= 0.02
+    assert timing.stage_stats()["stages"]["nap"]["count"] == 2
+    timing.reset()
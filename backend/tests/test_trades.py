@@ -0,0 +1,94 @@
+"""Manual trades: the vectorized first-touch resolver exits where a candle-by-candle walk does."""
+import pandas as pd
+import pytest
+
+from models.schemas import ManualTradeRequest
+from services.data_service import load_ohlcv
+from services.trade_service import simulate_manual_trade, simulate_manual_trades
+from tests.conftest import SYMBOLS
+
+EXITS = [
+    {"stop_loss_pct": 0.5, "take_profit_pct": 0.5},
+    {"stop_loss_pct": 2.0, "take_profit_pct": 1.0},
+    {"stop_loss_pct": 1.0},
+    {"take_profit_pct": 3.0},
+    {"stop_loss_pct": 25.0, "take_profit_pct": 25.0},  # usually never hit: closes at the end
+    {},
+]
+
+
+def _walk(req: ManualTradeRequest) -> dict:
+    """Reference: walk forward one candle at a time, stop loss checked first."""
+    df = load_ohlcv(req.symbol, req.timeframe)
+    idx = int(df["datetime"].searchsorted(pd.Timestamp(req.entry_time)))
+    if idx >= len(df):
+        return {"error": "Entry time out of range"}
+    entry = df.iloc[idx]
+    sign = 1 if req.side == "long" else -1
+    sl = entry["close"] * (1 - sign * req.stop_loss_pct / 100) if req.stop_loss_pct else None
+    tp = entry["close"] * (1 + sign * req.take_profit_pct / 100) if req.take_profit_pct else None
+    exit_row, price, reason = df.iloc[-1], df.iloc[-1]["close"], "end"
+    for j in range(idx + 1, len(df)):
+        row = df.iloc[j]
+        adverse, favourable = (row["low"], row["high"]) if sign == 1 else (row["high"], row["low"])
+        if sl and sign * (adverse - sl) <= 0:
+            exit_row, price, reason = row, sl, "SL"
+            break
+        if tp and sign * (favourable - tp) >= 0:
+            exit_row, price, reason = row, tp, "TP"
+            break
+    pnl = req.capital / entry["close"] * sign * (price - entry["close"]) * req.leverage
+    return {
+        "side": req.side,
+        "entry_price": round(entry["close"], 2),
+        "exit_price": round(price, 2),
+        "entry_time": str(entry["datetime"]),
+        "exit_time": str(exit_row["datetime"]),
+        "pnl": round(pnl, 2),
+        "pnl_pct": round(pnl / req.capital * 100, 2),
+        "exit_reason": reason,
+        "leverage": req.leverage,
+    }
+
+
+@pytest.mark.parametrize("timeframe", ["15m", "1h"])
+@pytest.mark.parametrize("side", ["long", "short"])
+def test_first_touch_matches_a_candle_walk(fresh_cache, timeframe, side):
+    datetimes = load_ohlcv(SYMBOLS[0], timeframe)["datetime"]
+    entries = [datetimes.iloc[int(len(datetimes) * p)] for p in (0, 0.13, 0.5, 0.77, 0.97)] + [datetimes.iloc[-1]]
+    requests = [
+        ManualTradeRequest(
+            symbol=SYMBOLS[0], timeframe=timeframe, side=side, entry_time=when.isoformat(), leverage=3, **exits
+        )
+        for when in entries
+        for exits in EXITS
+    ]
+    results = simulate_manual_trades(requests)
+    assert results == [_walk(req) for req in requests]
+    assert {r["exit_reason"] for r in results} == {"SL", "TP", "end"}
+
+
+def test_both_levels_in_one_candle_exit_at_the_stop(fresh_cache):
+    df = load_ohlcv(SYMBOLS[1], "1h")
+    # An entry whose next candle trades through both sides of its close
+    i = next(i for i in range(len(df) - 1) if df["low"].iloc[i + 1] < df["close"].iloc[i] < df["high"].iloc[i + 1])
+    entry, nxt = df.iloc[i], df.iloc[i + 1]
+    pct = min(entry["close"] - nxt["low"], nxt["high"] - entry["close"]) / entry["close"] * 100 * 0.9
+    for side in ("long", "short"):
+        req = ManualTradeRequest(
+            symbol=SYMBOLS[1], side=side, entry_time=str(entry["datetime"]), stop_loss_pct=pct, take_profit_pct=pct
+        )
+        result = simulate_manual_trade(req)
+        assert result == _walk(req)
+        assert result["exit_reason"] == "SL" and result["exit_time"] == str(nxt["datetime"])
+
+
+def test_entry_times_outside_the_data(fresh_cache):
+    last = load_ohlcv(SYMBOLS[0], "1h")["datetime"].iloc[-1]
+    late = ManualTradeRequest(symbol=SYMBOLS[0], entry_time=(last + pd.Timedelta(hours=2)).isoformat())
+    assert simulate_manual_trade(late) == {"error": "Entry time out of range"}
+    missing = ManualTradeRequest(symbol="NOPEUSDT", entry_time=last.isoformat())
+    assert simulate_manual_trade(missing) == {"error": "No data"}
+    # A timezone is dropped: the wall-clock time picks the candle
+    aware = ManualTradeRequest(symbol=SYMBOLS[0], entry_time=f"{last.isoformat()}+05:30", stop_loss_pct=1.0)
+    assert simulate_manual_trade(aware)["entry_time"] == str(last)
@@ -29,6 +29,10 @@ export default function StatsGrid({ result }) {
       value: `$${result.max_drawdown?.toLocaleString()}`,
       color: "var(--accent-red)",
     },
+    { label: "Sharpe", value: result.sharpe_ratio ?? "—" },
+    { label: "Sortino", value: result.sortino_ratio ?? "—" },
+    { label: "Profit Factor", value: result.profit_factor ?? "—" },
+    { label: "Exposure", value: `${result.exposure_pct ?? 0}%` },
   ];
 
   return (